@@ -7,6 +7,7 @@ from uagents import Agent, Context, Model, Protocol
 from uagents.setup import fund_agent_if_low
 import os
 import sys
+import threading
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
@@ -23,6 +24,7 @@ from src.protocols import (
 )
 
 # Import MeTTa Query Engine
+from src.metta.async_query_engine import AsyncMeTTaQueryEngine
 from src.metta.query_engine import MeTTaQueryEngine
 
 # Load environment variables
@@ -55,16 +57,29 @@ knowledge_proto = Protocol(name="KnowledgeGraphProtocol")
 
 # Initialize MeTTa query engine (singleton)
 metta_engine: Optional[MeTTaQueryEngine] = None
+metta_engine_lock = threading.Lock()
+async_metta_engine: Optional[AsyncMeTTaQueryEngine] = None
 
 
 def get_metta_engine() -> MeTTaQueryEngine:
     """Get or initialize MeTTa query engine"""
     global metta_engine
     if metta_engine is None:
-        metta_engine = MeTTaQueryEngine()
+        # Handlers may run in worker threads; build the engine only once
+        with metta_engine_lock:
+            if metta_engine is None:
+                metta_engine = MeTTaQueryEngine()
     return metta_engine
 
 
+def get_async_metta_engine() -> AsyncMeTTaQueryEngine:
+    """Get or create the async facade that runs KB work off the event loop"""
+    global async_metta_engine
+    if async_metta_engine is None:
+        async_metta_engine = AsyncMeTTaQueryEngine(get_metta_engine())
+    return async_metta_engine
+
+
 # ============================================================================
 # Diagnostic Reasoning Logic
 # ============================================================================
@@ -94,30 +109,31 @@ class DiagnosticReasoner:
         """
         # Step 1: Multi-symptom matching with scoring
         symptom_names_normalized = [s.replace('_', '-') for s in symptom_names]
-        condition_matches = self.engine.find_conditions_by_symptoms(symptom_names_normalized)
+        condition_matches = self.engine.score_conditions_by_symptoms(symptom_names_normalized)
 
-        # Step 2: Rank conditions by match count (confidence)
+        # Step 2: Rank conditions by match count (confidence); the engine
+        # already returns them ordered by match count, so no re-sort is needed
         total_symptoms = len(symptom_names_normalized)
         ranked = []
-        for condition, match_count in condition_matches.items():
+        matched_symptoms = {}
+        for condition, score in condition_matches.items():
+            match_count = score['match_count']
             confidence = (match_count / total_symptoms) * 100 if total_symptoms > 0 else 0
             ranked.append((condition, match_count, confidence))
-
-        # Sort by match count descending, then by urgency
-        ranked.sort(key=lambda x: x[1], reverse=True)
+            matched_symptoms[condition] = score['matched_symptoms']
 
         # Step 3: Check for emergency conditions
         emergency_conditions = self.engine.find_emergency_conditions()
         emergency_flags = [
             cond for cond, _, _ in ranked
-            if cond in str(emergency_conditions)
+            if cond in emergency_conditions
         ]
 
         # Step 4: Detect red flag symptoms
         all_red_flags = self.engine.find_red_flag_symptoms()
         detected_red_flags = [
             symptom for symptom in symptom_names_normalized
-            if symptom in str(all_red_flags)
+            if symptom in all_red_flags
         ]
 
         # Step 5: Generate reasoning for top 3 conditions
@@ -142,7 +158,7 @@ class DiagnosticReasoner:
             contraindication_warnings = []
 
             for treatment in treatments:
-                treatment_str = str(treatment).strip("'[]")
+                treatment_str = str(treatment)
                 is_safe = True
 
                 if patient_conditions:
@@ -180,6 +196,7 @@ class DiagnosticReasoner:
 
         return {
             "ranked_conditions": ranked,
+            "matched_symptoms": matched_symptoms,
             "emergency_flags": emergency_flags,
             "red_flags": detected_red_flags,
             "reasoning_chains": reasoning_chains,
@@ -246,9 +263,10 @@ async def handle_diagnostic_request(ctx: Context, sender: str, msg: DiagnosticRe
     engine = get_metta_engine()
     reasoner = DiagnosticReasoner(engine)
 
-    # Perform diagnostic analysis
+    # Perform diagnostic analysis (on the KB executor so the event loop keeps polling)
     ctx.logger.info("🧠 Performing MeTTa-powered diagnostic reasoning...")
-    analysis = reasoner.analyze_symptoms(
+    analysis = await get_async_metta_engine().run(
+        reasoner.analyze_symptoms,
         symptom_names=symptom_names,
         patient_age=msg.patient_data.age
     )
@@ -286,16 +304,19 @@ async def handle_diagnostic_request(ctx: Context, sender: str, msg: DiagnosticRe
             conf_level = ConfidenceLevel.LOW
 
         # Extract matching symptom names
-        matching_symptoms = [s.replace('-', '_') for s in symptom_names]
+        matched_by_condition = analysis['matched_symptoms']
+        matching_symptoms = [
+            s.replace('-', '_') for s in matched_by_condition.get(condition_name, [])
+        ]
 
         # Build primary result
         primary_result = PossibleCondition(
             condition_name=condition_name,
             confidence=confidence_pct / 100.0,  # Convert to 0-1 range
             confidence_level=conf_level,
-            matching_symptoms=matching_symptoms[:match_count],
+            matching_symptoms=matching_symptoms,
             reasoning=f"{uncertainty_message}\n\nSeverity: {rec.get('severity', 'unknown')}\nAction: {rec.get('action', 'consult-doctor')}",
-            metta_query_used=f"find_conditions_by_symptoms({symptom_names_normalized})"
+            metta_query_used=f"score_conditions_by_symptoms({symptom_names})"
         )
         possible_conditions.append(primary_result)
 
@@ -313,7 +334,9 @@ async def handle_diagnostic_request(ctx: Context, sender: str, msg: DiagnosticRe
                     condition_name=condition,
                     confidence=confidence_pct / 100.0,
                     confidence_level=conf_level,
-                    matching_symptoms=matching_symptoms[:match_count],
+                    matching_symptoms=[
+                        s.replace('-', '_') for s in matched_by_condition.get(condition, [])
+                    ],
                     reasoning=f"Alternative diagnosis with {match_count} symptom matches",
                     metta_query_used=f"differential_diagnosis({condition})"
                 )
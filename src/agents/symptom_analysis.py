@@ -13,9 +13,13 @@ Features:
 Port: 8004
 """
 
+import heapq
 import os
 import sys
-from typing import List, Dict, Tuple, Optional
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Dict, Set, Tuple, Optional
 from dotenv import load_dotenv
 
 # Add project root to path for imports
@@ -27,7 +31,14 @@ from src.protocols import (
     SymptomAnalysisRequestMsg,
     SymptomAnalysisResponseMsg,
 )
+from src.metta.async_query_engine import AsyncMeTTaQueryEngine
+from src.metta.attribute_index import SymptomAttributeIndex
+from src.metta.query_cache import QueryCache
 from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.red_flag_rules import normalize_symptom
+from src.metta.risk_table import PatientProfile, RiskTable, encode_patient_profile
+from src.metta.symptom_matrix import SymptomMatrix
+from src.metta.triage_table import TriageTable
 
 # Load environment variables
 load_dotenv()
@@ -54,28 +65,289 @@ agent = Agent(
 
 # Initialize MeTTa query engine (singleton pattern)
 metta_engine = None
+metta_engine_lock = threading.Lock()
+async_metta_engine: Optional[AsyncMeTTaQueryEngine] = None
 
 
 def get_metta_engine() -> MeTTaQueryEngine:
     """Get or create MeTTa engine instance (singleton)"""
     global metta_engine
     if metta_engine is None:
-        metta_engine = MeTTaQueryEngine()
+        # Handlers may run in worker threads; build the engine only once
+        with metta_engine_lock:
+            if metta_engine is None:
+                metta_engine = MeTTaQueryEngine()
     return metta_engine
 
 
+def get_async_metta_engine() -> AsyncMeTTaQueryEngine:
+    """Get or create the async facade that runs KB work off the event loop"""
+    global async_metta_engine
+    if async_metta_engine is None:
+        async_metta_engine = AsyncMeTTaQueryEngine(get_metta_engine())
+    return async_metta_engine
+
+
+# ============================================================================
+# Analysis Sessions (incremental re-analysis across follow-up messages)
+# ============================================================================
+
+class AnalysisSession:
+    """
+    Analysis state of one coordinator session, kept between turns
+
+    Holds the previous turn's inputs and per-condition results so a
+    follow-up that changes a few symptoms, severities or attributes only
+    rescores the conditions those symptoms belong to.
+    """
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.last_active = datetime.utcnow()
+        self.reset(None)
+
+    def reset(self, kb_version: Optional[int]):
+        """Forget all previous turns (e.g. after a knowledge base change)"""
+        self.kb_version = kb_version
+        self.turns = 0
+        self.symptoms: Set[str] = set()
+        self.severity_scores: Dict[str, int] = {}
+        self.profile: Optional[Tuple] = None
+        self.symptom_attributes: Dict[str, Dict[str, str]] = {}
+        # Raw symptom -> (attributes, _match_symptom_attributes() result)
+        self.attribute_matches: Dict[str, Tuple[Dict[str, str], Dict[str, Dict]]] = {}
+        # Condition -> (confidence, risk adjustment) scored in the previous turn
+        self.condition_results: Dict[str, Tuple[float, Dict]] = {}
+        self.reused_count = 0
+
+    def record_turn(
+        self,
+        symptoms: List[str],
+        age: Optional[int],
+        severity_scores: Optional[Dict[str, int]],
+        medical_history: Optional[List[str]],
+        symptom_attributes: Optional[Dict[str, Dict[str, str]]],
+        condition_results: Dict[str, Tuple[float, Dict]],
+        reused_count: int,
+    ):
+        """Remember a finished turn's record and condition scores (caller holds the lock)"""
+        self.condition_results = condition_results
+        self.reused_count = reused_count
+        self.symptoms = set(_normalize_symptom(s) for s in symptoms)
+        self.severity_scores = dict(severity_scores or {})
+        self.symptom_attributes = {s: dict(a) for s, a in (symptom_attributes or {}).items()}
+        self.profile = (age, tuple(medical_history or ()))
+        self.turns += 1
+
+
+# Analysis sessions by coordinator session ID
+analysis_sessions: Dict[str, AnalysisSession] = {}
+analysis_sessions_lock = threading.Lock()
+
+# Idle time before a session's analysis state is dropped
+SESSION_TIMEOUT_SECONDS = 7200  # 2 hours
+
+
+def get_analysis_session(session_id: str) -> AnalysisSession:
+    """Get existing analysis session or create new one"""
+    with analysis_sessions_lock:
+        session = analysis_sessions.get(session_id)
+        if session is None:
+            session = analysis_sessions[session_id] = AnalysisSession(session_id)
+        session.last_active = datetime.utcnow()
+        return session
+
+
+def cleanup_expired_analysis_sessions(ctx: Context) -> int:
+    """Remove idle analysis sessions to prevent memory leaks"""
+    now = datetime.utcnow()
+    with analysis_sessions_lock:
+        expired = [
+            session_id for session_id, session in analysis_sessions.items()
+            if (now - session.last_active).total_seconds() > SESSION_TIMEOUT_SECONDS
+        ]
+        for session_id in expired:
+            del analysis_sessions[session_id]
+
+    if expired:
+        ctx.logger.info(f"Cleaned up {len(expired)} expired analysis sessions")
+    return len(expired)
+
+
+def _normalize_symptom(symptom: str) -> str:
+    """Normalize a symptom name the way calculate_confidence_scores() does"""
+    return symptom.lower().replace(" ", "-")
+
+
+# ============================================================================
+# Analysis Result Cache (repeat patient profiles)
+# ============================================================================
+
+# Analyses memoized per (KB version, canonical patient record); 0 disables
+analysis_cache = QueryCache(max_size=int(os.getenv("SYMPTOM_ANALYSIS_CACHE_SIZE", "4096")))
+
+# Report per-stage analysis timings in responses
+ANALYSIS_TIMINGS = os.getenv("SYMPTOM_ANALYSIS_TIMINGS", "false").lower() in ("1", "true", "yes")
+
+
+def normalize_analysis_request(
+    symptoms: List[str],
+    age: Optional[int] = None,
+    severity_scores: Optional[Dict[str, int]] = None,
+    medical_history: Optional[List[str]] = None,
+    symptom_attributes: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Patient record with symptom, severity, history and attribute names in KB form
+
+    Order and repeats are kept as given, so analyzing the normalized record
+    reports the patient's symptoms the way they were entered.
+
+    Returns:
+        analyze_symptoms() keyword arguments
+    """
+    return {
+        "symptoms": [normalize_symptom(s) for s in symptoms],
+        "age": age,
+        "severity_scores": {
+            normalize_symptom(s): score for s, score in severity_scores.items()
+        } if severity_scores is not None else None,
+        "medical_history": [
+            normalize_symptom(h) for h in medical_history
+        ] if medical_history is not None else None,
+        "symptom_attributes": {
+            normalize_symptom(s): attrs for s, attrs in symptom_attributes.items()
+        } if symptom_attributes is not None else None,
+    }
+
+
+def age_band(age: Optional[int]) -> Optional[int]:
+    """
+    Youngest age of the band an age falls in (no age, None or 0, is kept)
+
+    Bands split at every age where an analysis can change: urgency
+    escalation under 5 and over 65 (SymptomAnalyzer.assess_urgency) and
+    the risk factor bands of encode_patient_profile (under 40, 40-55,
+    55-70, over 70). All ages in a band get the same analysis apart
+    from the reported age.
+    """
+    if not age:
+        return age
+    if age < 5:
+        return 1
+    if age < 40:
+        return 5
+    if age <= 55:
+        return 40
+    if age <= 65:
+        return 56
+    if age <= 70:
+        return 66
+    return 71
+
+
+def _age_reasoning(age: int) -> str:
+    """Reasoning chain line reporting the patient's age"""
+    return f"👤 Patient age: {age} years"
+
+
+def canonicalize_analysis_request(
+    symptoms: List[str],
+    age: Optional[int] = None,
+    severity_scores: Optional[Dict[str, int]] = None,
+    medical_history: Optional[List[str]] = None,
+    symptom_attributes: Optional[Dict[str, Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    Canonical form of a patient record, used as its result cache key
+
+    Names are normalized to KB form, de-duplicated and sorted, and the
+    age is replaced by its age_band(), so records that differ only in
+    spelling, order or age within a band share one form (and one cache
+    entry).
+
+    Returns:
+        analyze_symptoms() keyword arguments
+    """
+    return {
+        "symptoms": sorted(set(normalize_symptom(s) for s in symptoms)),
+        "age": age_band(age),
+        "severity_scores": {
+            normalize_symptom(s): score for s, score in sorted((severity_scores or {}).items())
+        } or None,
+        "medical_history": sorted(set(normalize_symptom(h) for h in medical_history or ())) or None,
+        "symptom_attributes": {
+            normalize_symptom(s): dict(sorted(attrs.items()))
+            for s, attrs in sorted((symptom_attributes or {}).items())
+        } or None,
+    }
+
+
 # ============================================================================
 # Symptom Analysis Core Logic
 # ============================================================================
 
+def _hashable(value: Any) -> Any:
+    """Convert lists/dicts (possibly nested) into hashable tuples for memo keys"""
+    if isinstance(value, dict):
+        return tuple(sorted([(k, _hashable(v)) for k, v in value.items()]))
+    if isinstance(value, (list, tuple, set)):
+        # Strings (e.g. symptom names) are already hashable
+        return tuple([v if isinstance(v, str) else _hashable(v) for v in value])
+    return value
+
+
+class _StageTimer:
+    """Per-stage wall time (milliseconds, monotonic clock) of one analysis"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter() if enabled else 0.0
+
+    def lap(self, stage: str) -> None:
+        """Record the time since the previous lap as a stage"""
+        if self.enabled:
+            now = time.perf_counter()
+            self.timings[stage] = round((now - self._last) * 1000, 3)
+            self._last = now
+
+    def finish(self) -> Dict[str, float]:
+        """Record the total and return the stage timings (empty when disabled)"""
+        if self.enabled:
+            self.timings["total"] = round((time.perf_counter() - self._start) * 1000, 3)
+        return self.timings
+
+
 class SymptomAnalyzer:
     """
     Core symptom analysis logic with MeTTa integration
     Performs pattern matching, urgency assessment, and differential diagnosis
     """
 
-    def __init__(self, metta_engine: MeTTaQueryEngine):
+    # Number of differential diagnoses reported
+    MAX_DIFFERENTIALS = 5
+
+    # Conditions at or below this confidence cannot change the urgency level
+    # (see assess_urgency), so they may be skipped when outside the top-k
+    PRUNE_CONFIDENCE_CEILING = 0.3
+
+    def __init__(
+        self,
+        metta_engine: MeTTaQueryEngine,
+        result_cache: Optional[QueryCache] = None,
+        record_timings: bool = False,
+    ):
+        """
+        Args:
+            metta_engine: Knowledge base engine
+            result_cache: Cache for analyze_cached() results (optional); must
+                only ever be used with this engine
+            record_timings: Report per-stage timings in analysis results
+        """
         self.metta = metta_engine
+        self.result_cache = result_cache
+        self.record_timings = record_timings
 
     def analyze_symptoms(
         self,
@@ -107,68 +379,122 @@ class SymptomAnalyzer:
         - urgency_level: str
         - red_flags: List[str]
         - differential_diagnoses: List[str]
-        - confidence_scores: Dict[str, float]
-        - risk_adjustments: Dict[str, Dict] (EPIC 7 - Phase 2)
+        - confidence_scores: Dict[str, float] (the top MAX_DIFFERENTIALS and every
+          condition above PRUNE_CONFIDENCE_CEILING; lower-scoring conditions may be left out)
+        - risk_adjustments: Dict[str, Dict] (EPIC 7 - Phase 2, same conditions as confidence_scores)
         - attribute_matches: Dict[str, Dict] (EPIC 7 - Phase 3)
         - reasoning_chain: List[str]
         - recommended_next_step: str
+        - kb_version: int (knowledge base version the analysis ran against)
+        - timings: Dict[str, float] (stage -> milliseconds, empty unless record_timings)
         """
-        reasoning_chain = []
-        reasoning_chain.append(f"🔬 Analyzing {len(symptoms)} symptoms: {', '.join(symptoms)}")
-
-        # Patient risk profile for EPIC 7 Phase 2
-        if age:
-            reasoning_chain.append(f"👤 Patient age: {age} years")
-        if medical_history:
-            reasoning_chain.append(f"📋 Medical history: {', '.join(medical_history)}")
+        timer = _StageTimer(self.record_timings)
+        kb_version = self.metta.kb_version
 
         # Step 1: Detect red flags immediately
         red_flags = self.detect_red_flags(symptoms)
-        if red_flags:
-            reasoning_chain.append(f"⚠️ RED FLAGS DETECTED: {', '.join(red_flags)}")
+        timer.lap("red_flags")
 
         # Step 2: Match symptom attributes (EPIC 7 - Phase 3)
         attribute_matches = {}
         if symptom_attributes:
-            reasoning_chain.append("🎯 Matching symptom attributes for precision diagnosis...")
             attribute_matches = self._match_symptom_attributes(symptom_attributes)
-
-            # Log attribute match summary
-            high_quality_matches = sum(1 for m in attribute_matches.values() if m['match_score'] >= 0.7)
-            if high_quality_matches > 0:
-                reasoning_chain.append(f"✓ High-quality attribute matches: {high_quality_matches}/{len(attribute_matches)}")
+        timer.lap("attribute_match")
 
         # Step 3: Find matching conditions
-        reasoning_chain.append("🔍 Querying MeTTa knowledge base for matching conditions...")
         condition_matches = self.find_matching_conditions(symptoms)
-        reasoning_chain.append(f"📊 Found {len(condition_matches)} potential conditions")
+        timer.lap("condition_match")
 
         # Step 4: Calculate confidence scores with risk adjustment (EPIC 7 - Phase 2 + 3)
+        # Conditions that can reach neither the differential nor urgency are skipped
         confidence_scores, risk_adjustments = self.calculate_confidence_scores(
-            symptoms, condition_matches, severity_scores, age, medical_history, attribute_matches
+            symptoms, condition_matches, severity_scores, age, medical_history, attribute_matches,
+            top_k=self.MAX_DIFFERENTIALS,
         )
 
-        # Add risk-adjusted reasoning
-        high_risk_conditions = [
-            cond for cond, adjustment in risk_adjustments.items()
-            if adjustment.get('risk_multiplier', 1.0) > 1.5
-        ]
-        if high_risk_conditions:
-            reasoning_chain.append(f"⚡ Risk factors detected for: {', '.join(high_risk_conditions[:3])}")
+        # Risk-adjusted reasoning covers every matched condition, including
+        # those pruned from confidence_scores
+        high_risk_conditions = self._high_risk_conditions(
+            condition_matches, risk_adjustments, age, medical_history
+        )
+        timer.lap("confidence_scoring")
 
         # Step 5: Assess urgency level
         urgency_level = self.assess_urgency(
             condition_matches, red_flags, confidence_scores, age
         )
-        reasoning_chain.append(f"🚨 Urgency Assessment: {urgency_level.upper()}")
+        timer.lap("urgency")
 
         # Step 6: Generate differential diagnoses (top 2-5)
         differential_diagnoses = self.generate_differential_diagnoses(
-            confidence_scores, max_count=5
+            confidence_scores, max_count=self.MAX_DIFFERENTIALS
         )
+        timer.lap("differential")
+
+        result = self._analysis_result(
+            symptoms=symptoms,
+            age=age,
+            medical_history=medical_history,
+            symptom_attributes=symptom_attributes,
+            red_flags=red_flags,
+            attribute_matches=attribute_matches,
+            condition_count=len(condition_matches),
+            confidence_scores=confidence_scores,
+            risk_adjustments=risk_adjustments,
+            high_risk_conditions=high_risk_conditions,
+            urgency_level=urgency_level,
+            differential_diagnoses=differential_diagnoses,
+            kb_version=kb_version,
+        )
+        result["timings"] = timer.finish()
+        return result
+
+    def _analysis_result(
+        self,
+        *,
+        symptoms: List[str],
+        age: Optional[int],
+        medical_history: Optional[List[str]],
+        symptom_attributes: Optional[Dict[str, Dict[str, str]]],
+        red_flags: List[str],
+        attribute_matches: Dict[str, Dict],
+        condition_count: int,
+        confidence_scores: Dict[str, float],
+        risk_adjustments: Dict[str, Dict],
+        high_risk_conditions: List[str],
+        urgency_level: str,
+        differential_diagnoses: List[str],
+        kb_version: int,
+    ) -> Dict:
+        """Assemble the reasoning chain, next step and result dict of an analysis (without timings)"""
+        reasoning_chain = [f"🔬 Analyzing {len(symptoms)} symptoms: {', '.join(symptoms)}"]
+
+        # Patient risk profile for EPIC 7 Phase 2
+        if age:
+            reasoning_chain.append(_age_reasoning(age))
+        if medical_history:
+            reasoning_chain.append(f"📋 Medical history: {', '.join(medical_history)}")
+
+        if red_flags:
+            reasoning_chain.append(f"⚠️ RED FLAGS DETECTED: {', '.join(red_flags)}")
+
+        if symptom_attributes:
+            reasoning_chain.append("🎯 Matching symptom attributes for precision diagnosis...")
+            # Log attribute match summary
+            high_quality_matches = sum(1 for m in attribute_matches.values() if m['match_score'] >= 0.7)
+            if high_quality_matches > 0:
+                reasoning_chain.append(f"✓ High-quality attribute matches: {high_quality_matches}/{len(attribute_matches)}")
+
+        reasoning_chain.append("🔍 Querying MeTTa knowledge base for matching conditions...")
+        reasoning_chain.append(f"📊 Found {condition_count} potential conditions")
+
+        if high_risk_conditions:
+            reasoning_chain.append(f"⚡ Risk factors detected for: {', '.join(high_risk_conditions[:3])}")
+
+        reasoning_chain.append(f"🚨 Urgency Assessment: {urgency_level.upper()}")
         reasoning_chain.append(f"🎯 Top differential diagnoses: {', '.join(differential_diagnoses[:3])}")
 
-        # Step 7: Recommend next step based on urgency
+        # Recommend next step based on urgency
         recommended_next_step = self.recommend_action(urgency_level, red_flags)
         reasoning_chain.append(f"💡 Recommendation: {recommended_next_step}")
 
@@ -181,46 +507,200 @@ class SymptomAnalyzer:
             "attribute_matches": attribute_matches,  # EPIC 7 - Phase 3
             "reasoning_chain": reasoning_chain,
             "recommended_next_step": recommended_next_step,
+            "kb_version": kb_version,
+            "timings": {},
         }
 
-    def detect_red_flags(self, symptoms: List[str]) -> List[str]:
+    def analyze_batch(self, patients: List[Dict[str, Any]]) -> List[Dict]:
         """
-        Detect critical warning symptoms that require immediate attention
-        Uses MeTTa to query for red flag symptoms
+        Analyze many patients at once (offline re-scoring and traffic replay)
+
+        Each analysis stage runs over the whole batch against knowledge base
+        tables fetched once (see _BatchSymptomAnalyzer), and per-patient
+        results are assembled at the end; identical patient records are
+        analyzed once.
+
+        Args:
+            patients: One dict per patient with analyze_symptoms() keyword
+                arguments: symptoms (required), age, severity_scores,
+                medical_history, symptom_attributes
+
+        Returns:
+            analyze_symptoms() results, in input order. Nested values may be
+            shared between results and must not be modified; timings (if
+            record_timings) are those of the whole batch.
         """
-        red_flags = []
+        return _BatchSymptomAnalyzer(self.metta, self.record_timings).analyze(patients)
 
-        # Query MeTTa for red flag symptoms
-        all_red_flags = self.metta.find_red_flag_symptoms()
+    def analyze_cached(
+        self,
+        symptoms: List[str],
+        age: Optional[int] = None,
+        severity_scores: Optional[Dict[str, int]] = None,
+        medical_history: Optional[List[str]] = None,
+        symptom_attributes: Optional[Dict[str, Dict[str, str]]] = None,
+        session: Optional[AnalysisSession] = None,
+    ) -> Dict:
+        """
+        Analyze a patient record, memoizing results by its canonical form
 
-        # Check if any patient symptoms match red flags
-        for symptom in symptoms:
-            symptom_normalized = symptom.lower().replace(" ", "-").replace("_", "-")
-            if symptom_normalized in all_red_flags:
-                red_flags.append(symptom)
+        The record is analyzed as given, with names normalized to KB form
+        (see normalize_analysis_request). Records with the same canonical
+        form (see canonicalize_analysis_request) share one cache entry until
+        the knowledge base version changes, so a reordered repeat gets the
+        reasoning chain of the record that filled the cache (with its own
+        age, which may differ within the age band). Nested values of the
+        returned dict are shared with the cache and must be treated as
+        read-only.
+
+        Args:
+            symptoms, age, severity_scores, medical_history, symptom_attributes:
+                Same as analyze_symptoms()
+            session: Analyze cache misses incrementally within this session, and
+                record hits as its latest turn (optional)
+
+        Returns:
+            Same as analyze_symptoms() for the normalized record, or for the
+            equivalent record that filled the cache (a cache hit's timings
+            only cover the cache lookup)
+        """
+        timer = _StageTimer(self.record_timings)
+        record = normalize_analysis_request(
+            symptoms, age, severity_scores, medical_history, symptom_attributes
+        )
+        cache = self.result_cache
+        key = (self.metta.kb_version, _hashable(canonicalize_analysis_request(**record)))
+        if cache is not None:
+            hit, result = cache.get(key)
+            if hit:
+                if session is not None:
+                    self._record_cached_turn(session, result, **record)
+                result = dict(result)
+                if age:
+                    # Same band, so the age line follows the opening line in both
+                    result["reasoning_chain"] = [
+                        result["reasoning_chain"][0], _age_reasoning(age), *result["reasoning_chain"][2:]
+                    ]
+                # Timings describe this request, not the one that filled the cache
+                timer.lap("cache_lookup")
+                result["timings"] = timer.finish()
+                return result
+
+        if session is not None:
+            result = self.analyze_incremental(session, **record)
+        else:
+            result = self.analyze_symptoms(**record)
+
+        if cache is not None:
+            # Keyed by the version the analysis actually ran against
+            cache.set((result["kb_version"], key[1]), result)
+        return dict(result)
+
+    def analyze_incremental(
+        self,
+        session: AnalysisSession,
+        symptoms: List[str],
+        age: Optional[int] = None,
+        severity_scores: Optional[Dict[str, int]] = None,
+        medical_history: Optional[List[str]] = None,
+        symptom_attributes: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> Dict:
+        """
+        Analyze a session's current patient record, reusing the previous turn
 
-        # Pattern matching for critical combinations
-        symptom_set = set(s.lower() for s in symptoms)
+        Takes the full record (as analyze_symptoms() does) and diffs it
+        against the session's previous turn. Only conditions that have an
+        added, removed or re-rated symptom are rescored; an age or medical
+        history change rescores every condition, and a knowledge base
+        change starts the session over.
 
-        # Meningitis triad: severe headache + fever + neck stiffness/stiff neck
-        normalized_symptom_set = set(s.replace(" ", "-") for s in symptom_set)
-        has_headache = any(s in normalized_symptom_set for s in ["severe-headache", "headache"])
-        has_fever = "fever" in normalized_symptom_set or "high-fever" in normalized_symptom_set
-        has_stiff_neck = any(s in normalized_symptom_set for s in ["neck-stiffness", "stiff-neck", "neck-pain"])
+        Args:
+            session: Session state from get_analysis_session()
+            symptoms, age, severity_scores, medical_history, symptom_attributes:
+                Same as analyze_symptoms()
 
-        if has_headache and has_fever and has_stiff_neck:
-            red_flags.append("Meningitis triad (headache + fever + neck stiffness)")
+        Returns:
+            Same as analyze_symptoms()
+        """
+        with session.lock:
+            kb_version = self.metta.kb_version
+            if session.kb_version != kb_version:
+                session.reset(kb_version)
+
+            normalized_symptoms = set(_normalize_symptom(s) for s in symptoms)
+            severity = dict(severity_scores or {})
+            attributes = {s: dict(a) for s, a in (symptom_attributes or {}).items()}
+            profile = (age, tuple(medical_history or ()))
+
+            affected: Optional[Set[str]] = None  # None: rescore everything
+            if session.turns and profile == session.profile and bool(severity) == bool(session.severity_scores):
+                # Severity weighting switches on/off for every condition at once
+                changed = normalized_symptoms ^ session.symptoms
+                changed.update(
+                    s for s in severity.keys() | session.severity_scores.keys()
+                    if severity.get(s) != session.severity_scores.get(s)
+                )
+                changed.update(
+                    _normalize_symptom(s).replace("_", "-")
+                    for s in attributes.keys() | session.symptom_attributes.keys()
+                    if attributes.get(s) != session.symptom_attributes.get(s)
+                )
+                affected = set(self.metta.get_symptom_matrix().conditions_with_any(changed))
+
+            analyzer = _SessionSymptomAnalyzer(self.metta, session, affected, self.record_timings)
+            try:
+                result = analyzer.analyze_symptoms(
+                    symptoms=symptoms,
+                    age=age,
+                    severity_scores=severity_scores,
+                    medical_history=medical_history,
+                    symptom_attributes=symptom_attributes,
+                )
+            except Exception:
+                # Partially updated state must not leak into the next turn
+                session.reset(kb_version)
+                raise
+
+            session.record_turn(
+                symptoms, age, severity_scores, medical_history, symptom_attributes,
+                analyzer.condition_results, analyzer.reused_count,
+            )
+            return result
 
-        # Stroke FAST: face drooping, arm weakness, speech difficulty
-        stroke_symptoms = ["face-drooping", "arm-weakness", "speech-difficulty", "sudden-weakness"]
-        if any(s.replace(" ", "-") in stroke_symptoms for s in symptom_set):
-            red_flags.append("Stroke warning signs (FAST protocol)")
+    def _record_cached_turn(self, session: AnalysisSession, result: Dict, **record: Any) -> None:
+        """
+        Record a cached analysis of a normalized record as the session's latest turn
 
-        # Cardiac symptoms
-        if "chest-pain" in [s.replace(" ", "-") for s in symptom_set]:
-            red_flags.append("Chest pain (potential cardiac emergency)")
+        Every condition score of the result counts as reused, and the
+        result's scores and attribute matches seed the next turn's
+        incremental analysis just like a turn analyzed in the session.
+        """
+        with session.lock:
+            if session.kb_version != result["kb_version"]:
+                session.reset(result["kb_version"])
+
+            risk_adjustments = result["risk_adjustments"]
+            condition_results = {
+                condition: (confidence, risk_adjustments[condition])
+                for condition, confidence in result["confidence_scores"].items()
+            }
+            # The record's symptom names are already in KB form
+            attribute_matches = result["attribute_matches"]
+            session.attribute_matches = {
+                symptom: (dict(attrs), {symptom: attribute_matches[symptom]})
+                for symptom, attrs in (record["symptom_attributes"] or {}).items()
+                if symptom in attribute_matches
+            }
+            session.record_turn(**record, condition_results=condition_results,
+                                reused_count=len(condition_results))
 
-        return red_flags
+    def detect_red_flags(self, symptoms: List[str]) -> List[str]:
+        """
+        Detect critical warning symptoms that require immediate attention
+        Uses the red-flag symptoms and combination rules (meningitis triad,
+        FAST stroke signs, ...) from MeTTa, compiled once per KB version
+        """
+        return self.metta.get_red_flag_matcher().detect(symptoms)
 
     def find_matching_conditions(self, symptoms: List[str]) -> List[str]:
         """
@@ -232,9 +712,9 @@ class SymptomAnalyzer:
             s.lower().replace(" ", "-").replace("_", "-") for s in symptoms
         ]
 
-        # Query MeTTa for conditions matching these symptoms
-        # Returns dict: {'condition': match_count, ...}
-        results = self.metta.find_conditions_by_symptoms(normalized_symptoms)
+        # Score all conditions against the full symptom set in one pass
+        # Returns dict: {'condition': {'match_count': N, 'matched_symptoms': [...]}, ...}
+        results = self.metta.score_conditions_by_symptoms(normalized_symptoms)
 
         # Extract condition names from dictionary keys
         conditions = list(results.keys()) if results else []
@@ -249,6 +729,7 @@ class SymptomAnalyzer:
         age: Optional[int] = None,
         medical_history: Optional[List[str]] = None,
         attribute_matches: Optional[Dict[str, Dict]] = None,
+        top_k: Optional[int] = None,
     ) -> Tuple[Dict[str, float], Dict[str, Dict]]:
         """
         Calculate confidence score for each possible condition (EPIC 7 - Phase 2+3 Enhanced)
@@ -257,80 +738,245 @@ class SymptomAnalyzer:
         Args:
             attribute_matches: Dict mapping symptoms to their attribute match details
                 Format: {symptom: {match_score: 0.8, matched_attrs: [...], total_attrs: N}}
+            top_k: Only the top_k conditions are needed (e.g. for the differential).
+                Conditions are scored in order of their upper-bound confidence, and
+                the rest are skipped once no remaining condition can reach the top_k
+                or affect urgency (confidence above PRUNE_CONFIDENCE_CEILING)
 
         Returns:
-            Tuple of (confidence_scores, risk_adjustments)
+            Tuple of (confidence_scores, risk_adjustments), in conditions order
             - confidence_scores: Dict[condition, final_confidence]
             - risk_adjustments: Dict[condition, {risk_multiplier, matched_factors, base_confidence, attribute_boost}]
         """
+        # Base match ratios for every condition from the incidence matrix in one pass
+        matrix = self.metta.get_symptom_matrix()
+        normalized_patient_symptoms = set(
+            s.lower().replace(" ", "-") for s in symptoms
+        )
+        symptom_scores = matrix.score(normalized_patient_symptoms)
+
+        def score(condition: str) -> Tuple[float, Dict]:
+            return self._score_condition(
+                condition, matrix, symptom_scores.get(condition),
+                severity_scores, age, medical_history, attribute_matches
+            )
+
+        if top_k is None:
+            scored = {condition: score(condition) for condition in conditions}
+        else:
+            bounds = self._confidence_upper_bounds(
+                conditions, symptom_scores, severity_scores, attribute_matches
+            )
+            scored = self._score_top_k(conditions, bounds, top_k, score)
+
         confidence_scores = {}
         risk_adjustments = {}
+        for condition in conditions:
+            if condition in scored:
+                confidence_scores[condition], risk_adjustments[condition] = scored[condition]
+
+        return confidence_scores, risk_adjustments
+
+    def _score_top_k(
+        self,
+        conditions: List[str],
+        bounds: List[float],
+        top_k: int,
+        score: Callable[[str], Tuple[float, Dict]],
+    ) -> Dict[str, Tuple[float, Dict]]:
+        """
+        Score conditions by descending upper bound until none left can matter
+
+        Stops once no remaining condition can reach the top_k or affect
+        urgency (confidence above PRUNE_CONFIDENCE_CEILING).
 
+        Args:
+            conditions: Candidate conditions
+            bounds: Upper bound of each condition's confidence (same order)
+            top_k: Number of top conditions needed
+            score: Scores one condition, returning (confidence, risk_adjustment)
+
+        Returns:
+            Scores of the visited conditions
+        """
+        if len(conditions) <= top_k:
+            # Every condition is in the top_k
+            return {condition: score(condition) for condition in conditions}
+
+        # Visit conditions by descending upper bound (a stable sort, so ties
+        # keep conditions order); `best` holds the top_k confidences found
+        # so far (min-heap)
+        best: List[float] = []
+        scored: Dict[str, Tuple[float, Dict]] = {}
+
+        for position in sorted(range(len(conditions)), key=bounds.__getitem__, reverse=True):
+            if len(best) >= top_k:
+                # Best confidence this (and every remaining) condition could round to
+                reachable = round(bounds[position] + 1e-9, 2)
+                if reachable < best[0] and reachable <= self.PRUNE_CONFIDENCE_CEILING:
+                    break
+
+            condition = conditions[position]
+            scored[condition] = score(condition)
+            if len(best) < top_k:
+                heapq.heappush(best, scored[condition][0])
+            else:
+                heapq.heappushpop(best, scored[condition][0])
+
+        return scored
+
+    def _confidence_upper_bounds(
+        self,
+        conditions: List[str],
+        symptom_scores: Dict[str, Dict[str, Any]],
+        severity_scores: Optional[Dict[str, int]] = None,
+        attribute_matches: Optional[Dict[str, Dict]] = None,
+        risk_table: Optional[RiskTable] = None,
+    ) -> List[float]:
+        """
+        Upper bound of each condition's confidence, without risk or attribute scoring
+
+        Uses the exact match ratio, the highest possible severity weight, the
+        condition's highest possible risk multiplier and the maximum 20%
+        attribute boost.
+        """
+        severity_bound = 1.0
+        if severity_scores:
+            severity_bound = 0.5 + max([5, *severity_scores.values()]) / 20.0
+        attribute_bound = 1.2 if attribute_matches else 1.0
+        if risk_table is None:
+            risk_table = self.metta.get_risk_table()
+
+        bounds = []
         for condition in conditions:
-            # Get all symptoms for this condition from MeTTa
-            condition_symptoms = self.metta.find_symptoms_by_condition(condition)
-
-            if not condition_symptoms:
-                confidence_scores[condition] = 0.0
-                risk_adjustments[condition] = {
-                    'risk_multiplier': 1.0,
-                    'matched_factors': [],
-                    'base_confidence': 0.0
-                }
-                continue
+            score = symptom_scores.get(condition)
+            match_ratio = score['match_ratio'] if score else 0.0
+            bound = match_ratio * severity_bound * risk_table.max_multiplier(condition) * attribute_bound
+            bounds.append(min(bound, 0.99))
+        return bounds
 
-            # Calculate base match score (% of condition symptoms present)
-            normalized_patient_symptoms = set(
-                s.lower().replace(" ", "-") for s in symptoms
-            )
-            matched_symptoms = normalized_patient_symptoms.intersection(
-                set(condition_symptoms)
-            )
-            match_ratio = len(matched_symptoms) / len(condition_symptoms)
-
-            # Apply severity weighting if available
-            severity_weight = 1.0
-            if severity_scores:
-                avg_severity = sum(
-                    severity_scores.get(s, 5) for s in matched_symptoms
-                ) / max(len(matched_symptoms), 1)
-                severity_weight = 0.5 + (avg_severity / 20.0)  # 0.5-1.0 range
-
-            # Base confidence before adjustments
-            base_confidence = match_ratio * severity_weight
-
-            # EPIC 7 - Phase 2: Calculate risk multiplier
-            risk_multiplier, matched_risk_factors = self._calculate_risk_multiplier(
-                condition, age, medical_history
-            )
+    def _score_condition(
+        self,
+        condition: str,
+        matrix: SymptomMatrix,
+        score: Optional[Dict[str, Any]],
+        severity_scores: Optional[Dict[str, int]] = None,
+        age: Optional[int] = None,
+        medical_history: Optional[List[str]] = None,
+        attribute_matches: Optional[Dict[str, Dict]] = None,
+    ) -> Tuple[float, Dict]:
+        """
+        Score one condition (see calculate_confidence_scores)
 
-            # EPIC 7 - Phase 3: Apply attribute matching boost
-            attribute_boost = 1.0
-            if attribute_matches:
-                # Calculate average attribute match score for matched symptoms
-                matched_symptom_scores = []
-                for symptom in matched_symptoms:
-                    if symptom in attribute_matches:
-                        matched_symptom_scores.append(attribute_matches[symptom]['match_score'])
-
-                if matched_symptom_scores:
-                    avg_attr_match = sum(matched_symptom_scores) / len(matched_symptom_scores)
-                    # Boost confidence by 0-20% based on attribute match quality
-                    attribute_boost = 1.0 + (avg_attr_match * 0.2)
-
-            # Apply all adjustments (capped at 0.99 to avoid overconfidence)
-            final_confidence = min(base_confidence * risk_multiplier * attribute_boost, 0.99)
-            confidence_scores[condition] = round(final_confidence, 2)
-
-            # Track adjustment details
-            risk_adjustments[condition] = {
-                'risk_multiplier': round(risk_multiplier, 2),
-                'matched_factors': matched_risk_factors,
-                'base_confidence': round(base_confidence, 2),
-                'attribute_boost': round(attribute_boost, 2)  # EPIC 7 - Phase 3
+        Args:
+            score: The condition's SymptomMatrix score (None if no symptom matched)
+
+        Returns:
+            Tuple of (final_confidence, risk_adjustment)
+        """
+        if not matrix.symptom_count(condition):
+            return 0.0, {
+                'risk_multiplier': 1.0,
+                'matched_factors': [],
+                'base_confidence': 0.0
             }
 
-        return confidence_scores, risk_adjustments
+        # Base match score (% of condition symptoms present)
+        matched_symptoms = matrix.decode(score['matched_mask']) if score else []
+        match_ratio = score['match_ratio'] if score else 0.0
+
+        # EPIC 7 - Phase 2: Calculate risk multiplier
+        risk_multiplier, matched_risk_factors = self._calculate_risk_multiplier(
+            condition, age, medical_history
+        )
+        return self._adjusted_confidence(
+            match_ratio, matched_symptoms, risk_multiplier, matched_risk_factors,
+            severity_scores, attribute_matches
+        )
+
+    @staticmethod
+    def _adjusted_confidence(
+        match_ratio: float,
+        matched_symptoms: List[str],
+        risk_multiplier: float,
+        matched_risk_factors: List[str],
+        severity_scores: Optional[Dict[str, int]] = None,
+        attribute_matches: Optional[Dict[str, Dict]] = None,
+    ) -> Tuple[float, Dict]:
+        """
+        Apply severity weighting, risk and attribute boost to a match ratio
+
+        Returns:
+            Tuple of (final_confidence, risk_adjustment)
+        """
+        # Apply severity weighting if available
+        severity_weight = 1.0
+        if severity_scores:
+            avg_severity = sum(
+                severity_scores.get(s, 5) for s in matched_symptoms
+            ) / max(len(matched_symptoms), 1)
+            severity_weight = 0.5 + (avg_severity / 20.0)  # 0.5-1.0 range
+
+        # Base confidence before adjustments
+        base_confidence = match_ratio * severity_weight
+
+        # EPIC 7 - Phase 3: Apply attribute matching boost
+        attribute_boost = 1.0
+        if attribute_matches:
+            # Calculate average attribute match score for matched symptoms
+            matched_symptom_scores = []
+            for symptom in matched_symptoms:
+                if symptom in attribute_matches:
+                    matched_symptom_scores.append(attribute_matches[symptom]['match_score'])
+
+            if matched_symptom_scores:
+                avg_attr_match = sum(matched_symptom_scores) / len(matched_symptom_scores)
+                # Boost confidence by 0-20% based on attribute match quality
+                attribute_boost = 1.0 + (avg_attr_match * 0.2)
+
+        # Apply all adjustments (capped at 0.99 to avoid overconfidence)
+        final_confidence = min(base_confidence * risk_multiplier * attribute_boost, 0.99)
+
+        # Track adjustment details
+        return round(final_confidence, 2), {
+            'risk_multiplier': round(risk_multiplier, 2),
+            'matched_factors': matched_risk_factors,
+            'base_confidence': round(base_confidence, 2),
+            'attribute_boost': round(attribute_boost, 2)  # EPIC 7 - Phase 3
+        }
+
+    def _high_risk_conditions(
+        self,
+        conditions: List[str],
+        risk_adjustments: Dict[str, Dict],
+        age: Optional[int] = None,
+        medical_history: Optional[List[str]] = None,
+        risk_table: Optional[RiskTable] = None,
+        matrix: Optional[SymptomMatrix] = None,
+    ) -> List[str]:
+        """
+        Conditions whose risk multiplier rounds above 1.5, scored or not
+
+        Conditions pruned from risk_adjustments are only risk scored when
+        their highest possible multiplier (RiskTable.max_multiplier) is
+        above 1.5, so pruning still skips the rest.
+        """
+        if risk_table is None:
+            risk_table = self.metta.get_risk_table()
+        if matrix is None:
+            matrix = self.metta.get_symptom_matrix()
+        high_risk = []
+        for condition in conditions:
+            adjustment = risk_adjustments.get(condition)
+            if adjustment is not None:
+                multiplier = adjustment.get('risk_multiplier', 1.0)
+            elif round(risk_table.max_multiplier(condition), 2) <= 1.5 or not matrix.symptom_count(condition):
+                continue
+            else:
+                multiplier = round(self._calculate_risk_multiplier(condition, age, medical_history)[0], 2)
+            if multiplier > 1.5:
+                high_risk.append(condition)
+        return high_risk
 
     def _calculate_risk_multiplier(
         self,
@@ -346,61 +992,14 @@ class SymptomAnalyzer:
             - risk_multiplier: 1.0 (no risk) to 2.5+ (very high risk)
             - matched_risk_factors: List of matched risk factor names
         """
-        # Get all risk factors for this condition from KB
-        risk_factors_data = self.metta.get_risk_factors(condition)
-
-        if not risk_factors_data:
-            return 1.0, []  # No risk factors defined
-
-        # Build patient risk factor list
-        patient_risk_factors = []
-
-        # Add age-based risk factors
-        if age:
-            if age < 40:
-                patient_risk_factors.append('age-under-40')
-            elif age <= 55:
-                patient_risk_factors.append('age-40-55')
-            elif age <= 70:
-                patient_risk_factors.append('age-55-70')
-            else:
-                patient_risk_factors.extend(['age-over-70', 'age-over-65'])
-
-        # Add medical history risk factors (normalize)
-        if medical_history:
-            normalized_history = [
-                h.lower().replace(" ", "-").replace("_", "-") for h in medical_history
-            ]
-            patient_risk_factors.extend(normalized_history)
-
-        # Calculate risk score from matched factors
-        matched_factors = []
-        total_risk_score = 0.0
-
-        for rf in risk_factors_data:
-            factor_name = rf['factor']
-            multiplier = rf['multiplier']
-
-            # Check if patient has this risk factor
-            if factor_name in patient_risk_factors:
-                matched_factors.append(factor_name)
-                total_risk_score += multiplier
-
-        # Convert risk score to multiplier (1.0 = no additional risk, 2.5+ = very high risk)
-        if total_risk_score == 0:
-            risk_multiplier = 1.0  # No additional risk
-        elif total_risk_score < 3.0:
-            risk_multiplier = 1.0 + (total_risk_score / 10.0)  # 1.0-1.3 (low risk)
-        elif total_risk_score < 6.0:
-            risk_multiplier = 1.3 + (total_risk_score / 8.0)  # 1.3-2.0 (medium risk)
-        else:
-            risk_multiplier = 2.0 + (total_risk_score / 10.0)  # 2.0-2.5+ (high risk)
-
-        return risk_multiplier, matched_factors
+        # Per-KB-version risk table, memoized per (condition, patient profile)
+        profile = encode_patient_profile(age, medical_history)
+        return self.metta.get_risk_table().risk_multiplier(condition, profile)
 
     def _match_symptom_attributes(
         self,
-        patient_attributes: Dict[str, Dict[str, str]]
+        patient_attributes: Dict[str, Dict[str, str]],
+        attribute_index: Optional[SymptomAttributeIndex] = None,
     ) -> Dict[str, Dict]:
         """
         Match patient-reported symptom attributes against knowledge base (EPIC 7 - Phase 3)
@@ -414,6 +1013,8 @@ class SymptomAnalyzer:
                         "character": "crushing"
                     }
                 }
+            attribute_index: Attribute index to match against (defaults to
+                the engine's current one)
 
         Returns:
             Dict mapping symptoms to match details:
@@ -428,14 +1029,15 @@ class SymptomAnalyzer:
         """
         match_results = {}
 
+        # Precompiled per KB version; matches are memoized per (symptom, attr, value)
+        if attribute_index is None:
+            attribute_index = self.metta.get_symptom_attribute_index()
+
         for symptom, patient_attrs in patient_attributes.items():
             # Normalize symptom name
             symptom_normalized = symptom.lower().replace(" ", "-").replace("_", "-")
 
-            # Get KB attributes for this symptom
-            kb_attributes = self.metta.get_symptom_attributes(symptom_normalized)
-
-            if not kb_attributes:
+            if not attribute_index.has_attributes(symptom_normalized):
                 # No KB attributes available for this symptom
                 match_results[symptom_normalized] = {
                     'match_score': 0.5,  # Neutral score when no KB data
@@ -446,36 +1048,17 @@ class SymptomAnalyzer:
                 }
                 continue
 
-            # Match patient attributes against KB attributes
+            # Match patient attributes against KB attribute types
+            # (e.g., "duration" -> "duration-typical", "location" -> "location-primary")
             matched_attrs = []
             mismatched_attrs = []
 
             for attr_key, patient_value in patient_attrs.items():
-                # Normalize patient value
-                patient_value_normalized = patient_value.lower().replace(" ", "-").replace("_", "-")
-
-                # Find matching KB attribute types (e.g., "duration-typical", "location-primary")
-                attr_matched = False
-                for kb_attr_type, kb_values in kb_attributes.items():
-                    # Check if attribute type matches (e.g., "duration" in "duration-typical")
-                    if attr_key.lower() in kb_attr_type.lower():
-                        # Check if patient value matches any KB value for this attribute
-                        for kb_value in kb_values:
-                            kb_value_normalized = kb_value.lower()
-
-                            # Flexible matching: check substring or exact match
-                            if (patient_value_normalized in kb_value_normalized or
-                                kb_value_normalized in patient_value_normalized or
-                                patient_value_normalized == kb_value_normalized):
-                                matched_attrs.append(kb_attr_type)
-                                attr_matched = True
-                                break
-
-                        if attr_matched:
-                            break
-
-                if not attr_matched:
+                kb_attr_type = attribute_index.match(symptom_normalized, attr_key, patient_value)
+                if kb_attr_type is None:
                     mismatched_attrs.append(attr_key)
+                else:
+                    matched_attrs.append(kb_attr_type)
 
             # Calculate match score
             total_patient_attrs = len(patient_attrs)
@@ -513,53 +1096,71 @@ class SymptomAnalyzer:
         if red_flags:
             return "emergency"
 
-        # Check urgency level of top conditions from MeTTa
-        emergency_conditions = self.metta.find_emergency_conditions()
+        # Condition urgency facts, precomputed once per KB version
+        triage_table = self.metta.get_triage_table()
 
         # Track highest urgency found
         highest_urgency = "routine"
 
         for condition, confidence in confidence_scores.items():
-            # High confidence threshold for emergency (50%+)
-            if confidence > 0.5:
-                # Query urgency level from MeTTa
-                urgency = self.metta.find_urgency_level(condition)
-
-                if urgency == "emergency" or condition in emergency_conditions:
+            # Conditions at or below 30% confidence never raise urgency
+            if confidence > 0.3:
+                high_confidence_level, medium_confidence_level = self._condition_urgency(
+                    triage_table, condition
+                )
+                level = high_confidence_level if confidence > 0.5 else medium_confidence_level
+                if level == "emergency":
                     return "emergency"
+                if level == "urgent":
+                    highest_urgency = "urgent"
 
-                # Check time sensitivity for high-confidence conditions
-                time_sensitive = self.metta.check_time_sensitivity(condition)
-                if time_sensitive and time_sensitive <= 6:  # <6 hours critical
-                    return "emergency"
+        return self._age_adjusted_urgency(highest_urgency, confidence_scores, age)
 
-                if urgency == "urgent-24h":
-                    highest_urgency = "urgent"
+    @staticmethod
+    def _condition_urgency(triage_table: TriageTable, condition: str) -> Tuple[str, str]:
+        """
+        Urgency a condition calls for at high and at medium confidence
 
-            # Medium confidence threshold for urgent (30%+)
-            elif confidence > 0.3:
-                urgency = self.metta.find_urgency_level(condition)
+        Returns:
+            Tuple of (level above 50% confidence, level above 30% confidence)
+        """
+        triage = triage_table.get(condition)
+        emergency = triage.urgency == "emergency" or triage_table.is_emergency(condition)
+        time_sensitive = triage.time_sensitive_hours
+
+        # High confidence threshold for emergency (50%+)
+        if emergency or (time_sensitive and time_sensitive <= 6):  # <6 hours critical
+            high_confidence_level = "emergency"
+        elif triage.urgency == "urgent-24h":
+            high_confidence_level = "urgent"
+        else:
+            high_confidence_level = "routine"
 
-                if urgency == "emergency" or condition in emergency_conditions:
-                    highest_urgency = "urgent"  # Downgrade to urgent due to medium confidence
-                elif urgency == "urgent-24h":
-                    highest_urgency = "urgent"
+        # Medium confidence threshold for urgent (30%+); emergencies are
+        # downgraded to urgent due to medium confidence
+        if emergency or triage.urgency == "urgent-24h" or (time_sensitive and time_sensitive <= 48):
+            medium_confidence_level = "urgent"
+        else:
+            medium_confidence_level = "routine"
 
-                # Check time sensitivity for medium-confidence conditions
-                time_sensitive = self.metta.check_time_sensitivity(condition)
-                if time_sensitive and time_sensitive <= 48:  # <48 hours urgent
-                    if highest_urgency == "routine":
-                        highest_urgency = "urgent"
+        return high_confidence_level, medium_confidence_level
 
+    @staticmethod
+    def _age_adjusted_urgency(
+        urgency_level: str,
+        confidence_scores: Dict[str, float],
+        age: Optional[int] = None,
+    ) -> str:
+        """Escalate routine urgency for higher risk age groups (under 5, over 65)"""
         # Age-based risk adjustment
         if age:
             if age < 5 or age > 65:
                 # Higher risk groups - escalate urgency one level
                 if any(confidence > 0.4 for confidence in confidence_scores.values()):
-                    if highest_urgency == "routine":
-                        highest_urgency = "urgent"
+                    if urgency_level == "routine":
+                        urgency_level = "urgent"
 
-        return highest_urgency
+        return urgency_level
 
     def generate_differential_diagnoses(
         self, confidence_scores: Dict[str, float], max_count: int = 5
@@ -568,9 +1169,9 @@ class SymptomAnalyzer:
         Generate list of differential diagnoses ranked by confidence
         Returns top 2-5 most likely conditions
         """
-        # Sort by confidence descending
-        sorted_conditions = sorted(
-            confidence_scores.items(), key=lambda x: x[1], reverse=True
+        # Top conditions by confidence (ties keep insertion order, like a stable sort)
+        sorted_conditions = heapq.nlargest(
+            max(max_count, 2), confidence_scores.items(), key=lambda x: x[1]
         )
 
         # Get top conditions with confidence > 0.2
@@ -602,6 +1203,307 @@ class SymptomAnalyzer:
             return "📋 ROUTINE: Schedule appointment with primary care physician."
 
 
+class _BatchSymptomAnalyzer(SymptomAnalyzer):
+    """
+    SymptomAnalyzer used by analyze_batch()
+
+    Runs each analysis stage for every patient before the next, from the
+    red flag matcher, symptom matrix, risk table and triage table fetched
+    once, so no patient queries the knowledge base. Work shared between
+    patients is memoized: red flags and condition ranking per symptom
+    list, risk profiles per (age, medical history), urgency levels per
+    condition and, for patients without severity or attribute data, each
+    condition's score per (match count, risk profile).
+    """
+
+    def __init__(self, metta_engine: MeTTaQueryEngine, record_timings: bool = False):
+        super().__init__(metta_engine, record_timings=record_timings)
+        self.kb_version = metta_engine.kb_version
+        self.red_flag_matcher = metta_engine.get_red_flag_matcher()
+        self.matrix = metta_engine.get_symptom_matrix()
+        self.risk_table = metta_engine.get_risk_table()
+        self.triage_table = metta_engine.get_triage_table()
+        # Risk profile of the patient being scored
+        self._profile = encode_patient_profile()
+
+    def analyze(self, patients: List[Dict[str, Any]]) -> List[Dict]:
+        """Analyze a batch (see SymptomAnalyzer.analyze_batch)"""
+        timer = _StageTimer(self.record_timings)
+
+        # Identical records are analyzed once
+        record_positions: Dict[Any, int] = {}
+        positions = []
+        unique: List[Dict[str, Any]] = []
+        for patient in patients:
+            key = _hashable(patient)
+            position = record_positions.get(key)
+            if position is None:
+                position = record_positions[key] = len(unique)
+                unique.append(patient)
+            positions.append(position)
+        symptom_lists = [tuple(patient["symptoms"]) for patient in unique]
+
+        # Step 1: Detect red flags, once per distinct symptom list
+        red_flag_memo: Dict[Tuple[str, ...], List[str]] = {}
+        for symptoms in symptom_lists:
+            if symptoms not in red_flag_memo:
+                red_flag_memo[symptoms] = self.red_flag_matcher.detect(list(symptoms))
+        timer.lap("red_flags")
+
+        # Step 2: Match symptom attributes (EPIC 7 - Phase 3)
+        attribute_index = None
+        attribute_matches = []
+        for patient in unique:
+            symptom_attributes = patient.get("symptom_attributes")
+            if symptom_attributes:
+                if attribute_index is None:
+                    attribute_index = self.metta.get_symptom_attribute_index()
+                attribute_matches.append(
+                    self._match_symptom_attributes(symptom_attributes, attribute_index)
+                )
+            else:
+                attribute_matches.append({})
+        timer.lap("attribute_match")
+
+        # Step 3: Rank matching conditions from the matrix, once per distinct
+        # symptom list (same order as find_matching_conditions())
+        matching_memo: Dict[Tuple[str, ...], Tuple[Dict[str, int], List[str]]] = {}
+        for symptoms in symptom_lists:
+            if symptoms not in matching_memo:
+                counts = self.matrix.match_counts(map(normalize_symptom, symptoms))
+                # Stable sort, as in SymptomMatrix.rank()
+                matching_memo[symptoms] = counts, sorted(counts, key=counts.__getitem__, reverse=True)
+        condition_matches = [matching_memo[symptoms][1] for symptoms in symptom_lists]
+        timer.lap("condition_match")
+
+        # Step 4: Risk-adjust each patient's conditions (same normalization
+        # and pruning as calculate_confidence_scores())
+        profiles: Dict[Tuple[Any, ...], PatientProfile] = {}
+        plain_scores: Dict[Tuple[str, int, PatientProfile], Tuple[float, Tuple[float, Dict]]] = {}
+        confidence_scores = []
+        risk_adjustments = []
+        high_risk_conditions = []
+
+        for patient, symptoms, matches in zip(unique, symptom_lists, attribute_matches):
+            age = patient.get("age")
+            medical_history = patient.get("medical_history")
+            severity_scores = patient.get("severity_scores")
+            counts, conditions = matching_memo[symptoms]
+
+            profile_key = (age, tuple(medical_history or ()))
+            profile = profiles.get(profile_key)
+            if profile is None:
+                profile = profiles[profile_key] = encode_patient_profile(age, medical_history)
+            self._profile = profile
+
+            if severity_scores or matches or any("_" in s for s in symptoms):
+                # Underscores only normalize away when matching conditions,
+                # so such symptoms score as in calculate_confidence_scores()
+                scores = self.matrix.score(s.lower().replace(" ", "-") for s in symptoms)
+
+                def score(condition: str) -> Tuple[float, Dict]:
+                    return self._score_condition(
+                        condition, self.matrix, scores.get(condition),
+                        severity_scores, age, medical_history, matches
+                    )
+
+                bounds = self._confidence_upper_bounds(
+                    conditions, scores, severity_scores, matches, self.risk_table
+                )
+                scored = self._score_top_k(conditions, bounds, self.MAX_DIFFERENTIALS, score)
+                patient_confidence = {}
+                patient_adjustments = {}
+                for condition in conditions:
+                    if condition in scored:
+                        patient_confidence[condition], patient_adjustments[condition] = scored[condition]
+                patient_high_risk = self._high_risk_conditions(
+                    conditions, patient_adjustments, age, medical_history, self.risk_table, self.matrix
+                )
+            else:
+                # Without severity or attribute data a condition's bound and
+                # score only depend on its match count and the risk profile
+                entries = {}
+                for condition in conditions:
+                    key = (condition, counts[condition], profile)
+                    entry = plain_scores.get(key)
+                    if entry is None:
+                        entry = plain_scores[key] = self._plain_score(condition, counts[condition])
+                    entries[condition] = entry
+
+                scored = None
+                if len(conditions) > self.MAX_DIFFERENTIALS:
+                    scored = self._score_top_k(
+                        conditions, [entries[c][0] for c in conditions], self.MAX_DIFFERENTIALS,
+                        lambda condition: entries[condition][1],
+                    )
+                patient_confidence = {}
+                patient_adjustments = {}
+                for condition in conditions:
+                    if scored is None or condition in scored:
+                        patient_confidence[condition], patient_adjustments[condition] = entries[condition][1]
+                # Pruned conditions included (see _high_risk_conditions)
+                patient_high_risk = [
+                    c for c in conditions if entries[c][1][1]['risk_multiplier'] > 1.5
+                ]
+
+            confidence_scores.append(patient_confidence)
+            risk_adjustments.append(patient_adjustments)
+            high_risk_conditions.append(patient_high_risk)
+        timer.lap("confidence_scoring")
+
+        # Step 5: Assess urgency from each condition's triage levels
+        condition_urgency: Dict[str, Tuple[str, str]] = {}
+        urgency_levels = []
+        for patient, symptoms, patient_confidence in zip(unique, symptom_lists, confidence_scores):
+            urgency_levels.append(
+                "emergency" if red_flag_memo[symptoms]
+                else self._batch_urgency(patient_confidence, patient.get("age"), condition_urgency)
+            )
+        timer.lap("urgency")
+
+        # Step 6: Generate differential diagnoses (top 2-5)
+        differential_diagnoses = [
+            self.generate_differential_diagnoses(patient_confidence, max_count=self.MAX_DIFFERENTIALS)
+            for patient_confidence in confidence_scores
+        ]
+        timer.lap("differential")
+        timings = timer.finish()
+
+        analyzed = []
+        for index, patient in enumerate(unique):
+            result = self._analysis_result(
+                symptoms=patient["symptoms"],
+                age=patient.get("age"),
+                medical_history=patient.get("medical_history"),
+                symptom_attributes=patient.get("symptom_attributes"),
+                red_flags=list(red_flag_memo[symptom_lists[index]]),
+                attribute_matches=attribute_matches[index],
+                condition_count=len(condition_matches[index]),
+                confidence_scores=confidence_scores[index],
+                risk_adjustments=risk_adjustments[index],
+                high_risk_conditions=high_risk_conditions[index],
+                urgency_level=urgency_levels[index],
+                differential_diagnoses=differential_diagnoses[index],
+                kb_version=self.kb_version,
+            )
+            result["timings"] = dict(timings)
+            analyzed.append(result)
+
+        # Repeated records: same analysis, separate top-level dicts
+        results = []
+        returned = [False] * len(analyzed)
+        for position in positions:
+            results.append(dict(analyzed[position]) if returned[position] else analyzed[position])
+            returned[position] = True
+        return results
+
+    def _plain_score(self, condition: str, match_count: int) -> Tuple[float, Tuple[float, Dict]]:
+        """
+        Confidence upper bound and score of a condition for a patient without
+        severity or attribute data (see _confidence_upper_bounds and _score_condition)
+
+        Returns:
+            Tuple of (upper_bound, (final_confidence, risk_adjustment))
+        """
+        match_ratio = self.matrix.match_ratio(condition, match_count)
+        bound = min(match_ratio * self.risk_table.max_multiplier(condition), 0.99)
+        risk_multiplier, matched_risk_factors = self.risk_table.risk_multiplier(condition, self._profile)
+        return bound, self._adjusted_confidence(match_ratio, [], risk_multiplier, matched_risk_factors)
+
+    def _batch_urgency(
+        self,
+        confidence_scores: Dict[str, float],
+        age: Optional[int],
+        condition_urgency: Dict[str, Tuple[str, str]],
+    ) -> str:
+        """assess_urgency() for a patient without red flags, memoizing condition levels"""
+        highest_urgency = "routine"
+        for condition, confidence in confidence_scores.items():
+            if confidence > 0.3:
+                levels = condition_urgency.get(condition)
+                if levels is None:
+                    levels = condition_urgency[condition] = self._condition_urgency(
+                        self.triage_table, condition
+                    )
+                level = levels[0] if confidence > 0.5 else levels[1]
+                if level == "emergency":
+                    return "emergency"
+                if level == "urgent":
+                    highest_urgency = "urgent"
+        return self._age_adjusted_urgency(highest_urgency, confidence_scores, age)
+
+    def _calculate_risk_multiplier(
+        self,
+        condition: str,
+        age: Optional[int] = None,
+        medical_history: Optional[List[str]] = None,
+    ) -> Tuple[float, List[str]]:
+        # The profile of the patient being scored, encoded once per patient
+        return self.risk_table.risk_multiplier(condition, self._profile)
+
+
+class _SessionSymptomAnalyzer(SymptomAnalyzer):
+    """
+    SymptomAnalyzer used by analyze_incremental()
+
+    Reuses the session's previous condition scores and attribute matches,
+    recomputing only what the turn's delta affects.
+    """
+
+    def __init__(
+        self,
+        metta_engine: MeTTaQueryEngine,
+        session: AnalysisSession,
+        affected: Optional[Set[str]],
+        record_timings: bool = False,
+    ):
+        super().__init__(metta_engine, record_timings=record_timings)
+        self.session = session
+        self.affected = affected
+        # This turn's scores, becoming the session's on success
+        self.condition_results: Dict[str, Tuple[float, Dict]] = {}
+        self.reused_count = 0
+
+    def _score_condition(
+        self,
+        condition: str,
+        matrix: SymptomMatrix,
+        score: Optional[Dict[str, Any]],
+        severity_scores: Optional[Dict[str, int]] = None,
+        age: Optional[int] = None,
+        medical_history: Optional[List[str]] = None,
+        attribute_matches: Optional[Dict[str, Dict]] = None,
+    ) -> Tuple[float, Dict]:
+        result = None
+        if self.affected is not None and condition not in self.affected:
+            result = self.session.condition_results.get(condition)
+        if result is None:
+            result = super()._score_condition(
+                condition, matrix, score, severity_scores, age, medical_history, attribute_matches
+            )
+        else:
+            self.reused_count += 1
+        self.condition_results[condition] = result
+        return result
+
+    def _match_symptom_attributes(
+        self,
+        patient_attributes: Dict[str, Dict[str, str]]
+    ) -> Dict[str, Dict]:
+        previous = self.session.attribute_matches
+        current = {}
+        match_results = {}
+        for symptom, attrs in patient_attributes.items():
+            cached = previous.get(symptom)
+            if cached is None or cached[0] != attrs:
+                cached = (dict(attrs), super()._match_symptom_attributes({symptom: attrs}))
+            current[symptom] = cached
+            match_results.update(cached[1])
+
+        self.session.attribute_matches = current
+        return match_results
+
+
 # ============================================================================
 # Agent Protocol Handlers
 # ============================================================================
@@ -626,15 +1528,20 @@ async def handle_symptom_analysis_request(
     try:
         # Initialize analyzer
         metta = get_metta_engine()
-        analyzer = SymptomAnalyzer(metta)
+        analyzer = SymptomAnalyzer(metta, result_cache=analysis_cache, record_timings=ANALYSIS_TIMINGS)
 
-        # Perform analysis
+        # Perform analysis (on the KB executor so the event loop keeps polling);
+        # repeat patient profiles come from the result cache, and follow-ups
+        # in the same session only rescore what changed
         ctx.logger.info("🔬 Starting symptom analysis...")
-        analysis_result = analyzer.analyze_symptoms(
+        session = get_analysis_session(msg.session_id)
+        analysis_result = await get_async_metta_engine().run(
+            analyzer.analyze_cached,
             symptoms=msg.symptoms,
             age=msg.age,
             severity_scores=msg.severity_scores,
             medical_history=msg.medical_history,
+            session=session,
         )
 
         # Log results
@@ -642,6 +1549,11 @@ async def handle_symptom_analysis_request(
         ctx.logger.info(f"   Urgency: {analysis_result['urgency_level'].upper()}")
         ctx.logger.info(f"   Red flags: {len(analysis_result['red_flags'])}")
         ctx.logger.info(f"   Differential diagnoses: {len(analysis_result['differential_diagnoses'])}")
+        if session.turns > 1:
+            ctx.logger.info(f"   Follow-up turn {session.turns}: {session.reused_count} condition scores reused")
+        if analysis_result["timings"]:
+            stages = ", ".join(f"{stage} {ms:.2f}ms" for stage, ms in analysis_result["timings"].items())
+            ctx.logger.info(f"   Timings: {stages}")
 
         # Log reasoning chain
         ctx.logger.info("📋 Reasoning chain:")
@@ -658,6 +1570,8 @@ async def handle_symptom_analysis_request(
             reasoning_chain=analysis_result["reasoning_chain"],
             recommended_next_step=analysis_result["recommended_next_step"],
             responding_agent=AGENT_NAME,
+            kb_version=analysis_result["kb_version"],
+            timings=analysis_result["timings"] or None,
         )
 
         # Send response back to coordinator
@@ -708,7 +1622,7 @@ async def startup(ctx: Context):
         ctx.logger.info(f"✅ MeTTa engine ready")
 
         # Test query
-        conditions_count = len(metta.query("(match &self (is-condition $c) $c)"))
+        conditions_count = len(metta.find_all_conditions())
         ctx.logger.info(f"✅ Knowledge base loaded: {conditions_count} conditions")
     except Exception as e:
         ctx.logger.error(f"❌ Failed to load MeTTa engine: {str(e)}")
@@ -717,6 +1631,15 @@ async def startup(ctx: Context):
     ctx.logger.info("=" * 70)
 
 
+@agent.on_interval(period=3600)  # Run every hour
+async def periodic_session_cleanup(ctx: Context):
+    """Periodically drop analysis state of idle sessions"""
+    cleaned = cleanup_expired_analysis_sessions(ctx)
+    ctx.logger.info(f"Periodic cleanup: {len(analysis_sessions)} analysis sessions, {cleaned} cleaned up")
+    stats = analysis_cache.stats()
+    ctx.logger.info(f"Analysis cache: {stats['size']} entries, hit rate {stats['hit_rate']:.1%}")
+
+
 @agent.on_event("shutdown")
 async def shutdown(ctx: Context):
     """Cleanup on shutdown"""
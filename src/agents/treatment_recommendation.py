@@ -16,6 +16,8 @@ Port: 8005
 
 import os
 import sys
+import threading
+from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
@@ -28,6 +30,9 @@ from src.protocols import (
     TreatmentRequestMsg,
     TreatmentResponseMsg,
 )
+from src.metta.async_query_engine import AsyncMeTTaQueryEngine
+from src.metta.protocol_dag import CompiledProtocol
+from src.metta.query_cache import QueryCache
 from src.metta.query_engine import MeTTaQueryEngine
 
 # Load environment variables
@@ -55,16 +60,59 @@ agent = Agent(
 
 # Initialize MeTTa query engine (singleton pattern)
 metta_engine = None
+metta_engine_lock = threading.Lock()
+async_metta_engine: Optional[AsyncMeTTaQueryEngine] = None
 
 
 def get_metta_engine() -> MeTTaQueryEngine:
     """Get or create MeTTa engine instance (singleton)"""
     global metta_engine
     if metta_engine is None:
-        metta_engine = MeTTaQueryEngine()
+        # Handlers may run in worker threads; build the engine only once
+        with metta_engine_lock:
+            if metta_engine is None:
+                metta_engine = MeTTaQueryEngine()
     return metta_engine
 
 
+def get_async_metta_engine() -> AsyncMeTTaQueryEngine:
+    """Get or create the async facade that runs KB work off the event loop"""
+    global async_metta_engine
+    if async_metta_engine is None:
+        async_metta_engine = AsyncMeTTaQueryEngine(get_metta_engine())
+    return async_metta_engine
+
+
+# ============================================================================
+# Treatment Plan Templates (patient-independent parts of a recommendation)
+# ============================================================================
+
+@dataclass(frozen=True)
+class TreatmentPlanTemplate:
+    """
+    Recommendation parts shared by every patient with the same condition
+
+    Built from KB queries once per (condition, KB version); only the
+    patient-specific overlay (contraindications, interactions, follow-up)
+    is computed per request. Shared between requests - treat as read-only.
+    """
+    condition: str
+    treatments: Tuple[str, ...]  # Empty if the KB has none for the condition
+    treatment_protocol: Tuple[Dict, ...]
+    compiled_protocol: Optional[CompiledProtocol]  # Dependency schedule and warnings
+    evidence_sources: Dict[str, str]
+    safety_warnings: Tuple[str, ...]  # Treatment-specific KB warnings
+    specialist: Optional[str]  # Before the emergency fallback
+    kb_version: int
+
+
+# Plan templates by (KB version, condition); older versions age out
+plan_template_cache = QueryCache(max_size=int(os.getenv("TREATMENT_PLAN_CACHE_SIZE", "1024")))
+
+# Differential conditions covered per request unless the request sets max_conditions
+TREATMENT_MAX_CONDITIONS = int(os.getenv("TREATMENT_MAX_CONDITIONS", "1"))
+
+
 # ============================================================================
 # Treatment Recommendation Core Logic
 # ============================================================================
@@ -75,8 +123,15 @@ class TreatmentRecommender:
     Provides evidence-based treatments with comprehensive safety validation
     """
 
-    def __init__(self, metta_engine: MeTTaQueryEngine):
+    def __init__(self, metta_engine: MeTTaQueryEngine, template_cache: Optional[QueryCache] = None):
+        """
+        Args:
+            metta_engine: Knowledge base engine
+            template_cache: Cache for plan templates (optional); must only
+                ever be used with this engine
+        """
         self.metta = metta_engine
+        self.template_cache = template_cache
 
     def recommend_treatments(
         self,
@@ -87,44 +142,103 @@ class TreatmentRecommender:
         allergies: Optional[List[str]] = None,
         current_medications: Optional[List[str]] = None,
         medical_history: Optional[List[str]] = None,
+        max_conditions: int = 1,
     ) -> Dict:
         """
         Main recommendation method - orchestrates all treatment recommendation steps (EPIC 7 - Phase 3 Enhanced)
 
+        With max_conditions > 1 the primary condition and the leading
+        alternative conditions (the differential) are covered in one pass:
+        their treatments are merged without duplicates and safety checks
+        run once over the merged list. Protocol, specialist and follow-up
+        come from the primary condition.
+
+        Args:
+            primary_condition: Most likely condition
+            alternative_conditions: Other differential diagnoses, most likely first
+            urgency_level: "emergency" | "urgent" | "routine"
+            patient_age, allergies, current_medications, medical_history:
+                Patient data for the safety checks
+            max_conditions: Number of conditions to cover (1 = primary only)
+
         Returns dict with:
         - treatments: List[str]
         - treatment_protocol: List[Dict] (EPIC 7 - Phase 3) - Step-by-step protocol with timing
+        - protocol_plan: Optional[Dict] - Protocol as parallel step groups in dependency order, with warnings
         - evidence_sources: Dict[str, str]
         - contraindications: Dict[str, List[str]]
         - safety_warnings: List[str]
         - specialist_referral: Optional[str]
         - follow_up_timeline: Optional[str]
+        - condition_plans: Dict[str, Dict] - Per covered condition: treatments,
+          specialist_referral, protocol_plan
         - reasoning_chain: List[str]
+        - kb_version: int (knowledge base version the recommendations came from)
         """
+        conditions = [primary_condition]
+        covered = {primary_condition.lower().replace(" ", "-")}
+        for condition in alternative_conditions or ():
+            if len(conditions) >= max_conditions:
+                break
+            condition_normalized = condition.lower().replace(" ", "-")
+            if condition_normalized not in covered:
+                covered.add(condition_normalized)
+                conditions.append(condition)
+
+        templates = [self.get_plan_template(condition) for condition in conditions]
+        template = templates[0]
+        kb_version = template.kb_version
         reasoning_chain = []
         reasoning_chain.append(f"💊 Generating treatment recommendations for: {primary_condition}")
+        if len(conditions) > 1:
+            reasoning_chain.append(f"🧩 Also covering differential: {', '.join(conditions[1:])}")
 
-        # Step 1: Get treatment recommendations from MeTTa
+        # Step 1: Treatment recommendations from MeTTa (cached per condition)
         reasoning_chain.append("🔍 Querying MeTTa knowledge base for evidence-based treatments...")
-        treatments = self.get_treatments_for_condition(primary_condition)
+        treatments = list(template.treatments)
+        evidence_sources = dict(template.evidence_sources)
+        treatment_warnings = list(template.safety_warnings)
 
         if not treatments:
             reasoning_chain.append("⚠️ No specific treatments found in knowledge base")
             treatments = [f"Consult healthcare provider for {primary_condition} treatment"]
+            evidence_sources = self.get_evidence_sources(treatments)
+            treatment_warnings = self.get_treatment_safety_warnings(treatments[0])
+
+        # Alternative conditions: merge treatments, each checked only once below
+        condition_treatments = {primary_condition: list(treatments)}
+        merged = set(treatments)
+        overlapping = 0
+        for condition, alternative in zip(conditions[1:], templates[1:]):
+            condition_treatments[condition] = list(alternative.treatments)
+            for treatment in alternative.treatments:
+                if treatment in merged:
+                    overlapping += 1
+                    continue
+                merged.add(treatment)
+                treatments.append(treatment)
+                evidence_sources[treatment] = alternative.evidence_sources[treatment]
+            treatment_warnings.extend(alternative.safety_warnings)
 
         reasoning_chain.append(f"📋 Found {len(treatments)} treatment options")
+        if overlapping:
+            reasoning_chain.append(f"♻️ {overlapping} treatments shared between conditions (checked once)")
 
-        # Step 2: Get treatment protocol (EPIC 7 - Phase 3)
-        treatment_protocol = self.get_treatment_protocol(primary_condition)
+        # Step 2: Treatment protocol (EPIC 7 - Phase 3)
+        treatment_protocol = [dict(step) for step in template.treatment_protocol]
         if treatment_protocol:
             critical_steps = [s for s in treatment_protocol if s['priority'] == 'critical']
             reasoning_chain.append(f"📋 Retrieved treatment protocol: {len(treatment_protocol)} steps ({len(critical_steps)} critical)")
+            if template.compiled_protocol and (template.compiled_protocol.dependencies or template.compiled_protocol.warnings):
+                reasoning_chain.append(
+                    f"🔀 Protocol schedule: {len(template.compiled_protocol.groups)} step groups, "
+                    f"{len(template.compiled_protocol.warnings)} protocol warnings"
+                )
         else:
             reasoning_chain.append("📋 No structured protocol available for this condition")
 
-        # Step 3: Get evidence sources
+        # Step 3: Evidence sources
         reasoning_chain.append("📚 Retrieving evidence sources (CDC, WHO, medical guidelines)...")
-        evidence_sources = self.get_evidence_sources(treatments)
 
         # Step 4: Check contraindications
         reasoning_chain.append("⚕️ Performing safety validation...")
@@ -144,7 +258,10 @@ class TreatmentRecommender:
             reasoning_chain.append(f"⚠️ {len(safety_warnings)} safety warnings identified")
 
         # Step 6: Recommend specialist referral if needed
-        specialist = self.recommend_specialist(primary_condition, urgency_level)
+        specialist = template.specialist
+        if urgency_level == "emergency" and not specialist:
+            # For emergency conditions, always recommend ER
+            specialist = "Emergency Department immediately"
         if specialist:
             reasoning_chain.append(f"🏥 Specialist referral recommended: {specialist}")
 
@@ -153,21 +270,83 @@ class TreatmentRecommender:
         reasoning_chain.append(f"📅 Follow-up timeline: {follow_up}")
 
         # Add treatment-specific safety warnings from MeTTa
-        for treatment in treatments:
-            metta_warnings = self.get_treatment_safety_warnings(treatment)
-            safety_warnings.extend(metta_warnings)
+        safety_warnings.extend(treatment_warnings)
+
+        condition_plans = {}
+        for condition, condition_template in zip(conditions, templates):
+            compiled = condition_template.compiled_protocol
+            condition_plans[condition] = {
+                "treatments": condition_treatments[condition],
+                "specialist_referral": specialist if condition == primary_condition else condition_template.specialist,
+                "protocol_plan": compiled.plan() if compiled else None,
+            }
 
         return {
             "treatments": treatments,
             "treatment_protocol": treatment_protocol,  # EPIC 7 - Phase 3
+            "protocol_plan": condition_plans[primary_condition]["protocol_plan"],
             "evidence_sources": evidence_sources,
             "contraindications": contraindications,
             "safety_warnings": list(set(safety_warnings)),  # Remove duplicates
             "specialist_referral": specialist,
             "follow_up_timeline": follow_up,
+            "condition_plans": condition_plans,
             "reasoning_chain": reasoning_chain,
+            "kb_version": kb_version,
         }
 
+    def get_plan_template(self, condition: str) -> TreatmentPlanTemplate:
+        """
+        Get the patient-independent part of a condition's recommendation
+
+        Served from the template cache when one is configured, so repeat
+        conditions cost no KB queries until the knowledge base changes.
+
+        Args:
+            condition: Condition name (any spelling)
+
+        Returns:
+            TreatmentPlanTemplate for the current KB version
+        """
+        condition_normalized = condition.lower().replace(" ", "-")
+        kb_version = self.metta.kb_version
+        key = (kb_version, condition_normalized)
+        cache = self.template_cache
+        if cache is not None:
+            hit, template = cache.get(key)
+            if hit:
+                return template
+
+        treatments = self.get_treatments_for_condition(condition_normalized)
+        template = TreatmentPlanTemplate(
+            condition=condition_normalized,
+            treatments=tuple(treatments),
+            treatment_protocol=tuple(self.get_treatment_protocol(condition_normalized)),
+            compiled_protocol=self.metta.get_protocol_library().get(condition_normalized),
+            evidence_sources=self.get_evidence_sources(treatments),
+            safety_warnings=tuple(
+                warning for treatment in treatments
+                for warning in self.get_treatment_safety_warnings(treatment)
+            ),
+            specialist=self.recommend_specialist(condition_normalized, "routine"),
+            kb_version=kb_version,
+        )
+        if cache is not None:
+            cache.set(key, template)
+        return template
+
+    def warm_plan_templates(self) -> int:
+        """
+        Build the plan template of every KB condition (agent startup)
+
+        Returns:
+            Number of templates built
+        """
+        conditions = self.metta.find_all_conditions()
+        for condition in conditions:
+            self.get_plan_template(str(condition))
+        return len(conditions)
+
     def get_treatments_for_condition(self, condition: str) -> List[str]:
         """
         Query MeTTa for recommended treatments for the condition
@@ -203,16 +382,8 @@ class TreatmentRecommender:
         # Normalize condition name for MeTTa query
         condition_normalized = condition.lower().replace(" ", "-")
 
-        # Query MeTTa for treatment protocol
-        protocol_steps = self.metta.get_treatment_protocol(condition_normalized)
-
-        if not protocol_steps:
-            return []
-
-        # Sort by step number to ensure correct order
-        protocol_steps.sort(key=lambda x: x['step_number'])
-
-        return protocol_steps
+        # Protocols are compiled once per KB version, already sorted by step number
+        return self.metta.get_protocol_library().steps(condition_normalized)
 
     def get_evidence_sources(self, treatments: List[str]) -> Dict[str, str]:
         """
@@ -248,14 +419,19 @@ class TreatmentRecommender:
         """
         all_contraindications = {}
 
+        # Per-KB-version safety matrix: history checks are set intersections
+        safety = self.metta.get_treatment_safety_matrix()
+        history = [(condition, condition.lower().replace(" ", "-")) for condition in medical_history or ()]
+        history_normalized = {normalized for _, normalized in history}
+
         for treatment in treatments:
             contraindications = []
 
             # Normalize treatment name
             treatment_normalized = treatment.lower().replace(" ", "-")
 
-            # Query MeTTa for all contraindications
-            metta_contraindications = self.metta.get_all_contraindications(treatment_normalized)
+            # All KB contraindications of the treatment
+            metta_contraindications = safety.contraindications(treatment_normalized)
             contraindications.extend(metta_contraindications)
 
             # Age-based contraindications
@@ -270,20 +446,17 @@ class TreatmentRecommender:
                         contraindications.append("Use with caution in elderly patients")
 
             # Medical history contraindications
-            if medical_history:
-                for condition in medical_history:
-                    condition_normalized = condition.lower().replace(" ", "-")
-                    if condition_normalized in metta_contraindications:
+            contraindicated = safety.contraindicated_conditions(treatment_normalized, history_normalized)
+            if contraindicated:
+                for condition, condition_normalized in history:
+                    if condition_normalized in contraindicated:
                         contraindications.append(f"Contraindicated with {condition}")
 
             # Check if dose adjustment needed
-            if medical_history:
-                for condition in medical_history:
-                    condition_normalized = condition.lower().replace(" ", "-")
-                    requires_adjustment = self.metta.requires_dose_adjustment(
-                        treatment_normalized, condition_normalized
-                    )
-                    if requires_adjustment:
+            dose_adjusted = safety.dose_adjusted_conditions(treatment_normalized, history_normalized)
+            if dose_adjusted:
+                for condition, condition_normalized in history:
+                    if condition_normalized in dose_adjusted:
                         contraindications.append(f"Dose adjustment required for {condition}")
 
             # Only add to dict if contraindications exist
@@ -304,20 +477,18 @@ class TreatmentRecommender:
         """
         warnings = []
 
-        # Check drug interactions
+        # Check drug interactions (set intersections on the per-KB-version safety matrix)
         if current_medications:
+            safety = self.metta.get_treatment_safety_matrix()
+            medications = [(medication, medication.lower().replace(" ", "-")) for medication in current_medications]
+            medications_normalized = {normalized for _, normalized in medications}
+
             for treatment in treatments:
                 treatment_normalized = treatment.lower().replace(" ", "-")
 
-                for medication in current_medications:
-                    medication_normalized = medication.lower().replace(" ", "-")
-
-                    # Query MeTTa for drug interaction
-                    has_interaction = self.metta.check_drug_interaction(
-                        treatment_normalized, medication_normalized
-                    )
-
-                    if has_interaction:
+                interacting = safety.interacting_medications(treatment_normalized, medications_normalized)
+                for medication, medication_normalized in medications:
+                    if medication_normalized in interacting:
                         warnings.append(
                             f"⚠️ Drug interaction: {treatment} may interact with {medication}"
                         )
@@ -365,28 +536,10 @@ class TreatmentRecommender:
         Recommend specialist type based on condition and urgency
         Returns specialist name or None
         """
-        # Map conditions to specialists
-        specialist_map = {
-            "meningitis": "Neurologist or Infectious Disease Specialist (ER immediately)",
-            "stroke": "Neurologist (ER immediately - time is brain)",
-            "heart-attack": "Cardiologist (ER immediately - call 911)",
-            "myocardial-infarction": "Cardiologist (ER immediately - call 911)",
-            "appendicitis": "General Surgeon (ER immediately)",
-            "pulmonary-embolism": "Pulmonologist or Emergency Medicine (ER immediately)",
-            "sepsis": "Infectious Disease Specialist (ER immediately)",
-            "pneumonia": "Pulmonologist or Primary Care Physician",
-            "migraine": "Neurologist",
-            "tension-headache": "Primary Care Physician or Neurologist",
-            "covid-19": "Primary Care Physician or Infectious Disease Specialist",
-            "influenza": "Primary Care Physician",
-            "gastroenteritis": "Gastroenterologist or Primary Care Physician",
-            "common-cold": "Primary Care Physician (if symptoms worsen)",
-        }
-
         condition_normalized = condition.lower().replace(" ", "-")
 
-        # Get specialist recommendation
-        specialist = specialist_map.get(condition_normalized)
+        # Specialist from the KB's specialist-referral facts (per-KB-version table)
+        specialist = self.metta.get_triage_table().get(condition_normalized).specialist
 
         # For emergency conditions, always recommend ER
         if urgency_level == "emergency":
@@ -402,18 +555,18 @@ class TreatmentRecommender:
         """
         Determine appropriate follow-up timeline based on urgency and condition
         """
-        if urgency_level == "emergency":
-            return "Immediate (ER visit required)"
+        triage = self.metta.get_triage_table()
 
-        elif urgency_level == "urgent":
-            # Check time-sensitivity from MeTTa
-            time_critical_hours = self.metta.check_time_sensitivity(condition)
+        if urgency_level == "urgent":
+            # Time-sensitive conditions follow up within their window
+            condition_normalized = condition.lower().replace(" ", "-")
+            time_critical_hours = triage.get(condition_normalized).time_sensitive_hours
             if time_critical_hours and time_critical_hours <= 24:
                 return f"Within {time_critical_hours} hours"
-            return "Within 24 hours"
 
-        else:  # routine
-            return "1-2 weeks (or sooner if symptoms worsen)"
+        # Timelines per urgency level from the KB's follow-up-timeline facts
+        level = urgency_level if urgency_level in ("emergency", "urgent") else "routine"
+        return triage.follow_up_timeline(level) or "Consult healthcare provider for follow-up timing"
 
 
 # ============================================================================
@@ -441,11 +594,12 @@ async def handle_treatment_request(
     try:
         # Initialize recommender
         metta = get_metta_engine()
-        recommender = TreatmentRecommender(metta)
+        recommender = TreatmentRecommender(metta, template_cache=plan_template_cache)
 
-        # Generate recommendations
+        # Generate recommendations (on the KB executor so the event loop keeps polling)
         ctx.logger.info("💊 Generating treatment recommendations...")
-        recommendations = recommender.recommend_treatments(
+        recommendations = await get_async_metta_engine().run(
+            recommender.recommend_treatments,
             primary_condition=msg.primary_condition,
             alternative_conditions=msg.alternative_conditions,
             urgency_level=msg.urgency_level,
@@ -453,11 +607,14 @@ async def handle_treatment_request(
             allergies=msg.allergies,
             current_medications=msg.current_medications,
             medical_history=msg.medical_history,
+            max_conditions=msg.max_conditions or TREATMENT_MAX_CONDITIONS,
         )
 
         # Log results
         ctx.logger.info(f"✅ Recommendations generated!")
         ctx.logger.info(f"   Treatments: {len(recommendations['treatments'])}")
+        if len(recommendations["condition_plans"]) > 1:
+            ctx.logger.info(f"   Conditions covered: {', '.join(recommendations['condition_plans'])}")
         ctx.logger.info(f"   Contraindications: {sum(len(v) for v in recommendations['contraindications'].values())}")
         ctx.logger.info(f"   Safety warnings: {len(recommendations['safety_warnings'])}")
         ctx.logger.info(f"   Specialist referral: {recommendations['specialist_referral']}")
@@ -488,6 +645,10 @@ async def handle_treatment_request(
             follow_up_timeline=recommendations["follow_up_timeline"],
             medical_disclaimer=disclaimer,
             responding_agent=AGENT_NAME,
+            kb_version=recommendations["kb_version"],
+            condition_treatments={
+                condition: plan["treatments"] for condition, plan in recommendations["condition_plans"].items()
+            },
         )
 
         # Send response back to coordinator
@@ -539,9 +700,11 @@ async def startup(ctx: Context):
         metta = get_metta_engine()
         ctx.logger.info(f"✅ MeTTa engine ready")
 
-        # Test query
-        conditions_count = len(metta.query("(match &self (is-condition $c) $c)"))
+        # Build every condition's plan template before the first request
+        recommender = TreatmentRecommender(metta, template_cache=plan_template_cache)
+        conditions_count = recommender.warm_plan_templates()
         ctx.logger.info(f"✅ Knowledge base loaded: {conditions_count} conditions")
+        ctx.logger.info(f"✅ Treatment plan templates cached: {len(plan_template_cache)}")
     except Exception as e:
         ctx.logger.error(f"❌ Failed to load MeTTa engine: {str(e)}")
 
@@ -0,0 +1,81 @@
+"""
+Async MeTTa Query Engine - Awaitable facade over MeTTaQueryEngine
+
+Agent message handlers run on the uAgents event loop, so a slow knowledge
+base query blocks mailbox polling and every other handler. This facade
+runs engine work on a bounded thread pool and lets handlers await it.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from src.metta.query_engine import MeTTaQueryEngine
+
+T = TypeVar("T")
+
+
+class AsyncMeTTaQueryEngine:
+    """
+    Awaitable versions of every MeTTaQueryEngine method.
+
+    Every public engine method is available as a coroutine with the same
+    name and arguments, e.g. `await engine.find_symptoms_by_condition("flu")`.
+    Non-callable attributes such as kb_version are passed through unchanged.
+    """
+
+    def __init__(self, engine: Optional[MeTTaQueryEngine] = None, max_concurrency: Optional[int] = None):
+        """
+        Initialize async query engine.
+
+        Args:
+            engine: Engine to wrap (a new MeTTaQueryEngine by default)
+            max_concurrency: Maximum number of engine calls running at once
+                (defaults to METTA_ASYNC_CONCURRENCY or 4)
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("METTA_ASYNC_CONCURRENCY", "4"))
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="metta-query"
+        )
+        self.engine = engine if engine is not None else MeTTaQueryEngine()
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run synchronous KB work on the query executor.
+
+        Use this for multi-query work such as a whole symptom analysis, so
+        it holds one executor slot instead of one per query.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        attr = getattr(self.engine, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args: Any, **kwargs: Any) -> Awaitable[Any]:
+            return self.run(attr, *args, **kwargs)
+
+        return method
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the query executor (pending calls finish when wait is True)."""
+        self._executor.shutdown(wait=wait)
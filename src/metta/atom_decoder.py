@@ -0,0 +1,79 @@
+"""
+Atom Decoder - Structural decoding of hyperon atoms into Python values
+
+Walks SymbolAtom / VariableAtom / GroundedAtom / ExpressionAtom results
+returned by `MeTTa.run` and converts them directly into strings, numbers
+and tuples, instead of stringifying results and re-parsing the text.
+"""
+
+from typing import Any, List
+
+from hyperon import ExpressionAtom, GroundedAtom, SymbolAtom, VariableAtom
+
+
+def _unquote(name: str) -> str:
+    """Strip the surrounding quotes of a string literal symbol."""
+    if len(name) >= 2 and name[0] == '"' and name[-1] == '"':
+        return name[1:-1]
+    return name
+
+
+def decode_atom(atom: Any) -> Any:
+    """
+    Decode a single hyperon atom.
+
+    - SymbolAtom     -> str (string literals lose their quotes)
+    - VariableAtom   -> "$name"
+    - GroundedAtom   -> wrapped Python value (int, float, str, bool)
+    - ExpressionAtom -> tuple of decoded children
+
+    Args:
+        atom: hyperon atom (or a plain Python value, returned unchanged)
+
+    Returns:
+        Decoded Python value
+    """
+    if isinstance(atom, ExpressionAtom):
+        return tuple(decode_atom(child) for child in atom.get_children())
+
+    if isinstance(atom, SymbolAtom):
+        return _unquote(atom.get_name())
+
+    if isinstance(atom, VariableAtom):
+        return f"${atom.get_name()}"
+
+    if isinstance(atom, GroundedAtom):
+        obj = atom.get_object()
+        value = getattr(obj, 'value', None)
+        if value is None:
+            value = getattr(obj, 'content', None)
+        if value is None:
+            return _unquote(str(atom))
+        return value
+
+    if isinstance(atom, (list, tuple)):
+        return tuple(decode_atom(item) for item in atom)
+
+    return atom
+
+
+def decode_results(results: List[Any]) -> List[Any]:
+    """
+    Decode the results of `MeTTa.run`.
+
+    MeTTa returns one list of atoms per evaluated expression, e.g.
+    [[fever, headache, cough]]; these are flattened into a single list.
+
+    Args:
+        results: Raw MeTTa query results
+
+    Returns:
+        Flat list of decoded values
+    """
+    decoded = []
+    for result in results:
+        if isinstance(result, list):
+            decoded.extend(decode_atom(atom) for atom in result)
+        else:
+            decoded.append(decode_atom(result))
+    return decoded
@@ -0,0 +1,96 @@
+"""
+Symptom Attribute Index - Precompiled symptom attribute matching (EPIC 7 - Phase 3)
+
+Built once per knowledge base version from the symptom-attribute facts.
+Attribute types and values are lowercased once at build time, the KB
+attribute types a patient attribute key refers to (e.g. "duration" ->
+duration-typical, duration-range) are resolved once per (symptom, key),
+and every (symptom, key, value) result is memoized, so repeated patient
+attributes resolve with a single cache lookup.
+"""
+
+import functools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Memoized (symptom, attribute, value) matches kept per index
+ATTRIBUTE_CACHE_SIZE = 65536
+
+# (KB attribute type, lowercased values) pairs of one symptom
+_TypeValues = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def normalize_attribute_value(value: str) -> str:
+    """Normalize a patient-reported attribute value to KB form."""
+    return value.lower().replace(" ", "-").replace("_", "-")
+
+
+class SymptomAttributeIndex:
+    """Symptom -> attribute type -> values, with memoized patient attribute matching."""
+
+    def __init__(self, facts: Iterable[Tuple[str, Any, Any]], cache_size: int = ATTRIBUTE_CACHE_SIZE):
+        """
+        Build the index.
+
+        Args:
+            facts: (symptom, attribute type, value) triples from symptom-attribute facts
+            cache_size: Maximum number of memoized matches
+        """
+        self._attributes: Dict[str, Dict[str, List[str]]] = {}
+        for symptom, attr_type, value in facts:
+            self._attributes.setdefault(symptom, {}).setdefault(str(attr_type), []).append(str(value))
+
+        self._lowered: Dict[str, Dict[str, Tuple[str, Tuple[str, ...]]]] = {
+            symptom: {
+                attr_type: (attr_type.lower(), tuple(value.lower() for value in values))
+                for attr_type, values in types.items()
+            }
+            for symptom, types in self._attributes.items()
+        }
+        self._candidate_types = functools.lru_cache(maxsize=cache_size)(self._resolve_types)
+        self._match = functools.lru_cache(maxsize=cache_size)(self._resolve_match)
+
+    def has_attributes(self, symptom: str) -> bool:
+        """Whether the knowledge base describes any attribute of a symptom."""
+        return symptom in self._attributes
+
+    def attributes(self, symptom: str) -> Dict[str, List[str]]:
+        """Attribute types and values of a symptom (same shape as get_symptom_attributes())."""
+        return {attr_type: list(values) for attr_type, values in self._attributes.get(symptom, {}).items()}
+
+    def match(self, symptom: str, attr_key: str, patient_value: str) -> Optional[str]:
+        """
+        Match one patient-reported attribute against a symptom's KB attributes.
+
+        An attribute key refers to every KB attribute type containing it
+        ("duration" -> duration-typical, duration-range); the patient value
+        matches a KB value when either contains the other.
+
+        Args:
+            symptom: Normalized symptom name
+            attr_key: Patient attribute key (e.g. "duration")
+            patient_value: Patient-reported value (any spelling)
+
+        Returns:
+            The first matching KB attribute type, or None
+        """
+        return self._match(symptom, attr_key, patient_value)
+
+    def _resolve_types(self, symptom: str, attr_key: str) -> _TypeValues:
+        key = attr_key.lower()
+        return tuple(
+            (attr_type, values)
+            for attr_type, (lowered_type, values) in self._lowered.get(symptom, {}).items()
+            if key in lowered_type
+        )
+
+    def _resolve_match(self, symptom: str, attr_key: str, patient_value: str) -> Optional[str]:
+        value = normalize_attribute_value(patient_value)
+        for attr_type, kb_values in self._candidate_types(symptom, attr_key):
+            for kb_value in kb_values:
+                if value in kb_value or kb_value in value:
+                    return attr_type
+        return None
+
+    def cache_info(self):
+        """Hit/miss statistics of the (symptom, attribute, value) memo."""
+        return self._match.cache_info()
@@ -0,0 +1,276 @@
+"""
+Knowledge Base Index - Compiled in-memory predicate index for MeTTa facts
+
+Parses the flat facts of a .metta knowledge base once at load time and keeps
+hash indexes per predicate so query methods can answer lookups without
+re-running a `match` over the whole atomspace.
+"""
+
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+Fact = Tuple[Any, ...]
+
+# Version of the fact parser (tokenizing, token decoding and fact splitting).
+# Bump it whenever a change could parse the same source into different facts,
+# so indexes compiled by an older parser (e.g. KB snapshots) are rebuilt.
+PARSER_VERSION = 1
+
+
+def _parse_token(token: str) -> Any:
+    """Convert a bare MeTTa token into a Python value (int, float or symbol str)."""
+    # Only numeric-looking tokens are numbers (float() would accept "inf", "nan")
+    head = token[1:] if token[:1] in '+-' else token
+    if not head or not (head[0].isdigit() or head[0] == '.'):
+        return sys.intern(token)
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return sys.intern(token)
+
+
+def tokenize_metta(text: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Split MeTTa source text into tokens.
+
+    Args:
+        text: MeTTa source text
+
+    Yields:
+        (kind, value) pairs where kind is '(', ')', 'string' or 'atom'
+    """
+    for kind, value, _ in _tokenize(text):
+        yield kind, value
+
+
+def _tokenize(text: str) -> Iterator[Tuple[str, Any, int]]:
+    """Tokenize MeTTa source, yielding (kind, value, offset of the token end)."""
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char.isspace():
+            i += 1
+        elif char == ';':
+            # Comment runs to end of line
+            while i < length and text[i] != '\n':
+                i += 1
+        elif char in '()':
+            i += 1
+            yield char, char, i
+        elif char == '"':
+            i += 1
+            chars = []
+            while i < length and text[i] != '"':
+                if text[i] == '\\' and i + 1 < length:
+                    i += 1
+                chars.append(text[i])
+                i += 1
+            i += 1  # Closing quote
+            yield 'string', sys.intern(''.join(chars)), i
+        else:
+            start = i
+            while i < length and not text[i].isspace() and text[i] not in '();"':
+                i += 1
+            yield 'atom', _parse_token(text[start:i]), i
+
+
+def parse_metta_facts(text: str) -> Iterator[Fact]:
+    """
+    Parse top-level MeTTa expressions into nested tuples.
+
+    Evaluation expressions (prefixed with '!') are skipped since they are
+    queries, not facts added to the atomspace.
+
+    Args:
+        text: MeTTa source text
+
+    Yields:
+        Facts as tuples, e.g. ('has-symptom', 'flu', 'fever')
+    """
+    for fact, _, _ in iter_metta_facts(text):
+        yield fact
+
+
+def iter_metta_facts(text: str) -> Iterator[Tuple[Fact, int, int]]:
+    """
+    Parse top-level MeTTa facts together with their source span.
+
+    Args:
+        text: MeTTa source text
+
+    Yields:
+        (fact, start, end) where text[start:end] is the fact's source
+    """
+    stack: List[List[Any]] = []
+    skip_next = False
+    start = 0
+
+    for kind, value, end in _tokenize(text):
+        if kind == '(':
+            if not stack:
+                start = end - 1
+            stack.append([])
+        elif kind == ')':
+            if not stack:
+                continue
+            expr = tuple(stack.pop())
+            if stack:
+                stack[-1].append(expr)
+            elif skip_next:
+                skip_next = False
+            else:
+                yield expr, start, end
+        elif stack:
+            stack[-1].append(value)
+        elif value == '!':
+            skip_next = True
+
+
+def is_variable(value: Any) -> bool:
+    """Check whether a pattern argument is a MeTTa variable ($name)."""
+    return isinstance(value, str) and value.startswith('$')
+
+
+class KnowledgeBaseIndex:
+    """
+    Per-predicate hash indexes over flat MeTTa facts.
+
+    Facts are indexed by predicate, by (predicate, first argument) and by
+    (predicate, second argument), which covers every lookup shape used by
+    MeTTaQueryEngine (e.g. has-symptom by condition and by symptom).
+    """
+
+    def __init__(self):
+        self._by_predicate: Dict[str, List[Fact]] = defaultdict(list)
+        self._by_first: Dict[Tuple[str, Any], List[Fact]] = defaultdict(list)
+        self._by_second: Dict[Tuple[str, Any], List[Fact]] = defaultdict(list)
+        self.fact_count = 0
+
+    @classmethod
+    def from_text(cls, text: str) -> "KnowledgeBaseIndex":
+        """Build an index from MeTTa source text."""
+        index = cls()
+        for fact in parse_metta_facts(text):
+            index.add(fact)
+        return index
+
+    def add(self, fact: Fact) -> None:
+        """
+        Add a single fact to the index.
+
+        Args:
+            fact: Tuple of (predicate, arg1, arg2, ...)
+        """
+        if not fact or not isinstance(fact[0], str):
+            return
+
+        predicate, args = fact[0], fact[1:]
+        self._by_predicate[predicate].append(args)
+        if len(args) >= 1:
+            self._by_first[(predicate, args[0])].append(args)
+        if len(args) >= 2:
+            self._by_second[(predicate, args[1])].append(args)
+        self.fact_count += 1
+
+    def add_text(self, text: str) -> int:
+        """
+        Parse MeTTa text and add its facts to the index.
+
+        Returns:
+            Number of facts added
+        """
+        count = 0
+        for fact in parse_metta_facts(text):
+            self.add(fact)
+            count += 1
+        return count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the index as plain dicts (used for binary KB snapshots).
+
+        Returns:
+            Dictionary with the three hash indexes and the fact count
+        """
+        return {
+            'by_predicate': dict(self._by_predicate),
+            'by_first': dict(self._by_first),
+            'by_second': dict(self._by_second),
+            'fact_count': self.fact_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnowledgeBaseIndex":
+        """Rebuild an index exported with to_dict()."""
+        index = cls()
+        index._by_predicate.update(data['by_predicate'])
+        index._by_first.update(data['by_first'])
+        index._by_second.update(data['by_second'])
+        index.fact_count = data['fact_count']
+        return index
+
+    def predicates(self) -> List[str]:
+        """Get all indexed predicate names."""
+        return list(self._by_predicate.keys())
+
+    def facts(self, predicate: str) -> List[Fact]:
+        """Get the argument tuples of every fact for a predicate."""
+        return list(self._by_predicate.get(predicate, []))
+
+    def match(self, predicate: str, *pattern: Any) -> List[Fact]:
+        """
+        Match facts against a pattern, mirroring `(match &self (pred ...) ...)`.
+
+        Arguments starting with '$' are variables; everything else must be
+        equal to the fact argument at that position.
+
+        Args:
+            predicate: Predicate name (e.g. "has-symptom")
+            *pattern: Pattern arguments, e.g. ("$condition", "fever")
+
+        Returns:
+            List of variable bindings, one tuple per matching fact, ordered
+            as the variables appear in the pattern
+        """
+        if pattern and not is_variable(pattern[0]):
+            candidates = self._by_first.get((predicate, pattern[0]), [])
+        elif len(pattern) >= 2 and not is_variable(pattern[1]):
+            candidates = self._by_second.get((predicate, pattern[1]), [])
+        else:
+            candidates = self._by_predicate.get(predicate, [])
+
+        bound = [(i, v) for i, v in enumerate(pattern) if not is_variable(v)]
+        variables = [i for i, v in enumerate(pattern) if is_variable(v)]
+
+        results = []
+        for args in candidates:
+            if len(args) != len(pattern):
+                continue
+            if all(args[i] == v for i, v in bound):
+                results.append(tuple(args[i] for i in variables))
+        return results
+
+    def values(self, predicate: str, *pattern: Any) -> List[Any]:
+        """
+        Match a single-variable pattern and return the bound values.
+
+        Example:
+            index.values("has-symptom", "flu", "$symptom") -> ["fever", ...]
+        """
+        return [binding[0] for binding in self.match(predicate, *pattern)]
+
+    def first(self, predicate: str, *pattern: Any, default: Optional[Any] = None) -> Any:
+        """Get the first value bound by a single-variable pattern, or default."""
+        results = self.values(predicate, *pattern)
+        return results[0] if results else default
+
+    def exists(self, predicate: str, *pattern: Any) -> bool:
+        """Check whether any fact matches the pattern."""
+        return len(self.match(predicate, *pattern)) > 0
@@ -0,0 +1,158 @@
+"""
+KB Loader - Multi-file MeTTa knowledge base loading with deduplication
+
+The knowledge base can be split across several .metta files (or a
+directory of them). Files are merged into one canonical fact set: facts
+repeated across or within files are kept once, and single-valued
+predicates that are given different values are reported as conflicts so
+the clinical content can be reviewed.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from src.metta.kb_index import Fact, iter_metta_facts
+
+PathLike = Union[str, Path]
+
+# Predicates expected to have one value per key (all arguments but the last).
+# Distinct values for the same key are reported as conflicts.
+SINGLE_VALUED_PREDICATES = {
+    "has-urgency",
+    "has-severity",
+    "requires-action",
+    "time-sensitive",
+    "evidence-source",
+    "safety-warning",
+    "lab-test-urgency",
+    "imaging-urgency",
+    "risk-factor",
+    "age-risk",
+    "symptom-attribute",
+    "seasonal-prevalence",
+    "red-flag-rule",
+    "specialist-referral",
+    "follow-up-timeline",
+}
+
+
+@dataclass
+class KBLoadResult:
+    """Canonical fact set merged from one or more KB files"""
+    text: str
+    facts: List[Fact]
+    sources: List[str]
+    duplicates: Dict[str, int] = field(default_factory=dict)
+    conflicts: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(self.duplicates.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get a JSON-friendly load report.
+
+        Returns:
+            Dictionary with sources, fact count, duplicates by predicate and conflicts
+        """
+        return {
+            'sources': list(self.sources),
+            'fact_count': len(self.facts),
+            'duplicate_count': self.duplicate_count,
+            'duplicates': dict(self.duplicates),
+            'conflicts': list(self.conflicts),
+        }
+
+
+def resolve_kb_paths(kb_path: Union[PathLike, Sequence[PathLike]]) -> List[Path]:
+    """
+    Expand a KB location into the list of .metta files to load.
+
+    Args:
+        kb_path: A .metta file, a directory of .metta files, a comma-separated
+            string of either, or a list of them
+
+    Returns:
+        Files in load order (directories contribute their files sorted by name)
+    """
+    if isinstance(kb_path, (str, Path)):
+        entries = [part.strip() for part in str(kb_path).split(",") if part.strip()]
+    else:
+        entries = list(kb_path)
+
+    paths: List[Path] = []
+    for entry in entries:
+        path = Path(entry)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.metta")))
+        else:
+            paths.append(path)
+    return paths
+
+
+def _conflict_key(fact: Fact) -> Tuple[Any, ...]:
+    """Key that identifies the single value of a fact (predicate + leading args)."""
+    return fact[:-1]
+
+
+def load_kb_files(paths: Sequence[PathLike]) -> KBLoadResult:
+    """
+    Load KB files into one canonical, deduplicated fact set.
+
+    The first occurrence of every fact is kept (with its original source
+    text, so string literals stay intact); later identical facts are
+    counted as duplicates. Conflicting values of single-valued predicates
+    are kept and reported, since dropping clinical content silently would
+    be worse than a noisy report.
+
+    Args:
+        paths: .metta files in load order
+
+    Returns:
+        KBLoadResult with the canonical MeTTa text and load report
+    """
+    seen = set()
+    facts: List[Fact] = []
+    chunks: List[str] = []
+    duplicates: Counter = Counter()
+    locations: Dict[Tuple[Any, ...], Dict[Any, str]] = defaultdict(dict)
+
+    for path in paths:
+        path = Path(path)
+        text = path.read_text()
+        line, offset = 1, 0
+        for fact, start, end in iter_metta_facts(text):
+            line += text.count("\n", offset, start)
+            offset = start
+
+            if fact in seen:
+                duplicates[str(fact[0])] += 1
+                continue
+            seen.add(fact)
+            facts.append(fact)
+            chunks.append(text[start:end])
+
+            if fact[0] in SINGLE_VALUED_PREDICATES and len(fact) >= 3:
+                locations[_conflict_key(fact)][fact[-1]] = f"{path.name}:{line}"
+
+    conflicts = [
+        {
+            'predicate': key[0],
+            'key': list(key[1:]),
+            'values': [{'value': value, 'source': source} for value, source in values.items()],
+        }
+        for key, values in locations.items()
+        if len(values) > 1
+    ]
+
+    return KBLoadResult(
+        text="\n".join(chunks),
+        facts=facts,
+        sources=[str(path) for path in paths],
+        duplicates=dict(duplicates),
+        conflicts=conflicts,
+    )
+
@@ -0,0 +1,222 @@
+"""
+KB Snapshot - Precompiled binary snapshot of the knowledge base index
+
+Parsing the .metta sources on every agent restart is the dominant cold-start
+cost. A snapshot stores the compiled predicate index (with interned symbols)
+in a versioned binary file keyed by the content hash of the source files and
+the parser version, so startup can map the snapshot in and only fall back to
+a source parse when the knowledge base or the parser has changed. The merged
+MeTTa source is stored alongside the index, so a later atomspace load sees
+exactly the facts the index was compiled from.
+
+Build step:
+    python -m src.metta.kb_snapshot data/knowledge_base.metta
+"""
+
+import argparse
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Add project root to path for imports when run as a script
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.metta.kb_index import PARSER_VERSION, KnowledgeBaseIndex
+from src.metta.kb_loader import load_kb_files, resolve_kb_paths
+
+# Snapshot file layout:
+#   MAGIC (4 bytes) | format version (uint16) | parser version (uint16) |
+#   source hash (64 ascii hex) | marshal payload
+SNAPSHOT_MAGIC = b"MKBS"
+SNAPSHOT_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sHH64s")
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class KBSnapshot:
+    """Compiled index loaded from a snapshot, with the source it was compiled from"""
+    index: KnowledgeBaseIndex
+    text: str  # Merged MeTTa source (KBLoadResult.text)
+
+
+def compute_source_hash(kb_paths: Sequence[PathLike]) -> str:
+    """
+    Compute the content hash of the knowledge base source files.
+
+    Args:
+        kb_paths: Source .metta files, in load order
+
+    Returns:
+        Hex SHA-256 digest over file names and contents
+    """
+    digest = hashlib.sha256()
+    for path in kb_paths:
+        path = Path(path)
+        digest.update(path.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def default_snapshot_path(kb_path: PathLike) -> Path:
+    """Default snapshot location next to the primary KB file (e.g. knowledge_base.kbsnap)."""
+    return Path(kb_path).with_suffix(".kbsnap")
+
+
+def save_snapshot(
+    index: KnowledgeBaseIndex,
+    source_hash: str,
+    snapshot_path: PathLike,
+    sources: Optional[Sequence[PathLike]] = None,
+    text: str = "",
+) -> Path:
+    """
+    Write a compiled index to a binary snapshot file.
+
+    The file is written to a temporary path and renamed into place so a
+    concurrently starting agent never reads a partial snapshot.
+
+    Args:
+        index: Compiled knowledge base index
+        source_hash: Content hash of the source files
+        snapshot_path: Destination file
+        sources: Source file names recorded for diagnostics
+        text: Merged MeTTa source the index was compiled from
+
+    Returns:
+        Path of the written snapshot
+    """
+    snapshot_path = Path(snapshot_path)
+    payload = {
+        'index': index.to_dict(),
+        'text': text,
+        'sources': [str(Path(p).name) for p in (sources or [])],
+        'created_at': time.time(),
+    }
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, PARSER_VERSION, source_hash.encode("ascii"))
+
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(marshal.dumps(payload))
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def read_snapshot_hash(snapshot_path: PathLike) -> Optional[str]:
+    """
+    Read the source hash from a snapshot header without loading the payload.
+
+    Returns:
+        Source hash, or None if the file is missing, not a compatible snapshot
+        or compiled by another parser version
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+
+    if len(header) != _HEADER.size:
+        return None
+    magic, version, parser_version, source_hash = _HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION or parser_version != PARSER_VERSION:
+        return None
+    return source_hash.decode("ascii")
+
+
+def load_snapshot(snapshot_path: PathLike, expected_hash: str) -> Optional[KBSnapshot]:
+    """
+    Map a snapshot into memory and rebuild the index from it.
+
+    Args:
+        snapshot_path: Snapshot file
+        expected_hash: Content hash of the current source files
+
+    Returns:
+        Loaded snapshot, or None if the snapshot is missing, from another
+        format or parser version, or was compiled from different sources
+    """
+    if read_snapshot_hash(snapshot_path) != expected_hash:
+        return None
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    payload = marshal.loads(view[_HEADER.size:])
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        print(f"Warning: Could not read KB snapshot {snapshot_path}: {e}")
+        return None
+
+    return KBSnapshot(index=KnowledgeBaseIndex.from_dict(payload['index']), text=payload['text'])
+
+
+def compile_snapshot(kb_paths: Sequence[PathLike], snapshot_path: Optional[PathLike] = None) -> Dict[str, Any]:
+    """
+    Parse the knowledge base sources and write their snapshot.
+
+    Args:
+        kb_paths: Source .metta files, in load order
+        snapshot_path: Destination (defaults to <first kb file>.kbsnap)
+
+    Returns:
+        Build summary with path, source hash, fact count, duplicates and conflicts
+    """
+    if snapshot_path is None:
+        snapshot_path = default_snapshot_path(kb_paths[0])
+
+    result = load_kb_files(kb_paths)
+    index = KnowledgeBaseIndex()
+    for fact in result.facts:
+        index.add(fact)
+
+    source_hash = compute_source_hash(kb_paths)
+    written = save_snapshot(index, source_hash, snapshot_path, sources=kb_paths, text=result.text)
+    return {
+        'snapshot_path': str(written),
+        'source_hash': source_hash,
+        'fact_count': index.fact_count,
+        'duplicate_count': result.duplicate_count,
+        'conflicts': result.conflicts,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line build step for KB snapshots."""
+    parser = argparse.ArgumentParser(description="Compile MeTTa knowledge base files into a binary snapshot")
+    parser.add_argument(
+        "kb_paths",
+        nargs="*",
+        default=[os.getenv("METTA_KB_PATH", "./data/knowledge_base.metta")],
+        help="Knowledge base .metta files or directories (default: METTA_KB_PATH)",
+    )
+    parser.add_argument("-o", "--output", help="Snapshot path (default: <first kb file>.kbsnap)")
+    args = parser.parse_args(argv)
+
+    kb_paths = resolve_kb_paths(args.kb_paths)
+    summary = compile_snapshot(kb_paths, args.output or os.getenv("METTA_SNAPSHOT_PATH"))
+    print(f"✅ Compiled {summary['fact_count']} facts into {summary['snapshot_path']}")
+    print(f"   Source hash: {summary['source_hash']}")
+    if summary['duplicate_count']:
+        print(f"   Duplicate facts removed: {summary['duplicate_count']}")
+    for conflict in summary['conflicts']:
+        sources = ", ".join(v['source'] for v in conflict['values'])
+        print(f"⚠️  Conflicting {conflict['predicate']} values for {' '.join(map(str, conflict['key']))} ({sources})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
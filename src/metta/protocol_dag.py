@@ -0,0 +1,207 @@
+"""
+Protocol DAG - Compiled treatment protocols with step dependencies (EPIC 7 - Phase 3)
+
+Built once per knowledge base version from the treatment-protocol,
+protocol-dependency and protocol-warning facts. Each condition's steps
+and dependencies are compiled into a DAG, checked for cycles and
+scheduled into groups of steps that can run in parallel, so serving a
+protocol (e.g. heart-attack, anaphylaxis) is a dict lookup.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _to_step(value: Any) -> Optional[int]:
+    """Convert a decoded step number atom to int (None if it is not numeric)."""
+    if isinstance(value, bool):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        return int(float(str(value)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+@dataclass(frozen=True)
+class CompiledProtocol:
+    """One condition's protocol steps, dependency schedule and warnings"""
+    condition: str
+    steps: Tuple[Dict[str, Any], ...]  # Sorted by step number (same as get_treatment_protocol())
+    dependencies: Dict[int, Tuple[int, ...]]  # step -> steps it must follow
+    groups: Tuple[Tuple[int, ...], ...]  # Topological order; steps in a group can run in parallel
+    warnings: Tuple[Tuple[str, str], ...]  # (keyword, warning text)
+    step_warnings: Dict[int, Tuple[str, ...]]  # step -> warnings whose keyword is in its action
+    cycle_steps: Tuple[int, ...] = ()  # Steps on a dependency cycle, scheduled by step number
+
+    def plan(self) -> Dict[str, Any]:
+        """
+        Get the protocol as a topologically ordered plan.
+
+        Returns:
+            Dict with condition, parallel_groups (lists of steps, each step
+            with its depends_on and warnings) and warnings (all texts)
+        """
+        by_number = {}
+        for step in self.steps:
+            by_number.setdefault(step['step_number'], step)
+
+        return {
+            'condition': self.condition,
+            'parallel_groups': [
+                [
+                    dict(
+                        by_number[number],
+                        depends_on=list(self.dependencies.get(number, ())),
+                        warnings=list(self.step_warnings.get(number, ())),
+                    )
+                    for number in group
+                ]
+                for group in self.groups
+            ],
+            'warnings': [text for _, text in self.warnings],
+        }
+
+
+def compile_protocol(
+    condition: str,
+    steps: List[Dict[str, Any]],
+    dependencies: Iterable[Tuple[int, int]] = (),
+    warnings: Iterable[Tuple[str, str]] = (),
+) -> CompiledProtocol:
+    """
+    Compile one condition's protocol into a scheduled DAG.
+
+    Dependencies on unknown steps are ignored. Steps left on a dependency
+    cycle are reported and scheduled one per group in step-number order
+    after everything else.
+
+    Args:
+        condition: Condition name
+        steps: Protocol steps (step_number, action, timing, priority)
+        dependencies: (step, prerequisite step) pairs
+        warnings: (keyword, warning text) pairs
+
+    Returns:
+        CompiledProtocol
+    """
+    steps = sorted(steps, key=lambda s: s['step_number'])
+    numbers = sorted({step['step_number'] for step in steps})
+
+    prerequisites: Dict[int, List[int]] = {}
+    for step, prerequisite in dependencies:
+        if step not in numbers or prerequisite not in numbers:
+            print(f"Warning: Ignoring protocol-dependency {condition} {step} {prerequisite} (unknown step)")
+            continue
+        if prerequisite not in prerequisites.setdefault(step, []):
+            prerequisites[step].append(prerequisite)
+
+    # Kahn's algorithm, one layer per group
+    dependents: Dict[int, List[int]] = {}
+    remaining = {number: len(prerequisites.get(number, ())) for number in numbers}
+    for step, required in prerequisites.items():
+        for prerequisite in required:
+            dependents.setdefault(prerequisite, []).append(step)
+
+    groups = []
+    ready = [number for number in numbers if remaining[number] == 0]
+    while ready:
+        groups.append(tuple(ready))
+        released = []
+        for number in ready:
+            del remaining[number]
+            for dependent in dependents.get(number, ()):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    released.append(dependent)
+        ready = sorted(released)
+
+    cycle_steps = tuple(sorted(remaining))
+    if cycle_steps:
+        print(f"Warning: Dependency cycle in {condition} protocol (steps "
+              f"{', '.join(str(n) for n in cycle_steps)}); ordering them by step number")
+        groups.extend((number,) for number in cycle_steps)
+
+    warnings = tuple((str(keyword), str(text)) for keyword, text in warnings)
+    step_warnings: Dict[int, Tuple[str, ...]] = {}
+    for step in steps:
+        action = step['action'].lower()
+        matched = tuple(text for keyword, text in warnings if keyword.lower() in action)
+        if matched and step['step_number'] not in step_warnings:
+            step_warnings[step['step_number']] = matched
+
+    return CompiledProtocol(
+        condition=condition,
+        steps=tuple(steps),
+        dependencies={step: tuple(sorted(required)) for step, required in prerequisites.items()},
+        groups=tuple(groups),
+        warnings=warnings,
+        step_warnings=step_warnings,
+        cycle_steps=cycle_steps,
+    )
+
+
+class ProtocolLibrary:
+    """Condition -> CompiledProtocol for every condition with protocol steps."""
+
+    def __init__(
+        self,
+        steps: Iterable[Tuple[Any, Any, Any, Any, Any]],
+        dependencies: Iterable[Tuple[Any, Any, Any]],
+        warnings: Iterable[Tuple[Any, Any, Any]],
+    ):
+        """
+        Compile every protocol.
+
+        Args:
+            steps: (condition, step, action, timing, priority) tuples from treatment-protocol facts
+            dependencies: (condition, step, prerequisite step) tuples from protocol-dependency facts
+            warnings: (condition, keyword, text) tuples from protocol-warning facts
+        """
+        condition_steps: Dict[str, List[Dict[str, Any]]] = {}
+        for condition, step, action, timing, priority in steps:
+            step_number = _to_step(step)
+            if step_number is None:
+                continue
+            condition_steps.setdefault(str(condition), []).append({
+                'step_number': step_number,
+                'action': str(action),
+                'timing': str(timing),
+                'priority': str(priority)
+            })
+
+        condition_dependencies: Dict[str, List[Tuple[int, int]]] = {}
+        for condition, step, prerequisite in dependencies:
+            step, prerequisite = _to_step(step), _to_step(prerequisite)
+            if step is not None and prerequisite is not None:
+                condition_dependencies.setdefault(str(condition), []).append((step, prerequisite))
+
+        condition_warnings: Dict[str, List[Tuple[str, str]]] = {}
+        for condition, keyword, text in warnings:
+            condition_warnings.setdefault(str(condition), []).append((str(keyword), str(text)))
+
+        self._protocols: Dict[str, CompiledProtocol] = {
+            condition: compile_protocol(
+                condition,
+                protocol_steps,
+                condition_dependencies.get(condition, ()),
+                condition_warnings.get(condition, ()),
+            )
+            for condition, protocol_steps in condition_steps.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._protocols)
+
+    def __contains__(self, condition: str) -> bool:
+        return condition in self._protocols
+
+    def get(self, condition: str) -> Optional[CompiledProtocol]:
+        """Get a condition's compiled protocol (None if it has no steps)."""
+        return self._protocols.get(condition)
+
+    def steps(self, condition: str) -> List[Dict[str, Any]]:
+        """Protocol steps of a condition sorted by step number (copies, same as get_treatment_protocol())."""
+        protocol = self._protocols.get(condition)
+        return [dict(step) for step in protocol.steps] if protocol else []
@@ -3,22 +3,120 @@ MeTTa Query Engine - Interface for querying MeTTa knowledge base
 """
 
 from hyperon import MeTTa
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Tuple, Union
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from src.metta.atom_decoder import decode_results
+from src.metta.attribute_index import SymptomAttributeIndex
+from src.metta.kb_index import KnowledgeBaseIndex, is_variable
+from src.metta.kb_loader import load_kb_files, resolve_kb_paths
+from src.metta.kb_snapshot import compute_source_hash, default_snapshot_path, load_snapshot, save_snapshot
+from src.metta.query_cache import QueryCache
+from src.metta.protocol_dag import ProtocolLibrary
+from src.metta.query_metrics import QueryMetrics, instrumented, query_template
+from src.metta.red_flag_rules import RedFlagMatcher
+from src.metta.risk_table import RiskTable
+from src.metta.rw_lock import ReadWriteLock
+from src.metta.safety_matrix import TreatmentSafetyMatrix
+from src.metta.symptom_matrix import SymptomMatrix
+from src.metta.triage_table import TriageTable
+
+
+class _KnowledgeBaseGeneration:
+    """
+    One loaded build of the knowledge base: MeTTa space, index and version.
+
+    The engine holds a single reference to the current generation; reloads
+    build a new generation off to the side and swap the reference, so a
+    reader that picked up a generation keeps a consistent view of it.
+
+    hyperon's MeTTa interpreter is not thread-safe, so each MeTTa instance
+    (the primary plus any replicas) serves one query at a time through a
+    checkout/checkin pool, and writes hold the generation's lock exclusively.
+    """
+
+    def __init__(self, version: int, indexed: bool):
+        self.version = version
+        self.metta = MeTTa()
+        self.index: Optional[KnowledgeBaseIndex] = KnowledgeBaseIndex() if indexed else None
+        # Set once the .metta source has been run into the MeTTa space
+        self.space_loaded = False
+        # Merged MeTTa source the index was built from; every MeTTa space of
+        # this generation is loaded from it, never by re-reading the files
+        self.source_text = ""
+        # Serializes lazy space loads (queries and writes never take it)
+        self.space_load_lock = threading.Lock()
+        # Shared by queries, exclusive for writes to the MeTTa space(s)
+        self.lock = ReadWriteLock()
+        # Every MeTTa instance of this generation, and the idle ones
+        self.replicas: List[MeTTa] = [self.metta]
+        self.idle: "queue.SimpleQueue[MeTTa]" = queue.SimpleQueue()
+        self.idle.put(self.metta)
+        self.replica_lock = threading.Lock()
+        # Facts added at runtime with add_fact(), replayed on lazy space loads and reloads
+        self.added_facts: List[str] = []
+        # (name, mtime, size) of the source files this generation was built from
+        self.source_signature: Optional[Tuple[Tuple[str, int, int], ...]] = None
+        # Deduplication / conflict report of the source load (None for snapshot starts)
+        self.load_report: Optional[Dict[str, Any]] = None
+        # Tables derived from the facts: name -> (version built for, table)
+        self.derived: Dict[str, Tuple[int, Any]] = {}
+
 
 class MeTTaQueryEngine:
     """Query engine for MeTTa knowledge base."""
 
-    def __init__(self, kb_path: Optional[str] = None):
+    def __init__(
+        self,
+        kb_path: Optional[Union[str, List[str]]] = None,
+        indexed: Optional[bool] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        snapshot_path: Optional[str] = None,
+        watch_interval: Optional[float] = None,
+        replicas: Optional[int] = None,
+    ):
         """
         Initialize MeTTa query engine.
 
         Args:
-            kb_path: Path to MeTTa knowledge base file (.metta)
-        """
-        self.metta = MeTTa()
+            kb_path: Path to MeTTa knowledge base file (.metta), a directory of
+                .metta files, or a list of files; multiple files are merged
+                with duplicate facts removed
+            indexed: Answer query methods from a compiled in-memory predicate
+                index instead of running MeTTa queries (defaults to the
+                METTA_INDEXED environment variable)
+            cache_size: Maximum number of cached match query results, 0 disables
+                the cache (defaults to METTA_QUERY_CACHE_SIZE or 1024)
+            cache_ttl: Seconds before a cached result expires, None keeps results
+                until the knowledge base changes (defaults to METTA_QUERY_CACHE_TTL)
+            snapshot_path: Binary KB snapshot used by indexed mode for fast cold
+                start (defaults to METTA_SNAPSHOT_PATH or <kb file>.kbsnap)
+            watch_interval: Seconds between checks of the KB file for changes,
+                reloading it when edited; 0 disables watching (defaults to
+                METTA_KB_WATCH_INTERVAL)
+            replicas: Maximum number of MeTTa interpreters serving raw queries in
+                parallel threads, created on demand (defaults to METTA_REPLICAS or 1)
+        """
+        if cache_size is None:
+            cache_size = int(os.getenv("METTA_QUERY_CACHE_SIZE", "1024"))
+        if cache_ttl is None and os.getenv("METTA_QUERY_CACHE_TTL"):
+            cache_ttl = float(os.getenv("METTA_QUERY_CACHE_TTL"))
+        self.cache = QueryCache(max_size=cache_size, ttl=cache_ttl)
+        self.metrics = QueryMetrics(enabled=os.getenv("METTA_METRICS", "true").lower() in ("1", "true", "yes"))
+
+        if indexed is None:
+            indexed = os.getenv("METTA_INDEXED", "false").lower() in ("1", "true", "yes")
+        self.indexed = indexed
+
+        if replicas is None:
+            replicas = int(os.getenv("METTA_REPLICAS", "1"))
+        self.max_replicas = max(1, replicas)
 
         # Load knowledge base
         if kb_path is None:
@@ -27,39 +125,441 @@ class MeTTaQueryEngine:
                 "./data/knowledge_base.metta"
             )
 
-        self.kb_path = Path(kb_path)
-        if self.kb_path.exists():
-            self._load_knowledge_base()
+        self._kb_location = kb_path
+        self.kb_paths = resolve_kb_paths(kb_path)
+        # Primary KB file (names the default snapshot location)
+        self.kb_path = self.kb_paths[0] if self.kb_paths else Path(str(kb_path))
+        if snapshot_path is None:
+            snapshot_path = os.getenv("METTA_SNAPSHOT_PATH") or default_snapshot_path(self.kb_path)
+        self.snapshot_path = Path(snapshot_path)
+
+        # Serializes writers (reloads and add_fact); readers never take it
+        self._write_lock = threading.Lock()
+        self._kb = self._build_generation(version=1)
+
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+        if watch_interval is None:
+            watch_interval = float(os.getenv("METTA_KB_WATCH_INTERVAL", "0") or 0)
+        if watch_interval > 0:
+            self.start_watching(watch_interval)
+
+    @property
+    def metta(self) -> MeTTa:
+        """MeTTa interpreter of the current knowledge base generation."""
+        return self._kb.metta
+
+    @property
+    def index(self) -> Optional[KnowledgeBaseIndex]:
+        """Predicate index of the current generation (None unless indexed mode)."""
+        return self._kb.index
+
+    @property
+    def kb_version(self) -> int:
+        """
+        Version of the loaded knowledge base.
+
+        Increments on every reload and every add_fact(), so derived results
+        can be keyed by it and reported alongside agent responses.
+        """
+        return self._kb.version
+
+    @property
+    def _space_loaded(self) -> bool:
+        return self._kb.space_loaded
+
+    def _build_generation(self, version: int) -> _KnowledgeBaseGeneration:
+        """Create a knowledge base generation and load the source file into it."""
+        kb = _KnowledgeBaseGeneration(version, self.indexed)
+        if self._sources_exist():
+            self._load_knowledge_base(kb)
         else:
-            print(f"Warning: Knowledge base not found at {kb_path}")
+            # Nothing to parse later on either
+            kb.space_loaded = True
+            print(f"Warning: Knowledge base not found at {self._kb_location}")
+        return kb
+
+    def _sources_exist(self, kb_paths: Optional[List[Path]] = None) -> bool:
+        """Whether every configured KB file (or every file in kb_paths) is present."""
+        kb_paths = self.kb_paths if kb_paths is None else kb_paths
+        return bool(kb_paths) and all(path.exists() for path in kb_paths)
 
-    def _load_knowledge_base(self):
-        """Load MeTTa knowledge base from file."""
+    def _load_knowledge_base(self, kb: _KnowledgeBaseGeneration, kb_paths: Optional[List[Path]] = None) -> bool:
+        """
+        Load MeTTa knowledge base from file.
+
+        Args:
+            kb: Generation to load into
+            kb_paths: Files to load (defaults to the configured KB files)
+
+        Returns:
+            True if the knowledge base loaded without errors
+        """
+        kb_paths = self.kb_paths if kb_paths is None else kb_paths
         try:
-            with open(self.kb_path, 'r') as f:
-                kb_content = f.read()
-                self.metta.run(kb_content)
-            print(f"Successfully loaded knowledge base from {self.kb_path}")
+            kb.source_signature = self._source_signature()
+
+            # Indexed mode starts from the compiled snapshot when the sources are unchanged
+            if kb.index is not None:
+                source_hash = compute_source_hash(kb_paths)
+                snapshot = load_snapshot(self.snapshot_path, source_hash)
+                if snapshot is not None:
+                    kb.index = snapshot.index
+                    kb.source_text = snapshot.text
+                    print(f"Successfully loaded knowledge base snapshot from {self.snapshot_path}")
+                    return True
+
+            result = load_kb_files(kb_paths)
+            kb.source_text = result.text
+            kb.metta.run(result.text)
+            kb.space_loaded = True
+            kb.load_report = result.summary()
+
+            if kb.index is not None:
+                for fact in result.facts:
+                    kb.index.add(fact)
+                self._write_snapshot(kb.index, source_hash, kb_paths, result.text)
+
+            if len(kb_paths) == 1:
+                print(f"Successfully loaded knowledge base from {kb_paths[0]}")
+            else:
+                print(f"Successfully loaded knowledge base from {len(kb_paths)} files "
+                      f"({len(result.facts)} facts, {result.duplicate_count} duplicates removed)")
+            for conflict in result.conflicts:
+                sources = ", ".join(v['source'] for v in conflict['values'])
+                print(f"Warning: Conflicting {conflict['predicate']} values for "
+                      f"{' '.join(map(str, conflict['key']))} ({sources})")
+            return True
         except Exception as e:
             print(f"Error loading knowledge base: {e}")
+            return False
+
+    def _write_snapshot(self, index: KnowledgeBaseIndex, source_hash: str, kb_paths: List[Path], text: str):
+        """Persist the compiled index so the next start can skip the source parse."""
+        try:
+            save_snapshot(index, source_hash, self.snapshot_path, sources=kb_paths, text=text)
+        except OSError as e:
+            print(f"Warning: Could not write KB snapshot to {self.snapshot_path}: {e}")
+
+    def _ensure_space_loaded(self, kb: _KnowledgeBaseGeneration):
+        """
+        Run the snapshotted .metta source into the MeTTa space if startup used a snapshot.
+
+        Only raw MeTTa queries and writes need the atomspace, so a snapshot
+        start defers the source parse until one of them happens. The source
+        is parsed into a new interpreter without holding the generation's
+        lock; the lock is only taken to replay facts added meanwhile and
+        publish the interpreter.
+        """
+        if kb.space_loaded:
+            return
+        with kb.space_load_lock:
+            if kb.space_loaded:
+                return
+            metta = MeTTa()
+            # add_fact() only appends to added_facts until the space is loaded
+            replayed = len(kb.added_facts)
+            self._load_space(metta, kb, replayed)
+
+            # Exclusive, so add_fact() cannot slip a fact in between replay and the flag
+            with kb.lock.write_locked():
+                for fact in kb.added_facts[replayed:]:
+                    metta.run(fact)
+                # Nothing has been checked out yet: queries wait for the flag
+                kb.metta = metta
+                kb.replicas = [metta]
+                kb.idle = queue.SimpleQueue()
+                kb.idle.put(metta)
+                kb.space_loaded = True
+
+    def _load_space(self, metta: MeTTa, kb: _KnowledgeBaseGeneration, fact_count: Optional[int] = None):
+        """Run the generation's KB source and runtime-added facts (the first fact_count) into a MeTTa instance."""
+        metta.run(kb.source_text)
+        for fact in kb.added_facts[:fact_count]:
+            metta.run(fact)
+
+    @contextmanager
+    def _checkout(self, kb: _KnowledgeBaseGeneration):
+        """
+        Borrow a MeTTa interpreter of a generation for one query.
+
+        A new replica is created when all interpreters are busy and the
+        replica limit allows it; otherwise the caller waits for a checkin.
+        Callers must hold kb.lock for reading.
+        """
+        try:
+            metta = kb.idle.get_nowait()
+        except queue.Empty:
+            metta = None
+            with kb.replica_lock:
+                if len(kb.replicas) < self.max_replicas:
+                    metta = MeTTa()
+                    self._load_space(metta, kb)
+                    kb.replicas.append(metta)
+            if metta is None:
+                metta = kb.idle.get()
+        try:
+            yield metta
+        finally:
+            kb.idle.put(metta)
+
+    def _source_signature(self) -> Optional[Tuple[Tuple[str, int, int], ...]]:
+        """
+        (name, mtime, size) of every KB file, or None if any is missing.
+
+        KB directories are re-listed, so adding or removing a file changes it.
+        """
+        signature = []
+        for path in resolve_kb_paths(self._kb_location):
+            try:
+                stat = path.stat()
+            except OSError:
+                return None
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature) or None
+
+    def get_kb_load_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the deduplication and conflict report of the current KB load.
+
+        Returns:
+            Dictionary with sources, fact_count, duplicates and conflicts, or
+            None when the knowledge base was loaded from a snapshot
+        """
+        return self._kb.load_report
+
+    # ========================================
+    # Hot Reload
+    # ========================================
+
+    def reload_knowledge_base(self, background: bool = False) -> Optional[int]:
+        """
+        Rebuild the knowledge base from its source files and swap it in atomically.
+
+        The new MeTTa space and index are built while readers keep using the
+        current generation; the swap is a single reference assignment, so
+        queries never block or observe a half-loaded knowledge base. Facts
+        added with add_fact() are replayed onto the new generation. If the
+        source fails to load, the current generation stays in place.
+
+        Args:
+            background: Build in a daemon thread and return immediately
+
+        Returns:
+            New KB version, or None when reloading in the background or on failure
+        """
+        if background:
+            threading.Thread(target=self.reload_knowledge_base, name="kb-reload", daemon=True).start()
+            return None
+
+        with self._write_lock:
+            current = self._kb
+            kb = _KnowledgeBaseGeneration(current.version + 1, self.indexed)
+            # Directories may have gained or lost files since the last load;
+            # the configured paths only change once the new generation is in
+            kb_paths = resolve_kb_paths(self._kb_location)
+            if not self._sources_exist(kb_paths) or not self._load_knowledge_base(kb, kb_paths):
+                print(f"Warning: Keeping knowledge base version {current.version}, reload failed")
+                return None
+
+            for fact in current.added_facts:
+                self._apply_fact(kb, fact)
+
+            self.kb_paths = kb_paths
+            self._kb = kb
+            # Results of the previous generation are unreachable (keys carry the version)
+            self.cache.clear()
+
+        print(f"Reloaded knowledge base from {self._kb_location} (version {kb.version})")
+        return kb.version
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """
+        Watch the KB files and reload them in the background when they change.
+
+        Args:
+            interval: Seconds between file checks
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="kb-watch", daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        """Stop the KB file watcher."""
+        if self._watch_thread is None:
+            return
+        self._watch_stop.set()
+        self._watch_thread.join()
+        self._watch_thread = None
+
+    def _watch_loop(self, interval: float) -> None:
+        """Poll the KB file signatures and reload when they differ."""
+        last_seen = self._kb.source_signature
+        while not self._watch_stop.wait(interval):
+            signature = self._source_signature()
+            if signature is not None and signature != last_seen:
+                # Remember failed versions too, so a broken edit is reported once
+                last_seen = signature
+                self.reload_knowledge_base()
 
     def query(self, query_string: str) -> List[Any]:
         """
         Execute a MeTTa query.
 
+        Read-only match queries are served from the result cache when the
+        same query has already run against the current knowledge base.
+
         Args:
             query_string: MeTTa query string
 
         Returns:
             List of query results
         """
+        if not self.metrics.enabled:
+            return self._execute_query(query_string)[0]
+
+        start = time.perf_counter()
+        results, failed = self._execute_query(query_string)
+        self.metrics.record(
+            "query", query_template(query_string), time.perf_counter() - start, len(results), error=failed
+        )
+        return results
+
+    def _execute_query(self, query_string: str) -> Tuple[List[Any], bool]:
+        """Run a query through the result cache and interpreter pool, returning (results, failed)."""
+        kb = self._kb
+        cacheable = self.cache.enabled and self._is_cacheable(query_string)
+        # Keyed by KB version so a result computed during a reload is never served later
+        cache_key = (kb.version, query_string)
+        if cacheable:
+            hit, cached = self.cache.get(cache_key)
+            if hit:
+                # Cached as a tuple; each caller gets its own list to mutate
+                return list(cached), False
+
         try:
-            results = self.metta.run(query_string)
-            return results
+            self._ensure_space_loaded(kb)
+            with kb.lock.read_locked(), self._checkout(kb) as metta:
+                results = metta.run(query_string)
         except Exception as e:
             print(f"Error executing query: {e}")
-            return []
+            return [], True
+
+        if cacheable:
+            self.cache.set(cache_key, tuple(results))
+        return results, False
+
+    @staticmethod
+    def _is_cacheable(query_string: str) -> bool:
+        """Only evaluated match queries are side-effect free and safe to cache."""
+        return query_string.lstrip().startswith("!(match ")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get query cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions and current size
+        """
+        return self.cache.stats()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get per-method and per-query-template instrumentation.
+
+        Returns:
+            {"method": {...}, "query": {...}} with call counts, cumulative and
+            p50/p95/p99 latency (ms) and result sizes per series
+        """
+        return self.metrics.snapshot()
+
+    def get_metrics_prometheus(self) -> str:
+        """
+        Get instrumentation in the Prometheus text exposition format.
+
+        Returns:
+            Prometheus metrics text
+        """
+        return self.metrics.to_prometheus()
+
+    def _match(self, predicate: str, *pattern: Any) -> List[Tuple[Any, ...]]:
+        """
+        Match facts for a predicate and decode the variable bindings.
+
+        Answered from the predicate index in indexed mode, otherwise by a
+        MeTTa match query whose atoms are decoded structurally.
+
+        Args:
+            predicate: Predicate name (e.g. "has-symptom")
+            *pattern: Pattern arguments; "$name" arguments are variables
 
+        Returns:
+            List of binding tuples, ordered as the variables appear in the pattern
+        """
+        # Index reads take no lock: writers only append to the index's
+        # dicts and lists, which is atomic for concurrent readers
+        if self.index is not None:
+            return self.index.match(predicate, *pattern)
+
+        variables = [arg for arg in pattern if is_variable(arg)]
+        pattern_str = " ".join(self._format_arg(arg) for arg in (predicate,) + pattern)
+
+        if len(variables) == 1:
+            template = variables[0]
+        elif variables:
+            template = f"({' '.join(variables)})"
+        else:
+            template = predicate
+
+        query = f"!(match &self ({pattern_str}) {template})"
+        decoded = decode_results(self.query(query))
+
+        if len(variables) == 1:
+            return [(value,) for value in decoded]
+        if variables:
+            return [value if isinstance(value, tuple) else (value,) for value in decoded]
+        return [() for _ in decoded]
+
+    def _values(self, predicate: str, *pattern: Any) -> List[Any]:
+        """Match a single-variable pattern and return the bound values."""
+        return [binding[0] for binding in self._match(predicate, *pattern)]
+
+    def _first(self, predicate: str, *pattern: Any, default: Any = None) -> Any:
+        """Get the first value bound by a single-variable pattern, or default."""
+        values = self._values(predicate, *pattern)
+        return values[0] if values else default
+
+    def _exists(self, predicate: str, *pattern: Any) -> bool:
+        """Check whether any fact matches a fully bound pattern."""
+        return len(self._match(predicate, *pattern)) > 0
+
+    @staticmethod
+    def _format_arg(arg: Any) -> str:
+        """Format a pattern argument as MeTTa source (strings with spaces are quoted)."""
+        text = str(arg)
+        if isinstance(arg, str) and (any(c.isspace() for c in text) or '"' in text):
+            escaped = text.replace('\\', '\\\\').replace('"', '\\"')
+            return f'"{escaped}"'
+        return text
+
+    @staticmethod
+    def _to_number(value: Any) -> Optional[Union[int, float]]:
+        """Convert a decoded atom to int/float, or None if it is not numeric."""
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return value
+        try:
+            text = str(value)
+            return int(text) if text.lstrip('-').isdigit() else float(text)
+        except (TypeError, ValueError):
+            return None
+
+    @instrumented
     def find_by_symptom(self, symptom: str) -> List[str]:
         """
         Find conditions associated with a symptom.
@@ -70,10 +570,9 @@ class MeTTaQueryEngine:
         Returns:
             List of conditions
         """
-        query = f"!(match &self (has-symptom $condition {symptom}) $condition)"
-        results = self.query(query)
-        return [str(r) for r in results]
+        return self._values("has-symptom", "$condition", symptom)
 
+    @instrumented
     def find_treatment(self, condition: str) -> List[str]:
         """
         Find treatments for a condition.
@@ -84,9 +583,7 @@ class MeTTaQueryEngine:
         Returns:
             List of treatments
         """
-        query = f"!(match &self (has-treatment {condition} $treatment) $treatment)"
-        results = self.query(query)
-        return [str(r) for r in results]
+        return self._values("has-treatment", condition, "$treatment")
 
     def add_fact(self, fact: str) -> bool:
         """
@@ -99,12 +596,29 @@ class MeTTaQueryEngine:
             True if successful, False otherwise
         """
         try:
-            self.metta.run(fact)
+            with self._write_lock:
+                kb = self._kb
+                with kb.lock.write_locked():
+                    self._apply_fact(kb, fact)
+                    kb.version += 1
+                # Cached results may no longer reflect the knowledge base
+                self.cache.clear()
             return True
         except Exception as e:
             print(f"Error adding fact: {e}")
             return False
 
+    def _apply_fact(self, kb: _KnowledgeBaseGeneration, fact: str):
+        """Add a fact to a generation's spaces (if loaded) and index."""
+        if kb.space_loaded:
+            # No reader holds an interpreter while the write lock is held
+            for metta in kb.replicas:
+                metta.run(fact)
+        kb.added_facts.append(fact)
+        if kb.index is not None:
+            kb.index.add_text(fact)
+
+    @instrumented
     def get_all_facts(self, predicate: str) -> List[Any]:
         """
         Get all facts for a specific predicate.
@@ -115,55 +629,33 @@ class MeTTaQueryEngine:
         Returns:
             List of facts
         """
-        query = f"!(match &self ({predicate} $x $y) ($x $y))"
-        results = self.query(query)
-        return results
+        return self._match(predicate, "$x", "$y")
 
     # ========================================
     # Medical-Specific Query Methods
     # ========================================
 
-    def find_emergency_conditions(self) -> List[str]:
+    @instrumented
+    def find_all_conditions(self) -> List[str]:
         """
-        Find all emergency conditions requiring immediate 911 call.
+        Find all conditions defined in the knowledge base.
 
         Returns:
-            List of emergency conditions
+            List of condition names
         """
-        query = "!(match &self (has-urgency $condition emergency) $condition)"
-        results = self.query(query)
-        # Use _parse_metta_list to handle nested list results
-        return self._parse_metta_list(results)
+        return self._values("is-condition", "$condition")
 
-    def _parse_metta_list(self, results: List[Any]) -> List[str]:
+    @instrumented
+    def find_emergency_conditions(self) -> List[str]:
         """
-        Parse MeTTa query results that return as nested lists.
-
-        MeTTa returns results like: [[fever, headache, cough, ...]]
-        We need to extract individual atoms as strings.
-
-        Args:
-            results: Raw MeTTa query results
+        Find all emergency conditions requiring immediate 911 call.
 
         Returns:
-            List of individual atom strings
+            List of emergency conditions
         """
-        parsed = []
-        for result in results:
-            # Result is typically a nested structure
-            # Convert to string and parse
-            result_str = str(result).strip()
-
-            # Remove outer brackets if present
-            if result_str.startswith('[') and result_str.endswith(']'):
-                result_str = result_str[1:-1]
-
-            # Split by comma and clean up each item
-            items = [item.strip() for item in result_str.split(',')]
-            parsed.extend([item for item in items if item])
-
-        return parsed
+        return self._values("has-urgency", "$condition", "emergency")
 
+    @instrumented
     def find_symptoms_by_condition(self, condition: str) -> List[str]:
         """
         Find all symptoms for a specific condition.
@@ -174,11 +666,9 @@ class MeTTaQueryEngine:
         Returns:
             List of symptoms
         """
-        query = f"!(match &self (has-symptom {condition} $symptom) $symptom)"
-        results = self.query(query)
-        # Parse the nested MeTTa list structure
-        return self._parse_metta_list(results)
+        return self._values("has-symptom", condition, "$symptom")
 
+    @instrumented
     def find_red_flag_symptoms(self) -> List[str]:
         """
         Find all red flag symptoms indicating serious conditions.
@@ -186,10 +676,9 @@ class MeTTaQueryEngine:
         Returns:
             List of red flag symptoms
         """
-        query = "!(match &self (red-flag-symptom $symptom true) $symptom)"
-        results = self.query(query)
-        return [str(r) for r in results]
+        return self._values("red-flag-symptom", "$symptom", "true")
 
+    @instrumented
     def find_urgency_level(self, condition: str) -> str:
         """
         Get urgency level for a condition.
@@ -200,15 +689,11 @@ class MeTTaQueryEngine:
         Returns:
             Urgency level (emergency, urgent-24h, routine-care)
         """
-        query = f"!(match &self (has-urgency {condition} $urgency) $urgency)"
-        results = self.query(query)
-        if results:
-            # Strip brackets and quotes from result
-            urgency = str(results[0]).strip("'[]")
-            # Return "unknown" if result is empty after stripping
-            return urgency if urgency else "unknown"
-        return "unknown"
+        urgency = self._first("has-urgency", condition, "$urgency")
+        # Return "unknown" if no urgency is defined
+        return str(urgency) if urgency else "unknown"
 
+    @instrumented
     def find_severity_level(self, condition: str) -> str:
         """
         Get severity level for a condition.
@@ -219,13 +704,10 @@ class MeTTaQueryEngine:
         Returns:
             Severity level (critical, urgent, routine)
         """
-        query = f"!(match &self (has-severity {condition} $severity) $severity)"
-        results = self.query(query)
-        if results:
-            # Strip brackets and quotes from result
-            return str(results[0]).strip("'[]")
-        return "unknown"
+        severity = self._first("has-severity", condition, "$severity")
+        return str(severity) if severity else "unknown"
 
+    @instrumented
     def find_differential_diagnoses(self, condition: str) -> List[str]:
         """
         Find differential diagnoses for a condition.
@@ -236,10 +718,9 @@ class MeTTaQueryEngine:
         Returns:
             List of differential diagnoses
         """
-        query = f"!(match &self (differential-from {condition} $other) $other)"
-        results = self.query(query)
-        return [str(r) for r in results]
+        return self._values("differential-from", condition, "$other")
 
+    @instrumented
     def find_conditions_by_symptoms(self, symptoms: List[str]) -> Dict[str, int]:
         """
         Find conditions matching multiple symptoms with match counts.
@@ -250,23 +731,76 @@ class MeTTaQueryEngine:
         Returns:
             Dictionary mapping conditions to symptom match counts
         """
-        condition_matches = {}
+        scores = self.score_conditions_by_symptoms(symptoms)
+        return {condition: score['match_count'] for condition, score in scores.items()}
+
+    @instrumented
+    def score_conditions_by_symptoms(self, symptoms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Score every condition against the full symptom set in a single pass.
+
+        Uses an inverted symptom -> condition index built once per KB
+        version, so cost grows with the number of matched has-symptom facts
+        rather than with the size of the knowledge base.
+
+        Args:
+            symptoms: List of normalized symptom names
+
+        Returns:
+            Dictionary mapping conditions to {'match_count', 'matched_symptoms'},
+            ordered by match count (descending)
+        """
+        if not symptoms:
+            return {}
+
+        # Indexed mode already keeps has-symptom facts by symptom
+        inverted = None if self.index is not None else self._get_symptom_condition_index()
+
+        matched: Dict[str, List[str]] = {}
+        for symptom in dict.fromkeys(symptoms):
+            if inverted is None:
+                conditions = self.index.values("has-symptom", "$condition", symptom)
+            else:
+                conditions = inverted.get(symptom, [])
+
+            for condition in conditions:
+                condition_symptoms = matched.setdefault(condition, [])
+                if symptom not in condition_symptoms:
+                    condition_symptoms.append(symptom)
+
+        # Order by match count (descending) by bucketing on the count, which is
+        # bounded by the number of symptoms; buckets keep first-seen order
+        buckets: Dict[int, List[str]] = {}
+        for condition, matched_symptoms in matched.items():
+            buckets.setdefault(len(matched_symptoms), []).append(condition)
+
+        return {
+            condition: {
+                'match_count': count,
+                'matched_symptoms': matched[condition]
+            }
+            for count in sorted(buckets, reverse=True)
+            for condition in buckets[count]
+        }
+
+    def _get_symptom_condition_index(self) -> Dict[str, List[str]]:
+        """
+        Get the inverted symptom -> conditions index, built with one MeTTa
+        query once per KB version.
 
-        for symptom in symptoms:
-            conditions = self.find_by_symptom(symptom)
-            # Parse the results (format: "['[condition1, condition2]']")
-            for result in conditions:
-                # Extract conditions from result string
-                result_str = str(result).strip("'[]")
-                if result_str:
-                    conds = [c.strip() for c in result_str.split(',')]
-                    for cond in conds:
-                        if cond:
-                            condition_matches[cond] = condition_matches.get(cond, 0) + 1
+        Returns:
+            Dictionary mapping each symptom to the conditions that have it
+            (shared, must not be modified)
+        """
+        def build() -> Dict[str, List[str]]:
+            inverted: Dict[str, List[str]] = {}
+            for condition, symptom in self._match("has-symptom", "$condition", "$symptom"):
+                inverted.setdefault(symptom, []).append(condition)
+            return inverted
 
-        # Sort by match count (descending)
-        return dict(sorted(condition_matches.items(), key=lambda x: x[1], reverse=True))
+        return self._get_derived("symptom_condition_index", build)
 
+    @instrumented
     def get_treatment_recommendations(self, condition: str) -> List[str]:
         """
         Get treatment recommendations for a condition.
@@ -279,6 +813,7 @@ class MeTTaQueryEngine:
         """
         return self.find_treatment(condition)
 
+    @instrumented
     def get_required_action(self, condition: str) -> str:
         """
         Get required action for a condition.
@@ -289,10 +824,9 @@ class MeTTaQueryEngine:
         Returns:
             Required action
         """
-        query = f"!(match &self (requires-action {condition} $action) $action)"
-        results = self.query(query)
-        return str(results[0]) if results else "consult-doctor"
+        return str(self._first("requires-action", condition, "$action", default="consult-doctor"))
 
+    @instrumented
     def check_time_sensitivity(self, condition: str) -> Optional[int]:
         """
         Check time sensitivity for a condition.
@@ -303,17 +837,10 @@ class MeTTaQueryEngine:
         Returns:
             Hours until critical or None if not time-sensitive
         """
-        query = f"!(match &self (time-sensitive {condition} $hours) $hours)"
-        results = self.query(query)
-        if results:
-            try:
-                # Extract hours from result
-                hours_str = str(results[0]).strip("'[]")
-                return int(hours_str) if hours_str.isdigit() else None
-            except:
-                return None
-        return None
+        hours = self._to_number(self._first("time-sensitive", condition, "$hours"))
+        return int(hours) if hours is not None else None
 
+    @instrumented
     def get_evidence_source(self, treatment: str) -> str:
         """
         Get evidence source for a treatment.
@@ -324,10 +851,9 @@ class MeTTaQueryEngine:
         Returns:
             Evidence source
         """
-        query = f"!(match &self (evidence-source {treatment} $source) $source)"
-        results = self.query(query)
-        return str(results[0]) if results else "clinical-guidelines"
+        return str(self._first("evidence-source", treatment, "$source", default="clinical-guidelines"))
 
+    @instrumented
     def check_contraindication(self, treatment: str, patient_condition: str) -> bool:
         """
         Check if treatment is contraindicated for patient condition.
@@ -339,10 +865,9 @@ class MeTTaQueryEngine:
         Returns:
             True if contraindicated, False otherwise
         """
-        query = f"!(match &self (contraindication {treatment} {patient_condition}) {treatment})"
-        results = self.query(query)
-        return len(results) > 0
+        return self._exists("contraindication", treatment, patient_condition)
 
+    @instrumented
     def get_all_contraindications(self, treatment: str) -> List[str]:
         """
         Get all contraindications for a treatment.
@@ -353,11 +878,9 @@ class MeTTaQueryEngine:
         Returns:
             List of contraindicated conditions
         """
-        query = f"!(match &self (contraindication {treatment} $condition) $condition)"
-        results = self.query(query)
-        # Use _parse_metta_list to handle nested list structure
-        return self._parse_metta_list(results)
+        return self._values("contraindication", treatment, "$condition")
 
+    @instrumented
     def get_safety_warning(self, treatment: str) -> str:
         """
         Get safety warning for a treatment.
@@ -368,10 +891,9 @@ class MeTTaQueryEngine:
         Returns:
             Safety warning text
         """
-        query = f"!(match &self (safety-warning {treatment} $warning) $warning)"
-        results = self.query(query)
-        return str(results[0]).strip('"') if results else ""
+        return str(self._first("safety-warning", treatment, "$warning", default=""))
 
+    @instrumented
     def check_drug_interaction(self, treatment: str, medication: str) -> bool:
         """
         Check if treatment has drug interaction with existing medication.
@@ -383,10 +905,9 @@ class MeTTaQueryEngine:
         Returns:
             True if interaction exists, False otherwise
         """
-        query = f"!(match &self (drug-interaction {treatment} {medication}) {treatment})"
-        results = self.query(query)
-        return len(results) > 0
+        return self._exists("drug-interaction", treatment, medication)
 
+    @instrumented
     def requires_dose_adjustment(self, treatment: str, condition: str) -> bool:
         """
         Check if treatment requires dose adjustment for patient condition.
@@ -398,10 +919,9 @@ class MeTTaQueryEngine:
         Returns:
             True if dose adjustment needed, False otherwise
         """
-        query = f"!(match &self (requires-dose-adjustment {treatment} {condition}) {treatment})"
-        results = self.query(query)
-        return len(results) > 0
+        return self._exists("requires-dose-adjustment", treatment, condition)
 
+    @instrumented
     def find_lab_tests(self, condition: str) -> List[str]:
         """
         Find required lab tests for a condition (EPIC 7 - Phase 1).
@@ -412,10 +932,9 @@ class MeTTaQueryEngine:
         Returns:
             List of required lab tests
         """
-        query = f"!(match &self (requires-lab-test {condition} $test) $test)"
-        results = self.query(query)
-        return self._parse_metta_list(results)
+        return self._values("requires-lab-test", condition, "$test")
 
+    @instrumented
     def find_imaging_requirements(self, condition: str) -> List[str]:
         """
         Find required imaging for a condition (EPIC 7 - Phase 1).
@@ -426,10 +945,9 @@ class MeTTaQueryEngine:
         Returns:
             List of required imaging types
         """
-        query = f"!(match &self (requires-imaging {condition} $imaging) $imaging)"
-        results = self.query(query)
-        return self._parse_metta_list(results)
+        return self._values("requires-imaging", condition, "$imaging")
 
+    @instrumented
     def get_all_lab_tests(self) -> List[str]:
         """
         Get all lab tests defined in knowledge base (EPIC 7 - Phase 1).
@@ -437,12 +955,10 @@ class MeTTaQueryEngine:
         Returns:
             List of all lab test types
         """
-        query = "!(match &self (requires-lab-test $condition $test) $test)"
-        results = self.query(query)
         # Return unique tests
-        tests = self._parse_metta_list(results)
-        return list(set(tests))
+        return list(set(test for _, test in self._match("requires-lab-test", "$condition", "$test")))
 
+    @instrumented
     def get_all_imaging(self) -> List[str]:
         """
         Get all imaging types defined in knowledge base (EPIC 7 - Phase 1).
@@ -450,12 +966,10 @@ class MeTTaQueryEngine:
         Returns:
             List of all imaging types
         """
-        query = "!(match &self (requires-imaging $condition $imaging) $imaging)"
-        results = self.query(query)
         # Return unique imaging types
-        imaging_types = self._parse_metta_list(results)
-        return list(set(imaging_types))
+        return list(set(imaging for _, imaging in self._match("requires-imaging", "$condition", "$imaging")))
 
+    @instrumented
     def generate_reasoning_chain(
         self,
         symptoms: List[str],
@@ -488,7 +1002,7 @@ class MeTTaQueryEngine:
 
         # Symptom matching
         condition_symptoms = self.find_symptoms_by_condition(top_condition)
-        matched = [s for s in symptoms if s in str(condition_symptoms)]
+        matched = [s for s in symptoms if s in condition_symptoms]
         reasoning.append(f"\nSYMPTOM MATCHING:")
         reasoning.append(f"  Patient symptoms: {', '.join(symptoms)}")
         reasoning.append(f"  Condition symptoms: {', '.join([str(s) for s in condition_symptoms[:8]])}")
@@ -549,7 +1063,7 @@ class MeTTaQueryEngine:
 
         # Red flags
         red_flags = self.find_red_flag_symptoms()
-        patient_red_flags = [s for s in symptoms if s in str(red_flags)]
+        patient_red_flags = [s for s in symptoms if s in red_flags]
         if patient_red_flags:
             reasoning.append(f"\n🚨 RED FLAG SYMPTOMS DETECTED:")
             reasoning.append(f"  {', '.join(patient_red_flags)}")
@@ -576,6 +1090,7 @@ class MeTTaQueryEngine:
     # EPIC 7 - Phase 2: Risk Factors & Diagnostic Criteria
     # ========================================
 
+    @instrumented
     def get_risk_factors(self, condition: str) -> List[Dict[str, Any]]:
         """
         Get all risk factors for a condition with their multipliers (EPIC 7 - Phase 2).
@@ -586,52 +1101,20 @@ class MeTTaQueryEngine:
         Returns:
             List of dictionaries with 'factor' and 'multiplier' keys
         """
-        query = f"!(match &self (risk-factor {condition} $factor $multiplier) ($factor $multiplier))"
-        results = self.query(query)
-
         risk_factors = []
 
-        # MeTTa returns [[tuple1, tuple2, ...]] - double nested list
-        for result in results:
-            # Check if result is itself a list (nested structure)
-            if isinstance(result, list):
-                # Iterate over the inner list of tuples
-                for item in result:
-                    item_str = str(item).strip("'[] ")
-                    # Remove parentheses
-                    item_str = item_str.strip("()")
-
-                    # Split on whitespace
-                    parts = item_str.split()
-
-                    if len(parts) >= 2:
-                        factor = parts[0].strip()
-                        try:
-                            multiplier = float(parts[1].strip())
-                            risk_factors.append({
-                                'factor': factor,
-                                'multiplier': multiplier
-                            })
-                        except (ValueError, IndexError):
-                            continue
-            else:
-                # Handle single tuple (non-nested case)
-                result_str = str(result).strip("'[] ()")
-                parts = result_str.split()
-                if len(parts) >= 2:
-                    factor = parts[0].strip()
-                    try:
-                        multiplier = float(parts[1].strip())
-                        risk_factors.append({
-                            'factor': factor,
-                            'multiplier': multiplier
-                        })
-                    except (ValueError, IndexError):
-                        continue
+        for factor, multiplier in self._match("risk-factor", condition, "$factor", "$multiplier"):
+            multiplier = self._to_number(multiplier)
+            if multiplier is not None:
+                risk_factors.append({
+                    'factor': str(factor),
+                    'multiplier': float(multiplier)
+                })
 
         # Sort by multiplier (highest risk first)
         return sorted(risk_factors, key=lambda x: x['multiplier'], reverse=True)
 
+    @instrumented
     def calculate_risk_score(self, condition: str, patient_factors: List[str]) -> float:
         """
         Calculate risk score for a condition based on patient risk factors (EPIC 7 - Phase 2).
@@ -652,6 +1135,7 @@ class MeTTaQueryEngine:
 
         return round(score, 2)
 
+    @instrumented
     def get_age_risk(self, condition: str, age_group: str) -> str:
         """
         Get age-specific risk level for a condition (EPIC 7 - Phase 2).
@@ -663,13 +1147,10 @@ class MeTTaQueryEngine:
         Returns:
             Risk level (very-high, high, medium, low) or 'unknown'
         """
-        query = f"!(match &self (age-risk {condition} {age_group} $risk) $risk)"
-        results = self.query(query)
-
-        if results:
-            return str(results[0]).strip("'[] ")
-        return "unknown"
+        risk = self._first("age-risk", condition, age_group, "$risk")
+        return str(risk) if risk else "unknown"
 
+    @instrumented
     def check_diagnostic_criteria(self, condition: str, findings: List[str]) -> Dict[str, Any]:
         """
         Check if patient findings meet diagnostic criteria for a condition (EPIC 7 - Phase 2).
@@ -682,39 +1163,9 @@ class MeTTaQueryEngine:
             Dictionary with 'criteria_system', 'matched', 'total', and 'interpretation'
         """
         # Get all criteria for this condition
-        query = f"!(match &self (diagnostic-criteria {condition} $system $criterion) ($system $criterion))"
-        results = self.query(query)
-
         criteria_by_system = {}
-
-        # MeTTa returns [[tuple1, tuple2, ...]] - double nested list
-        for result in results:
-            # Check if result is itself a list (nested structure)
-            if isinstance(result, list):
-                # Iterate over the inner list of tuples
-                for item in result:
-                    item_str = str(item).strip("'[] ()")
-
-                    # Split on whitespace
-                    parts = item_str.split()
-                    if len(parts) >= 2:
-                        system = parts[0].strip()
-                        criterion = parts[1].strip()
-
-                        if system not in criteria_by_system:
-                            criteria_by_system[system] = []
-                        criteria_by_system[system].append(criterion)
-            else:
-                # Handle single tuple (non-nested case)
-                result_str = str(result).strip("'[] ()")
-                parts = result_str.split()
-                if len(parts) >= 2:
-                    system = parts[0].strip()
-                    criterion = parts[1].strip()
-
-                    if system not in criteria_by_system:
-                        criteria_by_system[system] = []
-                    criteria_by_system[system].append(criterion)
+        for system, criterion in self._match("diagnostic-criteria", condition, "$system", "$criterion"):
+            criteria_by_system.setdefault(str(system), []).append(str(criterion))
 
         # Check matches for each system
         results_by_system = {}
@@ -806,6 +1257,7 @@ class MeTTaQueryEngine:
             percentage = (matched / total * 100) if total > 0 else 0
             return f"{matched}/{total} criteria met ({percentage:.0f}%)"
 
+    @instrumented
     def get_clarifying_questions(self, symptom_category: str) -> List[str]:
         """
         Get clarifying questions for differential diagnosis (EPIC 7 - Phase 2).
@@ -816,31 +1268,9 @@ class MeTTaQueryEngine:
         Returns:
             List of clarifying questions
         """
-        query = f"!(match &self (clarifying-question {symptom_category} $question) $question)"
-        results = self.query(query)
-
-        questions = []
-        for result in results:
-            # Extract question text (may be in quotes)
-            result_str = str(result).strip("'[] ")
-
-            # Handle case where multiple questions come as one result
-            # Split by escaped quotes pattern: ", "
-            if '", "' in result_str or '\", \"' in result_str:
-                # Multiple questions in one result - split them
-                parts = result_str.replace('\\"', '"').split('", "')
-                for part in parts:
-                    question = part.strip('"').strip()
-                    if question:
-                        questions.append(question)
-            else:
-                # Single question
-                question = result_str.strip('"')
-                if question:
-                    questions.append(question)
-
-        return questions
+        return [str(question) for question in self._values("clarifying-question", symptom_category, "$question")]
 
+    @instrumented
     def get_differential_aids(self, condition1: str, condition2: str) -> List[str]:
         """
         Get questions that help differentiate between two conditions (EPIC 7 - Phase 2).
@@ -853,29 +1283,16 @@ class MeTTaQueryEngine:
             List of clarifying questions
         """
         # Find questions that help differentiate these conditions
-        query = f"!(match &self (helps-differentiate $question {condition1} {condition2}) $question)"
-        results = self.query(query)
-
-        questions = []
-        for result in results:
-            question = str(result).strip("'[] ")
-            if question.startswith('"') and question.endswith('"'):
-                question = question[1:-1]
-            questions.append(question)
+        questions = [str(q) for q in self._values("helps-differentiate", "$question", condition1, condition2)]
 
         # Also try reverse order
-        query_reverse = f"!(match &self (helps-differentiate $question {condition2} {condition1}) $question)"
-        results_reverse = self.query(query_reverse)
-
-        for result in results_reverse:
-            question = str(result).strip("'[] ")
-            if question.startswith('"') and question.endswith('"'):
-                question = question[1:-1]
-            if question not in questions:
-                questions.append(question)
+        for question in self._values("helps-differentiate", "$question", condition2, condition1):
+            if str(question) not in questions:
+                questions.append(str(question))
 
         return questions
 
+    @instrumented
     def get_prevalence(self, condition: str, population_group: str) -> Optional[float]:
         """
         Get prevalence of a condition in a population group (EPIC 7 - Phase 2).
@@ -887,21 +1304,14 @@ class MeTTaQueryEngine:
         Returns:
             Prevalence as decimal (e.g., 0.02 = 2%) or None if not found
         """
-        query = f"!(match &self (prevalence {condition} {population_group} $rate) $rate)"
-        results = self.query(query)
-
-        if results:
-            try:
-                rate_str = str(results[0]).strip("'[] ")
-                return float(rate_str)
-            except ValueError:
-                return None
-        return None
+        rate = self._to_number(self._first("prevalence", condition, population_group, "$rate"))
+        return float(rate) if rate is not None else None
 
     # ========================================
     # EPIC 7 - Phase 3: Treatment Protocols & Symptom Attributes
     # ========================================
 
+    @instrumented
     def get_treatment_protocol(self, condition: str) -> List[Dict[str, Any]]:
         """
         Get step-by-step treatment protocol for a condition (EPIC 7 - Phase 3).
@@ -912,37 +1322,25 @@ class MeTTaQueryEngine:
         Returns:
             List of protocol steps, each with step_number, action, timing, priority
         """
-        query = f"!(match &self (treatment-protocol {condition} $step $action $timing $priority) ($step $action $timing $priority))"
-        results = self.query(query)
-
         protocol_steps = []
 
-        # MeTTa returns [[tuple1, tuple2, ...]]
-        for result in results:
-            if isinstance(result, list):
-                for item in result:
-                    item_str = str(item).strip("'[] ()")
-                    parts = item_str.split()
-
-                    if len(parts) >= 4:
-                        try:
-                            step_number = int(parts[0])
-                            action = parts[1]
-                            timing = parts[2]
-                            priority = parts[3]
-
-                            protocol_steps.append({
-                                'step_number': step_number,
-                                'action': action,
-                                'timing': timing,
-                                'priority': priority
-                            })
-                        except (ValueError, IndexError):
-                            continue
+        for step, action, timing, priority in self._match(
+            "treatment-protocol", condition, "$step", "$action", "$timing", "$priority"
+        ):
+            step_number = self._to_number(step)
+            if step_number is None:
+                continue
+            protocol_steps.append({
+                'step_number': int(step_number),
+                'action': str(action),
+                'timing': str(timing),
+                'priority': str(priority)
+            })
 
         # Sort by step number
         return sorted(protocol_steps, key=lambda x: x['step_number'])
 
+    @instrumented
     def get_protocol_steps(self, condition: str, priority_filter: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get protocol steps with optional priority filtering (EPIC 7 - Phase 3).
@@ -961,6 +1359,7 @@ class MeTTaQueryEngine:
 
         return all_steps
 
+    @instrumented
     def get_symptom_attributes(self, symptom: str) -> Dict[str, List[str]]:
         """
         Get all attributes for a symptom (EPIC 7 - Phase 3).
@@ -971,28 +1370,14 @@ class MeTTaQueryEngine:
         Returns:
             Dictionary mapping attribute types to values
         """
-        query = f"!(match &self (symptom-attribute {symptom} $attr_type $value) ($attr_type $value))"
-        results = self.query(query)
-
         attributes = {}
 
-        # MeTTa returns [[tuple1, tuple2, ...]]
-        for result in results:
-            if isinstance(result, list):
-                for item in result:
-                    item_str = str(item).strip("'[] ()")
-                    parts = item_str.split()
-
-                    if len(parts) >= 2:
-                        attr_type = parts[0]
-                        value = parts[1]
-
-                        if attr_type not in attributes:
-                            attributes[attr_type] = []
-                        attributes[attr_type].append(value)
+        for attr_type, value in self._match("symptom-attribute", symptom, "$attr_type", "$value"):
+            attributes.setdefault(str(attr_type), []).append(str(value))
 
         return attributes
 
+    @instrumented
     def get_seasonal_prevalence(self, condition: str, month: str) -> float:
         """
         Get seasonal prevalence multiplier for a condition (EPIC 7 - Phase 3).
@@ -1004,22 +1389,11 @@ class MeTTaQueryEngine:
         Returns:
             Prevalence multiplier (1.0 = baseline, >1.0 = increased, <1.0 = decreased)
         """
-        query = f"!(match &self (seasonal-prevalence {condition} {month} $multiplier) $multiplier)"
-        results = self.query(query)
-
-        if results:
-            try:
-                # Handle nested list structure
-                if isinstance(results[0], list):
-                    multiplier_str = str(results[0][0]).strip("'[] ")
-                else:
-                    multiplier_str = str(results[0]).strip("'[] ")
-                return float(multiplier_str)
-            except (ValueError, IndexError):
-                return 1.0  # Baseline
-
-        return 1.0  # Baseline if not found
+        multiplier = self._to_number(self._first("seasonal-prevalence", condition, month, "$multiplier"))
+        # Baseline if not found
+        return float(multiplier) if multiplier is not None else 1.0
 
+    @instrumented
     def get_geographic_prevalence(self, condition: str, geography: str) -> float:
         """
         Get geographic prevalence multiplier for a condition (EPIC 7 - Phase 3).
@@ -1031,22 +1405,11 @@ class MeTTaQueryEngine:
         Returns:
             Prevalence multiplier (1.0 = baseline)
         """
-        query = f"!(match &self (geographic-prevalence {condition} {geography} $multiplier) $multiplier)"
-        results = self.query(query)
-
-        if results:
-            try:
-                # Handle nested list structure
-                if isinstance(results[0], list):
-                    multiplier_str = str(results[0][0]).strip("'[] ")
-                else:
-                    multiplier_str = str(results[0]).strip("'[] ")
-                return float(multiplier_str)
-            except (ValueError, IndexError):
-                return 1.0  # Baseline
-
-        return 1.0  # Baseline if not found
+        multiplier = self._to_number(self._first("geographic-prevalence", condition, geography, "$multiplier"))
+        # Baseline if not found
+        return float(multiplier) if multiplier is not None else 1.0
 
+    @instrumented
     def check_symptom_timing(self, condition: str) -> Optional[str]:
         """
         Check symptom onset timing pattern for a condition (EPIC 7 - Phase 3).
@@ -1057,19 +1420,140 @@ class MeTTaQueryEngine:
         Returns:
             Timing pattern (e.g., 'sudden-minutes', 'gradual-hours-to-days') or None
         """
-        query = f"!(match &self (symptom-onset-pattern {condition} $pattern) $pattern)"
-        results = self.query(query)
+        pattern = self._first("symptom-onset-pattern", condition, "$pattern")
+        return str(pattern) if pattern is not None else None
 
-        if results:
-            # Handle nested list structure
-            if isinstance(results[0], list):
-                # Check if nested list is not empty
-                if len(results[0]) > 0:
-                    return str(results[0][0]).strip("'[] ")
-                return None
-            return str(results[0]).strip("'[] ")
+    # ========================================
+    # Precomputed Tables (per KB version)
+    # ========================================
+
+    def _get_derived(self, name: str, builder: Callable[[], Any]) -> Any:
+        """
+        Get a table derived from the knowledge base, building it once per KB version.
+
+        Tables live on the current generation, so reloads drop them and
+        add_fact() (which bumps the version) triggers a rebuild on next use.
+
+        Args:
+            name: Table name
+            builder: Builds the table from engine queries
+
+        Returns:
+            The table for the current KB version
+        """
+        kb = self._kb
+        version = kb.version
+        cached = kb.derived.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        table = builder()
+        kb.derived[name] = (version, table)
+        return table
+
+    def get_symptom_matrix(self) -> SymptomMatrix:
+        """
+        Get the condition × symptom incidence matrix of the has-symptom facts.
+
+        Returns:
+            SymptomMatrix for the current KB version
+        """
+        return self._get_derived(
+            "symptom_matrix",
+            lambda: SymptomMatrix(self._match("has-symptom", "$condition", "$symptom")),
+        )
+
+    def get_red_flag_matcher(self) -> RedFlagMatcher:
+        """
+        Get the compiled red-flag symptom and combination rule matcher.
+
+        Returns:
+            RedFlagMatcher for the current KB version
+        """
+        return self._get_derived(
+            "red_flag_matcher",
+            lambda: RedFlagMatcher(
+                self.find_red_flag_symptoms(),
+                self._match("red-flag-rule", "$rule", "$message"),
+                self._match("red-flag-rule-symptom", "$rule", "$group", "$symptom"),
+            ),
+        )
 
-        return None
+    def get_risk_table(self) -> RiskTable:
+        """
+        Get the condition -> risk factor multiplier table.
+
+        Returns:
+            RiskTable for the current KB version
+        """
+        return self._get_derived(
+            "risk_table",
+            lambda: RiskTable(self._match("risk-factor", "$condition", "$factor", "$multiplier")),
+        )
+
+    def get_symptom_attribute_index(self) -> SymptomAttributeIndex:
+        """
+        Get the precompiled symptom attribute index (EPIC 7 - Phase 3).
+
+        Returns:
+            SymptomAttributeIndex for the current KB version
+        """
+        return self._get_derived(
+            "symptom_attribute_index",
+            lambda: SymptomAttributeIndex(self._match("symptom-attribute", "$symptom", "$attr_type", "$value")),
+        )
+
+    def get_triage_table(self) -> TriageTable:
+        """
+        Get per-condition urgency, severity, time sensitivity, required action
+        and specialist, plus follow-up timelines per urgency level.
+
+        Returns:
+            TriageTable for the current KB version
+        """
+        return self._get_derived(
+            "triage_table",
+            lambda: TriageTable(
+                self._match("has-urgency", "$condition", "$urgency"),
+                self._match("has-severity", "$condition", "$severity"),
+                self._match("time-sensitive", "$condition", "$hours"),
+                self._match("requires-action", "$condition", "$action"),
+                self._match("specialist-referral", "$condition", "$specialist"),
+                self._match("follow-up-timeline", "$urgency", "$timeline"),
+            ),
+        )
+
+    def get_protocol_library(self) -> ProtocolLibrary:
+        """
+        Get every condition's treatment protocol compiled into a dependency DAG (EPIC 7 - Phase 3).
+
+        Returns:
+            ProtocolLibrary for the current KB version
+        """
+        return self._get_derived(
+            "protocol_library",
+            lambda: ProtocolLibrary(
+                self._match("treatment-protocol", "$condition", "$step", "$action", "$timing", "$priority"),
+                self._match("protocol-dependency", "$condition", "$step", "$prerequisite"),
+                self._match("protocol-warning", "$condition", "$keyword", "$text"),
+            ),
+        )
+
+    def get_treatment_safety_matrix(self) -> TreatmentSafetyMatrix:
+        """
+        Get treatment contraindications, drug interactions and dose adjustments.
+
+        Returns:
+            TreatmentSafetyMatrix for the current KB version
+        """
+        return self._get_derived(
+            "treatment_safety_matrix",
+            lambda: TreatmentSafetyMatrix(
+                self._match("contraindication", "$treatment", "$condition"),
+                self._match("drug-interaction", "$treatment", "$medication"),
+                self._match("requires-dose-adjustment", "$treatment", "$condition"),
+            ),
+        )
 
 
 # Example usage
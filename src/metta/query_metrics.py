@@ -0,0 +1,238 @@
+"""
+Query Metrics - Low-overhead latency and call-count instrumentation
+
+Records call counts, cumulative and percentile latency, and result sizes
+for MeTTaQueryEngine query methods and raw query() templates. Recording
+is a couple of counter updates and a bounded append under a lock, so it
+can stay enabled in production; percentiles are only computed when a
+snapshot is taken.
+"""
+
+import functools
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+# Latency samples kept per series for percentile estimates
+DEFAULT_WINDOW = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_QUERY_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|[()]|[^\s()"]+')
+
+
+class _Series:
+    """Counters and a sliding latency window for one method or query template"""
+
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "result_total", "result_max", "samples")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.result_total = 0
+        self.result_max = 0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+
+def _percentile(sorted_samples: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = min(len(sorted_samples) - 1, max(0, int(round(quantile * len(sorted_samples))) - 1))
+    return sorted_samples[rank]
+
+
+def result_size(result: Any) -> int:
+    """Size of a query result: item count for collections, 0 for None, else 1."""
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return 1
+
+
+@functools.lru_cache(maxsize=4096)
+def query_template(query_string: str) -> str:
+    """
+    Reduce a raw MeTTa query to its template.
+
+    Expression heads, variables and space references are kept; concrete
+    arguments become '?', so queries that differ only in their arguments
+    share one metrics series.
+
+    Example:
+        "!(match &self (has-symptom flu $s) $s)" -> "!(match &self (has-symptom ? $s) $s)"
+    """
+    parts = []
+    previous = "("
+    for token in _QUERY_TOKEN.findall(query_string):
+        if token not in ("(", ")") and previous != "(" and token[0] not in "$&!":
+            token = "?"
+        # No space after an opening paren or '!', none before a closing paren
+        if parts and previous not in ("(", "!") and token != ")":
+            parts.append(" ")
+        parts.append(token)
+        previous = token
+    return "".join(parts)
+
+
+class QueryMetrics:
+    """Thread-safe per-series call counts, latencies and result sizes."""
+
+    def __init__(self, enabled: bool = True, window: int = DEFAULT_WINDOW):
+        """
+        Initialize query metrics.
+
+        Args:
+            enabled: Record anything at all
+            window: Latency samples kept per series for percentiles
+        """
+        self.enabled = enabled
+        self.window = window
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, seconds: float, size: int = 0, error: bool = False) -> None:
+        """
+        Record one call.
+
+        Args:
+            kind: Series family ("method" or "query")
+            name: Method name or query template
+            seconds: Call latency
+            size: Result size (see result_size)
+            error: Whether the call raised
+        """
+        key = (kind, name)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.window)
+            series.count += 1
+            series.total_seconds += seconds
+            series.samples.append(seconds)
+            if seconds > series.max_seconds:
+                series.max_seconds = seconds
+            if error:
+                series.errors += 1
+            series.result_total += size
+            if size > series.result_max:
+                series.result_max = size
+
+    def reset(self) -> None:
+        """Drop all recorded series."""
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get a point-in-time view of every series.
+
+        Returns:
+            {kind: {name: {count, errors, total_ms, mean_ms, p50_ms, p95_ms,
+            p99_ms, max_ms, result_size_mean, result_size_max}}}, each kind
+            ordered by cumulative time (descending)
+        """
+        with self._lock:
+            copied = [
+                (kind, name, series.count, series.errors, series.total_seconds, series.max_seconds,
+                 series.result_total, series.result_max, sorted(series.samples))
+                for (kind, name), series in self._series.items()
+            ]
+
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for kind, name, count, errors, total, peak, size_total, size_max, samples in sorted(
+            copied, key=lambda row: row[4], reverse=True
+        ):
+            result.setdefault(kind, {})[name] = {
+                'count': count,
+                'errors': errors,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total * 1000 / count, 3) if count else 0.0,
+                'p50_ms': round(_percentile(samples, 0.5) * 1000, 3),
+                'p95_ms': round(_percentile(samples, 0.95) * 1000, 3),
+                'p99_ms': round(_percentile(samples, 0.99) * 1000, 3),
+                'max_ms': round(peak * 1000, 3),
+                'result_size_mean': round(size_total / count, 2) if count else 0.0,
+                'result_size_max': size_max,
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = "metta") -> str:
+        """
+        Export metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Text with a latency summary (quantiles, _sum, _count), an error
+            counter and a result size summary per series
+        """
+        with self._lock:
+            copied = [
+                (kind, name, series.count, series.errors, series.total_seconds,
+                 series.result_total, sorted(series.samples))
+                for (kind, name), series in self._series.items()
+            ]
+
+        latency = f"{prefix}_query_latency_seconds"
+        errors_name = f"{prefix}_query_errors_total"
+        sizes = f"{prefix}_query_result_size"
+        lines = [
+            f"# HELP {latency} MeTTa knowledge base call latency.",
+            f"# TYPE {latency} summary",
+        ]
+        for kind, name, count, _, total, _, samples in copied:
+            labels = f'kind="{kind}",name="{_escape_label(name)}"'
+            for quantile in QUANTILES:
+                lines.append(f'{latency}{{{labels},quantile="{quantile}"}} {_percentile(samples, quantile):.6f}')
+            lines.append(f"{latency}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{latency}_count{{{labels}}} {count}")
+
+        lines += [f"# HELP {errors_name} MeTTa knowledge base calls that raised.", f"# TYPE {errors_name} counter"]
+        for kind, name, _, errors, _, _, _ in copied:
+            lines.append(f'{errors_name}{{kind="{kind}",name="{_escape_label(name)}"}} {errors}')
+
+        lines += [f"# HELP {sizes} Items returned per MeTTa knowledge base call.", f"# TYPE {sizes} summary"]
+        for kind, name, count, _, _, size_total, _ in copied:
+            labels = f'kind="{kind}",name="{_escape_label(name)}"'
+            lines.append(f"{sizes}_sum{{{labels}}} {size_total}")
+            lines.append(f"{sizes}_count{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def instrumented(method: Callable) -> Callable:
+    """
+    Record latency and result size of a MeTTaQueryEngine method.
+
+    The wrapped method's instance must have a `metrics` QueryMetrics attribute.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            metrics.record("method", name, time.perf_counter() - start, error=True)
+            raise
+        metrics.record("method", name, time.perf_counter() - start, result_size(result))
+        return result
+
+    return wrapper
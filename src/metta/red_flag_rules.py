@@ -0,0 +1,98 @@
+"""
+Red Flag Rules - Compiled matcher for red-flag symptoms and combinations
+
+Single red-flag symptoms come from red-flag-symptom facts. Combination
+rules (meningitis triad, FAST stroke signs, ...) are KB facts too:
+
+    (red-flag-rule meningitis-triad "Meningitis triad (headache + fever + neck stiffness)")
+    (red-flag-rule-symptom meningitis-triad fever fever)
+    (red-flag-rule-symptom meningitis-triad fever high-fever)
+    ...
+
+A rule fires when the patient has at least one symptom of every group
+(the middle argument). Every (rule, group) pair is compiled into one bit,
+and each symptom into the OR of the bits it satisfies, so a patient's
+symptoms are folded into one mask in a single pass and each rule is a
+single AND/compare against it. New rules only need new facts.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Normalize a symptom name to KB form (lowercase, hyphen-separated)."""
+    return symptom.lower().replace(" ", "-").replace("_", "-")
+
+
+class RedFlagMatcher:
+    """Red-flag symptoms plus combination rules compiled to bitmasks."""
+
+    def __init__(
+        self,
+        red_flag_symptoms: Iterable[str],
+        rules: Iterable[Tuple[str, Any]],
+        rule_symptoms: Iterable[Tuple[str, str, str]],
+    ):
+        """
+        Compile the matcher.
+
+        Args:
+            red_flag_symptoms: Symptoms that are red flags on their own
+            rules: (rule, message) pairs from red-flag-rule facts, in report order
+            rule_symptoms: (rule, group, symptom) triples from red-flag-rule-symptom facts
+        """
+        self.red_flag_symptoms = frozenset(red_flag_symptoms)
+
+        messages: Dict[str, str] = {}
+        for rule, message in rules:
+            messages.setdefault(rule, str(message))
+
+        group_bits: Dict[Tuple[str, str], int] = {}
+        rule_masks: Dict[str, int] = {rule: 0 for rule in messages}
+        self._symptom_bits: Dict[str, int] = {}
+
+        for rule, group, symptom in rule_symptoms:
+            if rule not in rule_masks:
+                # Symptoms of a rule without a message are ignored
+                continue
+            bit = group_bits.get((rule, group))
+            if bit is None:
+                bit = group_bits[(rule, group)] = 1 << len(group_bits)
+                rule_masks[rule] |= bit
+            symptom = normalize_symptom(str(symptom))
+            self._symptom_bits[symptom] = self._symptom_bits.get(symptom, 0) | bit
+
+        # Rules without any symptom groups can never fire
+        self._rules: List[Tuple[int, str]] = [
+            (mask, messages[rule]) for rule, mask in rule_masks.items() if mask
+        ]
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._rules)
+
+    def detect(self, symptoms: List[str]) -> List[str]:
+        """
+        Detect red flags in a patient's symptoms.
+
+        Args:
+            symptoms: Patient symptom names (any spelling normalize_symptom() accepts)
+
+        Returns:
+            Patient symptoms that are red flags (as given, in order), then the
+            messages of the combination rules that fire (in rule order)
+        """
+        red_flags = []
+        red_flag_symptoms = self.red_flag_symptoms
+        symptom_bits = self._symptom_bits
+
+        mask = 0
+        for symptom in symptoms:
+            normalized = normalize_symptom(symptom)
+            if normalized in red_flag_symptoms:
+                red_flags.append(symptom)
+            mask |= symptom_bits.get(normalized, 0)
+
+        if mask:
+            red_flags.extend(message for rule_mask, message in self._rules if mask & rule_mask == rule_mask)
+        return red_flags
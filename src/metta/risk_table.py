@@ -0,0 +1,141 @@
+"""
+Risk Table - Condition risk-factor multipliers for in-memory risk adjustment
+
+Built once per knowledge base version from the risk-factor facts. A
+patient's age and medical history are encoded once into a profile (a
+frozenset of KB factor names), and each (condition, profile) risk
+multiplier is computed from dict lookups and then memoized, so repeat
+patients and follow-up turns cost one cache hit per condition.
+"""
+
+import functools
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# (condition, profile) risk multipliers kept per table
+RISK_CACHE_SIZE = 65536
+
+PatientProfile = FrozenSet[str]
+
+
+def _to_multiplier(value: Any) -> Optional[float]:
+    """Convert a decoded multiplier atom to float, or None if it is not numeric."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value if isinstance(value, (int, float)) else str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def encode_patient_profile(
+    age: Optional[int] = None,
+    medical_history: Optional[Iterable[str]] = None,
+) -> PatientProfile:
+    """
+    Encode a patient's age band and medical history as KB risk factor names.
+
+    Args:
+        age: Patient age (bands: age-under-40, age-40-55, age-55-70,
+            age-over-70 + age-over-65)
+        medical_history: Conditions in any spelling (normalized to KB form)
+
+    Returns:
+        Hashable profile for RiskTable.risk_multiplier()
+    """
+    factors = []
+    if age:
+        if age < 40:
+            factors.append('age-under-40')
+        elif age <= 55:
+            factors.append('age-40-55')
+        elif age <= 70:
+            factors.append('age-55-70')
+        else:
+            factors.extend(['age-over-70', 'age-over-65'])
+
+    if medical_history:
+        factors.extend(h.lower().replace(" ", "-").replace("_", "-") for h in medical_history)
+
+    return frozenset(factors)
+
+
+def risk_score_to_multiplier(total_risk_score: float) -> float:
+    """
+    Convert a summed risk score to a confidence multiplier.
+
+    Returns:
+        1.0 (no additional risk) to 2.5+ (very high risk)
+    """
+    if total_risk_score == 0:
+        return 1.0  # No additional risk
+    elif total_risk_score < 3.0:
+        return 1.0 + (total_risk_score / 10.0)  # 1.0-1.3 (low risk)
+    elif total_risk_score < 6.0:
+        return 1.3 + (total_risk_score / 8.0)  # 1.3-2.0 (medium risk)
+    else:
+        return 2.0 + (total_risk_score / 10.0)  # 2.0-2.5+ (high risk)
+
+
+class RiskTable:
+    """Condition -> risk factor multipliers, with memoized per-profile results."""
+
+    def __init__(self, facts: Iterable[Tuple[str, Any, Any]], cache_size: int = RISK_CACHE_SIZE):
+        """
+        Build the table.
+
+        Args:
+            facts: (condition, factor, multiplier) triples from risk-factor facts
+            cache_size: Maximum number of memoized (condition, profile) results
+        """
+        rows: Dict[str, List[Tuple[str, float]]] = {}
+        for condition, factor, multiplier in facts:
+            multiplier = _to_multiplier(multiplier)
+            if multiplier is not None:
+                rows.setdefault(condition, []).append((str(factor), multiplier))
+
+        # Highest risk first, like get_risk_factors(); fixes the summation order
+        self._factors: Dict[str, Tuple[Tuple[str, float], ...]] = {
+            condition: tuple(sorted(row, key=lambda rf: rf[1], reverse=True))
+            for condition, row in rows.items()
+        }
+        self._max_multipliers: Dict[str, float] = {}
+        self._risk_multiplier = functools.lru_cache(maxsize=cache_size)(self._compute)
+
+    def factors(self, condition: str) -> Tuple[Tuple[str, float], ...]:
+        """(factor, multiplier) pairs of a condition, highest multiplier first."""
+        return self._factors.get(condition, ())
+
+    def max_multiplier(self, condition: str) -> float:
+        """Highest risk multiplier any patient profile can get for a condition."""
+        multiplier = self._max_multipliers.get(condition)
+        if multiplier is None:
+            total = sum(value for _, value in self._factors.get(condition, ()) if value > 0)
+            multiplier = self._max_multipliers[condition] = risk_score_to_multiplier(total)
+        return multiplier
+
+    def risk_multiplier(self, condition: str, profile: PatientProfile) -> Tuple[float, List[str]]:
+        """
+        Get a condition's risk multiplier for an encoded patient profile.
+
+        Args:
+            condition: Medical condition name
+            profile: Result of encode_patient_profile()
+
+        Returns:
+            Tuple of (risk_multiplier, matched_risk_factors)
+        """
+        multiplier, matched = self._risk_multiplier(condition, profile)
+        return multiplier, list(matched)
+
+    def _compute(self, condition: str, profile: PatientProfile) -> Tuple[float, Tuple[str, ...]]:
+        total_risk_score = 0.0
+        matched = []
+        for factor, multiplier in self._factors.get(condition, ()):
+            if factor in profile:
+                matched.append(factor)
+                total_risk_score += multiplier
+        return risk_score_to_multiplier(total_risk_score), tuple(matched)
+
+    def cache_info(self):
+        """Hit/miss statistics of the (condition, profile) memo."""
+        return self._risk_multiplier.cache_info()
@@ -0,0 +1,70 @@
+"""
+Treatment Safety Matrix - Contraindications, drug interactions and dose adjustments
+
+Built once per knowledge base version from the contraindication,
+drug-interaction and requires-dose-adjustment facts. Each treatment maps
+to the sets of conditions and medications it conflicts with, so a
+patient's full safety check is a few set intersections per treatment
+instead of one KB query per (treatment, medication) and (treatment,
+history condition) pair.
+"""
+
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Tuple
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+def _group(facts: Iterable[Tuple[Any, Any]]) -> Dict[str, List[str]]:
+    """Group (treatment, value) pairs by treatment, keeping KB order."""
+    grouped: Dict[str, List[str]] = {}
+    for treatment, value in facts:
+        grouped.setdefault(str(treatment), []).append(str(value))
+    return grouped
+
+
+class TreatmentSafetyMatrix:
+    """Treatment -> contraindicated conditions, interacting drugs and dose-adjustment conditions."""
+
+    def __init__(
+        self,
+        contraindications: Iterable[Tuple[Any, Any]],
+        drug_interactions: Iterable[Tuple[Any, Any]],
+        dose_adjustments: Iterable[Tuple[Any, Any]],
+    ):
+        """
+        Build the matrix.
+
+        Args:
+            contraindications: (treatment, condition) pairs from contraindication facts
+            drug_interactions: (treatment, medication) pairs from drug-interaction facts
+            dose_adjustments: (treatment, condition) pairs from requires-dose-adjustment facts
+        """
+        contraindication_lists = _group(contraindications)
+        self._contraindications: Dict[str, Tuple[str, ...]] = {
+            treatment: tuple(conditions) for treatment, conditions in contraindication_lists.items()
+        }
+        self._contraindication_sets: Dict[str, FrozenSet[str]] = {
+            treatment: frozenset(conditions) for treatment, conditions in contraindication_lists.items()
+        }
+        self._interactions: Dict[str, FrozenSet[str]] = {
+            treatment: frozenset(medications) for treatment, medications in _group(drug_interactions).items()
+        }
+        self._dose_adjustments: Dict[str, FrozenSet[str]] = {
+            treatment: frozenset(conditions) for treatment, conditions in _group(dose_adjustments).items()
+        }
+
+    def contraindications(self, treatment: str) -> List[str]:
+        """All contraindications of a treatment, in KB order (same as get_all_contraindications())."""
+        return list(self._contraindications.get(treatment, ()))
+
+    def contraindicated_conditions(self, treatment: str, conditions: AbstractSet[str]) -> FrozenSet[str]:
+        """Patient conditions the treatment is contraindicated with."""
+        return self._contraindication_sets.get(treatment, _EMPTY) & conditions
+
+    def interacting_medications(self, treatment: str, medications: AbstractSet[str]) -> FrozenSet[str]:
+        """Patient medications the treatment has a drug interaction with."""
+        return self._interactions.get(treatment, _EMPTY) & medications
+
+    def dose_adjusted_conditions(self, treatment: str, conditions: AbstractSet[str]) -> FrozenSet[str]:
+        """Patient conditions that require a dose adjustment of the treatment."""
+        return self._dose_adjustments.get(treatment, _EMPTY) & conditions
@@ -0,0 +1,194 @@
+"""
+Symptom Matrix - Condition × symptom incidence matrix for confidence scoring
+
+Built once per knowledge base version from the has-symptom facts. Each
+condition's symptoms and each symptom's conditions are stored as Python
+integer bitsets, so scoring a patient against every condition is a few
+OR/AND/popcount operations instead of one KB lookup and set build per
+condition.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+def _popcount(mask: int) -> int:
+    """Number of set bits (int.bit_count() needs Python 3.10)."""
+    return bin(mask).count("1")
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits of a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class SymptomMatrix:
+    """Condition × symptom incidence matrix stored as integer bitsets."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]]):
+        """
+        Build the matrix.
+
+        Args:
+            pairs: (condition, symptom) pairs from has-symptom facts
+        """
+        self.conditions: List[str] = []
+        self.symptoms: List[str] = []
+        self._condition_ids: Dict[str, int] = {}
+        self._symptom_ids: Dict[str, int] = {}
+        # Row per condition: bits over symptom ids
+        self._condition_rows: List[int] = []
+        # Column per symptom: bits over condition ids
+        self._symptom_columns: List[int] = []
+        # Conditions per symptom in has-symptom fact order
+        self._symptom_conditions: List[Dict[str, None]] = []
+
+        for condition, symptom in pairs:
+            c = self._condition_ids.get(condition)
+            if c is None:
+                c = self._condition_ids[condition] = len(self.conditions)
+                self.conditions.append(condition)
+                self._condition_rows.append(0)
+            s = self._symptom_ids.get(symptom)
+            if s is None:
+                s = self._symptom_ids[symptom] = len(self.symptoms)
+                self.symptoms.append(symptom)
+                self._symptom_columns.append(0)
+                self._symptom_conditions.append({})
+            self._symptom_conditions[s].setdefault(condition)
+            self._condition_rows[c] |= 1 << s
+            self._symptom_columns[s] |= 1 << c
+
+        self._symptom_totals = [_popcount(row) for row in self._condition_rows]
+
+    def symptom_count(self, condition: str) -> int:
+        """Number of symptoms the knowledge base lists for a condition (0 if unknown)."""
+        c = self._condition_ids.get(condition)
+        return 0 if c is None else self._symptom_totals[c]
+
+    def encode(self, symptoms: Iterable[str]) -> int:
+        """Encode normalized symptom names as a bitset (unknown symptoms are ignored)."""
+        mask = 0
+        for symptom in symptoms:
+            s = self._symptom_ids.get(symptom)
+            if s is not None:
+                mask |= 1 << s
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        """Decode a symptom bitset into symptom names."""
+        return [self.symptoms[s] for s in _iter_bits(mask)]
+
+    def conditions_with_any(self, symptoms: Iterable[str]) -> List[str]:
+        """Conditions that have at least one of the given symptoms."""
+        candidates = 0
+        for s in _iter_bits(self.encode(symptoms)):
+            candidates |= self._symptom_columns[s]
+        return [self.conditions[c] for c in _iter_bits(candidates)]
+
+    def score_mask(self, patient_mask: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Score every condition against an encoded symptom set.
+
+        Only conditions sharing at least one symptom with the patient are
+        visited; their candidate set is the OR of the symptom columns.
+
+        Args:
+            patient_mask: Encoded patient symptoms
+
+        Returns:
+            {condition: {'matched_mask', 'match_count', 'total', 'match_ratio'}}
+        """
+        candidates = 0
+        for s in _iter_bits(patient_mask):
+            candidates |= self._symptom_columns[s]
+
+        scores = {}
+        rows = self._condition_rows
+        totals = self._symptom_totals
+        for c in _iter_bits(candidates):
+            matched = rows[c] & patient_mask
+            count = _popcount(matched)
+            scores[self.conditions[c]] = {
+                'matched_mask': matched,
+                'match_count': count,
+                'total': totals[c],
+                'match_ratio': count / totals[c],
+            }
+        return scores
+
+    def score(self, symptoms: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Score every condition against normalized symptom names.
+
+        Returns:
+            Same as score_mask(), keyed by condition
+        """
+        return self.score_mask(self.encode(symptoms))
+
+    def match_counts(self, symptoms: Iterable[str]) -> Dict[str, int]:
+        """
+        Number of the patient's symptoms each condition sharing one has.
+
+        Keys are in first-seen order, walking the symptoms as given and
+        each symptom's conditions in has-symptom fact order.
+
+        Args:
+            symptoms: Normalized symptom names (repeats are counted once)
+
+        Returns:
+            {condition: match_count}
+        """
+        counts: Dict[str, int] = {}
+        seen = set()
+        for symptom in symptoms:
+            s = self._symptom_ids.get(symptom)
+            if s is None or s in seen:
+                continue
+            seen.add(s)
+            for condition in self._symptom_conditions[s]:
+                counts[condition] = counts.get(condition, 0) + 1
+        return counts
+
+    def rank(self, symptoms: Iterable[str]) -> List[str]:
+        """
+        Conditions sharing a symptom with the patient, by match count (descending).
+
+        Ties keep first-seen order (see match_counts()), the same order as
+        MeTTaQueryEngine.score_conditions_by_symptoms().
+
+        Args:
+            symptoms: Normalized symptom names
+
+        Returns:
+            Condition names
+        """
+        counts = self.match_counts(symptoms)
+        # Stable sort, so ties keep first-seen order
+        return sorted(counts, key=counts.__getitem__, reverse=True)
+
+    def match_ratio(self, condition: str, match_count: int) -> float:
+        """Share of a condition's symptoms that match_count matched symptoms make up."""
+        return match_count / self._symptom_totals[self._condition_ids[condition]]
+
+    def score_batch(self, symptom_sets: Sequence[Iterable[str]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Score many symptom sets; identical sets are scored once.
+
+        Args:
+            symptom_sets: Normalized symptom names per request
+
+        Returns:
+            One score dict per request, in order
+        """
+        by_mask: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        results = []
+        for symptoms in symptom_sets:
+            mask = self.encode(symptoms)
+            scores = by_mask.get(mask)
+            if scores is None:
+                scores = by_mask[mask] = self.score_mask(mask)
+            results.append(scores)
+        return results
@@ -0,0 +1,109 @@
+"""
+Triage Table - Condition-level urgency facts for in-memory triage
+
+Built once per knowledge base version from the has-urgency, has-severity,
+time-sensitive, requires-action, specialist-referral and follow-up-timeline
+facts, so urgency assessment, specialist routing and follow-up planning are
+dict lookups instead of several KB queries per request.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ConditionTriage:
+    """Triage facts for one condition"""
+    urgency: str = "unknown"
+    severity: str = "unknown"
+    time_sensitive_hours: Optional[int] = None
+    required_action: str = "consult-doctor"
+    specialist: Optional[str] = None
+
+
+# Entry for conditions without any triage facts
+UNKNOWN_TRIAGE = ConditionTriage()
+
+
+def _to_hours(value: Any) -> Optional[int]:
+    """Convert a time-sensitive value to whole hours (None if not numeric)."""
+    if isinstance(value, bool):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        return int(float(str(value)))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class TriageTable:
+    """Condition -> ConditionTriage lookup plus the emergency condition set."""
+
+    def __init__(
+        self,
+        urgency: Iterable[Tuple[str, Any]],
+        severity: Iterable[Tuple[str, Any]],
+        time_sensitive: Iterable[Tuple[str, Any]],
+        required_action: Iterable[Tuple[str, Any]],
+        specialist: Iterable[Tuple[str, Any]] = (),
+        follow_up: Iterable[Tuple[str, Any]] = (),
+    ):
+        """
+        Build the table.
+
+        The first fact per condition wins, matching the engine's
+        single-value lookups (find_urgency_level() etc.).
+
+        Args:
+            urgency: (condition, level) pairs from has-urgency facts
+            severity: (condition, level) pairs from has-severity facts
+            time_sensitive: (condition, hours) pairs from time-sensitive facts
+            required_action: (condition, action) pairs from requires-action facts
+            specialist: (condition, specialist) pairs from specialist-referral facts
+            follow_up: (urgency level, timeline) pairs from follow-up-timeline facts
+        """
+        fields: Dict[str, Dict[str, Any]] = {}
+        emergency = set()
+
+        for condition, level in urgency:
+            fields.setdefault(condition, {}).setdefault('urgency', str(level))
+            if str(level) == "emergency":
+                emergency.add(condition)
+        for condition, level in severity:
+            fields.setdefault(condition, {}).setdefault('severity', str(level))
+        for condition, hours in time_sensitive:
+            fields.setdefault(condition, {}).setdefault('time_sensitive_hours', _to_hours(hours))
+        for condition, action in required_action:
+            fields.setdefault(condition, {}).setdefault('required_action', str(action))
+        for condition, referral in specialist:
+            fields.setdefault(condition, {}).setdefault('specialist', str(referral))
+
+        self._follow_up: Dict[str, str] = {}
+        for level, timeline in follow_up:
+            self._follow_up.setdefault(str(level), str(timeline))
+
+        self._entries: Dict[str, ConditionTriage] = {
+            condition: ConditionTriage(**values) for condition, values in fields.items()
+        }
+        # Every condition with an emergency has-urgency fact, not just the first
+        self.emergency_conditions: FrozenSet[str] = frozenset(emergency)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, condition: str) -> bool:
+        return condition in self._entries
+
+    def get(self, condition: str) -> ConditionTriage:
+        """Get a condition's triage facts (UNKNOWN_TRIAGE if it has none)."""
+        return self._entries.get(condition, UNKNOWN_TRIAGE)
+
+    def follow_up_timeline(self, urgency_level: str) -> Optional[str]:
+        """Follow-up timeline of an urgency level (unknown levels use routine's; None if absent)."""
+        timeline = self._follow_up.get(urgency_level)
+        return timeline if timeline is not None else self._follow_up.get("routine")
+
+    def is_emergency(self, condition: str) -> bool:
+        """Whether any has-urgency fact marks the condition as an emergency."""
+        return condition in self.emergency_conditions
@@ -241,6 +241,8 @@ class SymptomAnalysisResponseMsg(Model):
     reasoning_chain: List[str]
     recommended_next_step: str
     responding_agent: str
+    kb_version: Optional[int] = None  # Knowledge base version used for the analysis
+    timings: Optional[Dict[str, float]] = None  # analysis stage -> milliseconds
 
 
 class TreatmentRequestMsg(Model):
@@ -256,6 +258,7 @@ class TreatmentRequestMsg(Model):
     current_medications: Optional[List[str]]
     medical_history: Optional[List[str]]
     requesting_agent: str
+    max_conditions: Optional[int] = None  # Cover primary + alternatives in one response (default: primary only)
 
 
 class TreatmentResponseMsg(Model):
@@ -273,6 +276,8 @@ class TreatmentResponseMsg(Model):
     follow_up_timeline: Optional[str]
     medical_disclaimer: str
     responding_agent: str
+    kb_version: Optional[int] = None  # Knowledge base version used for the recommendations
+    condition_treatments: Optional[Dict[str, List[str]]] = None  # covered condition -> its treatments
 
 
 class AgentAcknowledgementMsg(Model):
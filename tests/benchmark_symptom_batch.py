@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch symptom analysis
+
+Compares SymptomAnalyzer.analyze_batch() with one analyze_symptoms() call
+per record, over distinct records drawn from the knowledge base, in indexed
+and MeTTa (non-indexed) mode.
+
+Usage: python tests/benchmark_symptom_batch.py [record_count]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import SymptomAnalyzer
+
+HISTORY = ["smoking", "diabetes", "hypertension", "obesity", "asthma"]
+
+
+def distinct_patients(engine, count):
+    """Distinct patient records drawn from the knowledge base's symptoms"""
+    symptoms = sorted(engine.get_symptom_matrix().symptoms)
+    rng = random.Random(12)
+    patients = {}
+    while len(patients) < count:
+        record = tuple(rng.sample(symptoms, rng.randint(2, 5)))
+        patients[record] = {
+            "symptoms": list(record),
+            "age": rng.randint(1, 90),
+            "medical_history": rng.sample(HISTORY, rng.randint(0, 2)),
+        }
+    return list(patients.values())
+
+
+def best_time(run, repeats=3):
+    """Fastest of several runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(indexed, count):
+    """Print single-record vs batch throughput for one engine mode"""
+    analyzer = SymptomAnalyzer(MeTTaQueryEngine(indexed=indexed))
+    patients = distinct_patients(analyzer.metta, count)
+
+    # Warm the per-KB-version tables and the query cache
+    analyzer.analyze_batch(patients[:50])
+    for patient in patients[:50]:
+        analyzer.analyze_symptoms(**patient)
+
+    single = best_time(lambda: [analyzer.analyze_symptoms(**patient) for patient in patients])
+    batch = best_time(lambda: analyzer.analyze_batch(patients))
+
+    mode = "indexed" if indexed else "metta"
+    print(f"{mode:8} single: {single:7.3f}s ({count / single:9,.0f} records/s)   "
+          f"batch: {batch:7.3f}s ({count / batch:9,.0f} records/s)   "
+          f"speedup: {single / batch:5.1f}x")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print("=" * 70)
+    print(f"Batch symptom analysis: {count:,} distinct records")
+    print("=" * 70)
+    for indexed in (True, False):
+        benchmark(indexed, count)
+
+
+if __name__ == "__main__":
+    main()
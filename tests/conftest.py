@@ -0,0 +1,29 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+# Facts behind every table the engine derives from the knowledge base
+SMALL_KB = """
+(has-symptom flu fever)
+(has-symptom flu cough)
+(red-flag-symptom chest-pain true)
+(red-flag-rule sepsis-signs "Possible sepsis")
+(red-flag-rule-symptom sepsis-signs fever fever)
+(risk-factor stroke hypertension 2.5)
+(symptom-attribute headache onset-pattern sudden)
+(has-urgency stroke emergency)
+(time-sensitive stroke 3)
+(treatment-protocol stroke 1 call-911 immediate critical)
+(drug-interaction aspirin warfarin)
+"""
+
+
+@pytest.fixture
+def small_kb_engine(tmp_path):
+    """Indexed engine over a small knowledge base file (snapshot kept in tmp_path)"""
+    kb_file = tmp_path / "kb.metta"
+    kb_file.write_text(SMALL_KB)
+    return MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
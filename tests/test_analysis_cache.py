@@ -0,0 +1,153 @@
+"""
+Unit Tests for memoized symptom analysis (canonical patient profiles)
+Tests request canonicalization, cache hits and per-KB-version invalidation
+"""
+import pytest
+from src.metta.query_cache import QueryCache
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import (
+    AnalysisSession,
+    SymptomAnalyzer,
+    age_band,
+    canonicalize_analysis_request,
+    normalize_analysis_request,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Indexed engine over the default knowledge base"""
+    return MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+
+@pytest.fixture
+def analyzer(engine):
+    return SymptomAnalyzer(engine, result_cache=QueryCache(max_size=16))
+
+
+def _without_timings(result):
+    return {key: value for key, value in result.items() if key != "timings"}
+
+
+@pytest.mark.unit
+class TestCanonicalizeAnalysisRequest:
+    """Test the canonical patient record"""
+
+    def test_order_and_spelling_ignored(self):
+        """Test that equivalent records share one canonical form"""
+        first = canonicalize_analysis_request(
+            ["Headache", "fever", "Chest Pain"], 40, {"chest_pain": 7}, ["smoking", "Diabetes"]
+        )
+        second = canonicalize_analysis_request(
+            ["chest-pain", "headache", "fever", "fever"], 40, {"Chest Pain": 7}, ["diabetes", "smoking"]
+        )
+        assert first == second
+        assert first["symptoms"] == ["chest-pain", "fever", "headache"]
+        assert first["medical_history"] == ["diabetes", "smoking"]
+
+    def test_empty_optionals(self):
+        """Test that missing and empty optional fields are the same"""
+        assert canonicalize_analysis_request(["fever"], None, {}, [], {}) == \
+            canonicalize_analysis_request(["fever"])
+
+    def test_age_zero_kept(self):
+        """Test that an age of 0 is not dropped"""
+        assert canonicalize_analysis_request(["fever"], 0)["age"] == 0
+
+    @pytest.mark.parametrize("first,second,same_band", [
+        (30, 38, True),
+        (41, 55, True),
+        (4, 5, False),
+        (39, 40, False),
+        (55, 56, False),
+        (65, 66, False),
+        (70, 71, False),
+        (None, 0, False),
+    ])
+    def test_age_banded(self, first, second, same_band):
+        """Test that ages share a canonical form only within a band"""
+        assert (canonicalize_analysis_request(["fever"], first) ==
+                canonicalize_analysis_request(["fever"], second)) == same_band
+        assert age_band(age_band(first)) == age_band(first)
+
+    def test_normalized_record_keeps_order(self):
+        """Test that the analyzed record keeps order and repeats"""
+        record = normalize_analysis_request(["Headache", "fever", "headache"], 0, None, ["Smoking", "diabetes"])
+        assert record["symptoms"] == ["headache", "fever", "headache"]
+        assert record["age"] == 0
+        assert record["medical_history"] == ["smoking", "diabetes"]
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestAnalyzeCached:
+    """Test analyze_cached"""
+
+    @pytest.mark.parametrize("record", [
+        {"symptoms": ["headache", "fever", "cough"], "age": 70, "medical_history": ["smoking", "diabetes"]},
+        {"symptoms": ["neck-stiffness", "fever", "severe-headache", "fever"], "age": 25,
+         "severity_scores": {"severe-headache": 9, "fever": 8}},
+        {"symptoms": ["chest-pain", "shortness-of-breath", "chest-pain"], "age": 0,
+         "medical_history": ["diabetes", "diabetes"]},
+    ])
+    def test_matches_direct_analysis(self, analyzer, record):
+        """Test that results equal analyze_symptoms() for unsorted and repeated records"""
+        expected = _without_timings(analyzer.analyze_symptoms(**record))
+        assert _without_timings(analyzer.analyze_cached(**record)) == expected
+        # Served from the cache the second time
+        assert _without_timings(analyzer.analyze_cached(**record)) == expected
+        assert analyzer.result_cache.hits == 1
+
+    def test_repeat_profile_served_from_cache(self, analyzer):
+        """Test that an equivalent record is a cache hit with the same reasoning"""
+        first = analyzer.analyze_cached(["fever", "cough", "headache"], age=30)
+        second = analyzer.analyze_cached(["Headache", "Cough", "fever"], age=30)
+        assert second == first
+        assert second is not first
+        assert analyzer.result_cache.hits == 1
+
+    @pytest.mark.parametrize("first,second", [(30, 38), (68, 70), (80, 95)])
+    def test_age_band_served_from_cache(self, analyzer, first, second):
+        """Test that an age in the same band is a hit reporting its own age"""
+        record = {"symptoms": ["chest-pain", "shortness-of-breath", "fever"], "medical_history": ["smoking"]}
+        analyzer.analyze_cached(**record, age=first)
+        result = analyzer.analyze_cached(**record, age=second)
+        assert analyzer.result_cache.hits == 1
+        assert _without_timings(result) == _without_timings(analyzer.analyze_symptoms(**record, age=second))
+
+    def test_kb_change_invalidates(self, analyzer, engine):
+        """Test that a knowledge base change forces a fresh analysis"""
+        first = analyzer.analyze_cached(["fever", "cough"])
+        engine.add_fact("(has-symptom influenza cough)")
+        second = analyzer.analyze_cached(["fever", "cough"])
+        assert analyzer.result_cache.hits == 0
+        assert second["kb_version"] == first["kb_version"] + 1
+
+    def test_session_misses_analyzed_incrementally(self, analyzer):
+        """Test that misses within a session go through analyze_incremental"""
+        session = AnalysisSession("session-test")
+        analyzer.analyze_cached(["fever", "cough"], age=45, session=session)
+        analyzer.analyze_cached(["fever", "cough", "fatigue"], age=45, session=session)
+        assert session.turns == 2
+        assert session.reused_count > 0
+
+    def test_session_updated_on_hits(self, analyzer):
+        """Test that a cache hit is recorded as the session's latest turn"""
+        attributes = {"Chest Pain": {"location": "substernal"}}
+        analyzer.analyze_cached(["chest-pain", "fever"], age=45, symptom_attributes=attributes)
+        session = AnalysisSession("session-hit")
+        analyzer.analyze_cached(["fever", "Chest Pain"], age=45, symptom_attributes=attributes, session=session)
+
+        assert analyzer.result_cache.hits == 1
+        assert session.turns == 1
+        assert session.symptoms == {"chest-pain", "fever"}
+        assert set(session.attribute_matches) == {"chest-pain"}
+        assert session.reused_count == len(session.condition_results) > 0
+
+        # The follow-up only rescores what changed since the hit
+        record = {"symptoms": ["chest-pain", "fever", "fatigue"], "age": 45,
+                  "symptom_attributes": {"chest-pain": {"location": "substernal"}}}
+        result = analyzer.analyze_cached(**record, session=session)
+        assert session.turns == 2
+        assert session.reused_count > 0
+        assert _without_timings(result) == _without_timings(analyzer.analyze_symptoms(**record))
@@ -0,0 +1,54 @@
+"""
+Unit Tests for per-stage symptom analysis timings
+Tests that stages are timed when enabled and omitted otherwise
+"""
+import pytest
+from src.metta.query_cache import QueryCache
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import SymptomAnalyzer
+
+STAGES = [
+    "red_flags", "attribute_match", "condition_match",
+    "confidence_scoring", "urgency", "differential", "total",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Indexed engine over the default knowledge base"""
+    return MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestAnalysisTimings:
+    """Test the timings field of analysis results"""
+
+    def test_stages_timed(self, engine):
+        """Test that every stage is reported, in order, with a consistent total"""
+        result = SymptomAnalyzer(engine, record_timings=True).analyze_symptoms(["fever", "cough"], age=30)
+        timings = result["timings"]
+        assert list(timings) == STAGES
+        assert all(ms >= 0 for ms in timings.values())
+        assert timings["total"] >= max(ms for stage, ms in timings.items() if stage != "total")
+
+    def test_disabled_by_default(self, engine):
+        """Test that results carry no timings unless requested"""
+        assert SymptomAnalyzer(engine).analyze_symptoms(["fever"])["timings"] == {}
+
+    def test_batch_timings(self, engine):
+        """Test that batch results carry the whole batch's stage timings"""
+        results = SymptomAnalyzer(engine, record_timings=True).analyze_batch(
+            [{"symptoms": ["fever", "cough"]}, {"symptoms": ["headache"], "age": 70}]
+        )
+        assert list(results[0]["timings"]) == STAGES
+        assert results[0]["timings"] == results[1]["timings"]
+
+    def test_cache_hit_timings(self, engine):
+        """Test that a cache hit reports its own lookup, not the cached analysis"""
+        analyzer = SymptomAnalyzer(engine, result_cache=QueryCache(max_size=4), record_timings=True)
+        first = analyzer.analyze_cached(["fever", "cough"])
+        second = analyzer.analyze_cached(["cough", "fever"])
+        assert list(first["timings"]) == STAGES
+        assert list(second["timings"]) == ["cache_lookup", "total"]
+        assert second["reasoning_chain"] == first["reasoning_chain"]
@@ -0,0 +1,68 @@
+"""
+Unit Tests for the async MeTTa query facade
+Tests awaitable query methods, pass-through attributes and the concurrency bound
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from src.metta.async_query_engine import AsyncMeTTaQueryEngine
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+KB_TEXT = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-urgency flu routine-care)
+"""
+
+
+@pytest.fixture
+def async_engine(tmp_path):
+    """Async facade over an indexed engine with two worker threads"""
+    kb_file = tmp_path / "kb.metta"
+    kb_file.write_text(KB_TEXT)
+    engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+    async_engine = AsyncMeTTaQueryEngine(engine, max_concurrency=2)
+    yield async_engine
+    async_engine.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestAsyncMeTTaQueryEngine:
+    """Test the awaitable engine facade"""
+
+    async def test_query_methods_are_awaitable(self, async_engine):
+        """Test that engine methods return the same results when awaited"""
+        assert await async_engine.find_symptoms_by_condition("flu") == ["fever"]
+        assert await async_engine.find_urgency_level("flu") == "routine-care"
+
+    async def test_attributes_pass_through(self, async_engine):
+        """Test that non-callable attributes are not wrapped"""
+        assert async_engine.kb_version == 1
+
+    async def test_runs_off_the_event_loop(self, async_engine):
+        """Test that engine work runs on executor threads"""
+        loop_thread = threading.get_ident()
+        worker_thread = await async_engine.run(threading.get_ident)
+        assert worker_thread != loop_thread
+
+    async def test_concurrency_bound(self, async_engine):
+        """Test that no more than max_concurrency calls run at once"""
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(async_engine.run(work) for _ in range(8)))
+        assert peak <= 2
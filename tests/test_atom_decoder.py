@@ -0,0 +1,52 @@
+"""
+Unit Tests for structural decoding of hyperon atoms
+Tests that MeTTa results decode to Python values without string parsing
+"""
+import pytest
+from hyperon import E, S, V, ValueAtom
+
+from src.metta.atom_decoder import decode_atom, decode_results
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestAtomDecoder:
+    """Test decoding of individual atoms"""
+
+    def test_symbol(self):
+        """Test symbols decode to strings"""
+        assert decode_atom(S("fever")) == "fever"
+
+    def test_string_literal_symbol(self):
+        """Test quoted string symbols lose their quotes and keep commas"""
+        assert decode_atom(S('"Rest, fluids, and sleep."')) == "Rest, fluids, and sleep."
+
+    def test_variable(self):
+        """Test variables decode to $name"""
+        assert decode_atom(V("x")) == "$x"
+
+    def test_grounded_numbers(self):
+        """Test grounded numbers keep their Python type"""
+        assert decode_atom(ValueAtom(3)) == 3
+        assert decode_atom(ValueAtom(2.5)) == 2.5
+
+    def test_expression(self):
+        """Test expressions decode to tuples"""
+        atom = E(S("age-over-65"), ValueAtom(3.5))
+        assert decode_atom(atom) == ("age-over-65", 3.5)
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestDecodeResults:
+    """Test decoding of MeTTa.run result lists"""
+
+    def test_flattens_nested_results(self):
+        """Test [[a, b], [c]] decodes to [a, b, c]"""
+        results = [[S("fever"), S("cough")], [S("headache")]]
+        assert decode_results(results) == ["fever", "cough", "headache"]
+
+    def test_empty_results(self):
+        """Test empty results decode to an empty list"""
+        assert decode_results([]) == []
+        assert decode_results([[]]) == []
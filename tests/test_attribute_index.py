@@ -0,0 +1,46 @@
+"""
+Unit Tests for the precompiled symptom attribute index (EPIC 7 - Phase 3)
+Tests attribute type resolution, value matching and memoization
+"""
+import pytest
+from src.metta.attribute_index import SymptomAttributeIndex
+
+
+@pytest.fixture
+def index():
+    """Index over chest pain attributes"""
+    return SymptomAttributeIndex([
+        ("chest-pain", "duration-typical", "5-30-minutes"),
+        ("chest-pain", "duration-range", "acute-to-hours"),
+        ("chest-pain", "location-primary", "substernal-or-left-chest"),
+        ("chest-pain", "character", "Crushing-or-pressure"),
+    ])
+
+
+@pytest.mark.unit
+class TestSymptomAttributeIndex:
+    """Test attribute matching"""
+
+    def test_key_resolves_to_every_containing_type(self, index):
+        """Test that 'duration' covers duration-typical and duration-range"""
+        assert index.match("chest-pain", "duration", "5-30 minutes") == "duration-typical"
+        assert index.match("chest-pain", "Duration", "acute") == "duration-range"
+
+    def test_bidirectional_substring_values(self, index):
+        """Test patient values matching inside or around KB values"""
+        assert index.match("chest-pain", "location", "substernal") == "location-primary"
+        assert index.match("chest-pain", "character", "crushing-or-pressure-like") == "character"
+        assert index.match("chest-pain", "character", "sharp") is None
+
+    def test_unknown_symptom_or_key(self, index):
+        """Test that unknown symptoms and keys never match"""
+        assert not index.has_attributes("fever")
+        assert index.match("fever", "duration", "days") is None
+        assert index.match("chest-pain", "radiation", "left-arm") is None
+
+    def test_attributes_and_memo(self, index):
+        """Test the raw attribute view and (symptom, attr, value) memoization"""
+        assert index.attributes("chest-pain")["character"] == ["Crushing-or-pressure"]
+        index.match("chest-pain", "location", "substernal")
+        index.match("chest-pain", "location", "substernal")
+        assert index.cache_info().hits == 1
@@ -0,0 +1,128 @@
+"""
+Unit Tests for the thread-safe MeTTa query path
+Tests the readers-writer lock and concurrent engine reads/writes
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.metta.atom_decoder import decode_results
+from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.rw_lock import ReadWriteLock
+
+
+KB_TEXT = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-symptom flu cough)
+"""
+
+
+@pytest.mark.unit
+class TestReadWriteLock:
+    """Test shared/exclusive locking"""
+
+    def test_readers_share_the_lock(self):
+        """Test that several readers hold the lock at the same time"""
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with lock.read_locked():
+                barrier.wait()  # Only passes if all three readers are inside
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not barrier.broken
+
+    def test_writer_excludes_readers(self):
+        """Test that readers wait while a writer holds the lock"""
+        lock = ReadWriteLock()
+        events = []
+
+        def reader():
+            with lock.read_locked():
+                events.append("read")
+
+        with lock.write_locked():
+            t = threading.Thread(target=reader)
+            t.start()
+            time.sleep(0.05)
+            events.append("write-done")
+        t.join()
+
+        assert events == ["write-done", "read"]
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestConcurrentEngine:
+    """Test engine queries from a thread pool"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        """Indexed engine with two interpreter replicas"""
+        kb_file = tmp_path / "kb.metta"
+        kb_file.write_text(KB_TEXT)
+        return MeTTaQueryEngine(
+            str(kb_file), indexed=True, replicas=2, snapshot_path=str(tmp_path / "kb.kbsnap")
+        )
+
+    def test_parallel_reads_with_writes(self, engine):
+        """Test that reads stay consistent while facts are added"""
+        def read(_):
+            return sorted(engine.find_symptoms_by_condition("flu"))[:2]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(read, i) for i in range(200)]
+            for i in range(10):
+                engine.add_fact(f"(has-symptom flu extra-{i})")
+            results = [f.result() for f in futures]
+
+        assert all(result == ["cough", "extra-0"] or result == ["cough", "fever"] for result in results)
+        assert len(engine.find_symptoms_by_condition("flu")) == 12
+
+    def test_replicas_bounded(self, engine):
+        """Test that raw queries never create more interpreters than allowed"""
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda _: engine.query("!(match &self (is-condition $c) $c)"), range(30)))
+
+        assert 1 <= len(engine._kb.replicas) <= 2
+
+    def test_space_load_does_not_block_writes(self, engine, tmp_path):
+        """Test that a lazy space load parses outside the generation's lock"""
+        # Second start comes from the snapshot, so its MeTTa space loads lazily
+        engine = MeTTaQueryEngine(
+            str(tmp_path / "kb.metta"), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap")
+        )
+        assert not engine._space_loaded
+
+        parsing, release = threading.Event(), threading.Event()
+        load_space = engine._load_space
+
+        def slow_load_space(*args):
+            parsing.set()
+            release.wait(5)
+            load_space(*args)
+
+        engine._load_space = slow_load_space
+        loader = threading.Thread(target=engine.query, args=("!(match &self (has-symptom flu $s) $s)",))
+        loader.start()
+        assert parsing.wait(5)
+
+        # Writes (and readers) go through while the source is being parsed
+        writer = threading.Thread(target=engine.add_fact, args=("(has-symptom flu chills)",))
+        writer.start()
+        writer.join(1)
+        assert not writer.is_alive()
+
+        release.set()
+        loader.join()
+        assert engine._space_loaded
+        assert "chills" in engine.find_symptoms_by_condition("flu")
+        results = engine.query("!(match &self (has-symptom flu $s) $s)")
+        assert "chills" in decode_results(results)
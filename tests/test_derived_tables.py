@@ -0,0 +1,41 @@
+"""
+Unit Tests for tables the query engine derives from the knowledge base
+Tests that each table is built once per KB version and rebuilt after add_fact
+"""
+import pytest
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestDerivedTables:
+    """Test the engine's per-version derived tables"""
+
+    @pytest.mark.parametrize("getter,fact,check", [
+        ("get_symptom_matrix", "(has-symptom flu chills)",
+         lambda matrix: matrix.symptom_count("flu") == 3),
+        ("_get_symptom_condition_index", "(has-symptom flu chills)",
+         lambda index: index.get("chills") == ["flu"]),
+        ("get_red_flag_matcher", "(red-flag-rule-symptom sepsis-signs confusion confusion)",
+         lambda matcher: matcher.detect(["fever"]) == []),
+        ("get_risk_table", "(risk-factor stroke smoking 2.0)",
+         lambda table: len(table.factors("stroke")) == 2),
+        ("get_symptom_attribute_index", "(symptom-attribute headache character throbbing)",
+         lambda index: index.match("headache", "character", "throbbing") == "character"),
+        ("get_triage_table", "(requires-action stroke call-911)",
+         lambda table: table.get("stroke").required_action == "call-911"),
+        ("get_protocol_library", "(treatment-protocol stroke 2 tPA-within-3-hours 0-3h critical)",
+         lambda library: len(library.steps("stroke")) == 2),
+        ("get_treatment_safety_matrix", "(requires-dose-adjustment aspirin kidney-disease)",
+         lambda matrix: matrix.dose_adjusted_conditions("aspirin", {"kidney-disease"}) == {"kidney-disease"}),
+    ])
+    def test_rebuilt_after_add_fact(self, small_kb_engine, getter, fact, check):
+        """Test that the table is cached per KB version and reflects added facts"""
+        table = getattr(small_kb_engine, getter)()
+        assert getattr(small_kb_engine, getter)() is table
+        assert not check(table)
+
+        small_kb_engine.add_fact(fact)
+        rebuilt = getattr(small_kb_engine, getter)()
+        assert rebuilt is not table
+        assert check(rebuilt)
+        assert getattr(small_kb_engine, getter)() is rebuilt
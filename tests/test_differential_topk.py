@@ -0,0 +1,89 @@
+"""
+Unit Tests for top-k differential scoring
+Tests upper-bound pruning in calculate_confidence_scores and top-k selection
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import SymptomAnalyzer
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Analyzer over a KB where eight conditions of different sizes share fever"""
+    facts = ["(has-symptom flu fever)", "(has-symptom flu cough)", "(risk-factor flu smoking 2.0)"]
+    for i in range(7):
+        facts.append(f"(has-symptom rare-{i} fever)")
+        facts.extend(f"(has-symptom rare-{i} sign-{i}-{j})" for j in range(9 + i))
+    kb_file = tmp_path / "kb.metta"
+    kb_file.write_text("\n".join(facts) + "\n")
+    engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+    return SymptomAnalyzer(engine)
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestTopKDifferential:
+    """Test pruning of conditions that cannot reach the top-k"""
+
+    def test_pruned_scores_match_full_scores(self, analyzer):
+        """Test that pruning only drops conditions, never changes scores"""
+        symptoms = ["fever", "cough"]
+        conditions = analyzer.find_matching_conditions(symptoms)
+        full, _ = analyzer.calculate_confidence_scores(symptoms, conditions)
+        top, _ = analyzer.calculate_confidence_scores(symptoms, conditions, top_k=2)
+
+        assert len(top) < len(full)
+        assert all(full[condition] == score for condition, score in top.items())
+        assert analyzer.generate_differential_diagnoses(top, max_count=2) == \
+            analyzer.generate_differential_diagnoses(full, max_count=2)
+
+    def test_no_pruning_without_top_k(self, analyzer):
+        """Test that every condition is scored by default"""
+        conditions = analyzer.find_matching_conditions(["fever"])
+        scores, adjustments = analyzer.calculate_confidence_scores(["fever"], conditions)
+        assert list(scores) == conditions
+        assert list(adjustments) == conditions
+
+    def test_top_k_keeps_stable_tie_order(self, analyzer):
+        """Test that equal confidences keep their input order"""
+        scores = {"a": 0.5, "b": 0.9, "c": 0.5, "d": 0.5}
+        assert analyzer.generate_differential_diagnoses(scores, max_count=3) == ["b", "a", "c"]
+
+    def test_analysis_matches_unpruned(self, analyzer):
+        """Test that pruning only drops low scores, never changes the rest of the analysis"""
+        analyzer.metta.add_fact("(risk-factor rare-6 smoking 4.0)")
+        symptoms = ["fever", "cough", "sign-0-0", "sign-1-0", "sign-2-0", "sign-3-0"]
+        pruned = analyzer.analyze_symptoms(symptoms, medical_history=["smoking"])
+        analyzer.PRUNE_CONFIDENCE_CEILING = -1.0
+        full = analyzer.analyze_symptoms(symptoms, medical_history=["smoking"])
+
+        # rare-6 is pruned but its risk factor still shows in the reasoning
+        assert "rare-6" not in pruned["confidence_scores"]
+        assert any("Risk factors detected for: rare-6" in line for line in pruned["reasoning_chain"])
+        for key in ("urgency_level", "red_flags", "differential_diagnoses",
+                    "reasoning_chain", "recommended_next_step"):
+            assert pruned[key] == full[key]
+        assert pruned["confidence_scores"].items() < full["confidence_scores"].items()
+        assert all(score <= analyzer.__class__.PRUNE_CONFIDENCE_CEILING
+                   for condition, score in full["confidence_scores"].items()
+                   if condition not in pruned["confidence_scores"])
+
+    def test_pruned_conditions_not_risk_scored(self, analyzer):
+        """Test that the risk reasoning only scores pruned conditions that can be high-risk"""
+        calls = []
+        calculate = analyzer._calculate_risk_multiplier
+
+        def counting(condition, *args):
+            calls.append(condition)
+            return calculate(condition, *args)
+
+        analyzer._calculate_risk_multiplier = counting
+        symptoms = ["fever", "cough", "sign-0-0", "sign-1-0", "sign-2-0", "sign-3-0"]
+        result = analyzer.analyze_symptoms(symptoms, medical_history=["smoking"])
+        assert sorted(calls) == sorted(result["confidence_scores"])
+
+        analyzer.metta.add_fact("(risk-factor rare-6 smoking 4.0)")
+        calls.clear()
+        result = analyzer.analyze_symptoms(symptoms, medical_history=["smoking"])
+        assert "rare-6" not in result["confidence_scores"]
+        assert sorted(calls) == sorted([*result["confidence_scores"], "rare-6"])
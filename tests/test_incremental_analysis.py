@@ -0,0 +1,65 @@
+"""
+Unit Tests for incremental (per-session) symptom re-analysis
+Tests that follow-up turns match a full analysis and reuse unaffected scores
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import AnalysisSession, SymptomAnalyzer
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Indexed engine over the default knowledge base"""
+    return MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+
+@pytest.fixture
+def analyzer(engine):
+    return SymptomAnalyzer(engine)
+
+
+TURNS = [
+    {"symptoms": ["fever", "cough"], "age": 45},
+    {"symptoms": ["fever", "cough", "fatigue"], "age": 45},
+    {"symptoms": ["fever", "cough", "fatigue"], "age": 45, "severity_scores": {"fever": 8}},
+    {"symptoms": ["fever", "cough", "fatigue"], "age": 45, "severity_scores": {"fever": 8},
+     "medical_history": ["diabetes"]},
+    {"symptoms": ["fever", "fatigue"], "age": 45, "medical_history": ["diabetes"]},
+]
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestIncrementalAnalysis:
+    """Test analyze_incremental"""
+
+    def test_turns_match_full_analysis(self, analyzer):
+        """Test that every follow-up turn equals a from-scratch analysis"""
+        session = AnalysisSession("session-test")
+        for turn in TURNS:
+            assert analyzer.analyze_incremental(session, **turn) == analyzer.analyze_symptoms(**turn)
+        assert session.turns == len(TURNS)
+
+    def test_unaffected_conditions_reused(self, analyzer):
+        """Test that only conditions with a changed symptom are rescored"""
+        session = AnalysisSession("session-test")
+        analyzer.analyze_incremental(session, **TURNS[0])
+        assert session.reused_count == 0
+
+        analyzer.analyze_incremental(session, **TURNS[1])
+        assert 0 < session.reused_count < len(session.condition_results)
+
+        # Unchanged record: every score is reused
+        analyzer.analyze_incremental(session, **TURNS[1])
+        assert session.reused_count == len(session.condition_results)
+
+    def test_kb_change_resets_session(self, analyzer, engine):
+        """Test that a knowledge base change starts the session over"""
+        session = AnalysisSession("session-test")
+        analyzer.analyze_incremental(session, **TURNS[0])
+
+        engine.add_fact("(has-symptom influenza cough)")
+        result = analyzer.analyze_incremental(session, **TURNS[0])
+        assert session.turns == 1
+        assert session.reused_count == 0
+        assert result == analyzer.analyze_symptoms(**TURNS[0])
@@ -0,0 +1,102 @@
+"""
+Unit Tests for the compiled in-memory knowledge base index
+Tests MeTTa fact parsing and predicate index lookups
+"""
+import pytest
+from src.metta.kb_index import KnowledgeBaseIndex, iter_metta_facts, parse_metta_facts
+
+
+SAMPLE_KB = """
+;; Sample knowledge base
+(: has-symptom (-> Condition Symptom))
+(has-symptom flu fever)
+(has-symptom flu cough)
+(has-symptom covid-19 fever)  ;; inline comment
+(risk-factor flu age-over-65 2.5)
+(time-sensitive meningitis 1)
+(safety-warning rest "Rest, fluids, and sleep.")
+!(match &self (has-symptom $c fever) $c)
+"""
+
+
+@pytest.fixture
+def index():
+    """Fixture to build an index from the sample knowledge base"""
+    return KnowledgeBaseIndex.from_text(SAMPLE_KB)
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestMeTTaFactParsing:
+    """Test parsing of MeTTa source into fact tuples"""
+
+    def test_parse_flat_facts(self):
+        """Test that flat facts become tuples"""
+        facts = list(parse_metta_facts("(has-symptom flu fever)"))
+        assert facts == [("has-symptom", "flu", "fever")]
+
+    def test_parse_numbers(self):
+        """Test that numeric atoms are converted to int/float"""
+        facts = list(parse_metta_facts("(risk-factor flu age-over-65 2.5) (time-sensitive meningitis 1)"))
+        assert facts[0][3] == 2.5
+        assert facts[1][2] == 1
+
+    def test_parse_string_with_commas(self):
+        """Test that quoted strings keep their commas"""
+        facts = list(parse_metta_facts('(safety-warning rest "Rest, fluids, and sleep.")'))
+        assert facts[0][2] == "Rest, fluids, and sleep."
+
+    def test_skip_comments_and_evaluations(self):
+        """Test that comments and !-queries are not treated as facts"""
+        facts = list(parse_metta_facts(SAMPLE_KB))
+        assert all(fact[0] != "match" for fact in facts)
+        assert len(facts) == 7
+
+    def test_symbol_names_not_parsed_as_numbers(self):
+        """Test that symbols like 'inf' and '5-30-minutes' stay strings"""
+        facts = list(parse_metta_facts("(symptom-attribute chest-pain duration 5-30-minutes) (x inf nan)"))
+        assert facts[0][3] == "5-30-minutes"
+        assert facts[1] == ("x", "inf", "nan")
+
+    def test_fact_source_spans(self):
+        """Test that fact spans slice the original source text"""
+        text = '(has-symptom flu fever) ;; note\n(safety-warning rest "Rest, fluids.")'
+        spans = [text[start:end] for _, start, end in iter_metta_facts(text)]
+        assert spans == ["(has-symptom flu fever)", '(safety-warning rest "Rest, fluids.")']
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestKnowledgeBaseIndex:
+    """Test predicate index lookups"""
+
+    def test_match_by_first_argument(self, index):
+        """Test lookup by condition (first argument)"""
+        assert index.values("has-symptom", "flu", "$symptom") == ["fever", "cough"]
+
+    def test_match_by_second_argument(self, index):
+        """Test reverse lookup by symptom (second argument)"""
+        assert index.values("has-symptom", "$condition", "fever") == ["flu", "covid-19"]
+
+    def test_match_multiple_variables(self, index):
+        """Test bindings are returned in variable order"""
+        assert index.match("risk-factor", "flu", "$factor", "$multiplier") == [("age-over-65", 2.5)]
+
+    def test_first_with_default(self, index):
+        """Test single-value lookups with a default"""
+        assert index.first("time-sensitive", "meningitis", "$hours") == 1
+        assert index.first("time-sensitive", "flu", "$hours", default=None) is None
+
+    def test_exists(self, index):
+        """Test fully bound pattern checks"""
+        assert index.exists("has-symptom", "flu", "cough")
+        assert not index.exists("has-symptom", "covid-19", "cough")
+
+    def test_unbound_none_matches_nothing(self, index):
+        """Test that a None argument is treated as a value, not a variable"""
+        assert index.values("has-symptom", "$condition", None) == []
+
+    def test_add_fact(self, index):
+        """Test incremental fact addition"""
+        index.add_text("(has-symptom flu headache)")
+        assert "headache" in index.values("has-symptom", "flu", "$symptom")
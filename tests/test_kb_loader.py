@@ -0,0 +1,71 @@
+"""
+Unit Tests for the multi-file knowledge base loader
+Tests path resolution, fact deduplication and conflict reporting
+"""
+import pytest
+from src.metta.kb_loader import load_kb_files, resolve_kb_paths
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+BASE_KB = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-symptom flu cough)
+(safety-warning rest-and-fluids "Monitor for worsening symptoms.")
+"""
+
+ADDITIONS_KB = """
+(has-symptom flu fever)
+(has-symptom flu chills)
+(safety-warning rest-and-fluids "Seek care if symptoms worsen.")
+"""
+
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    """Directory with a base KB file and an overlapping additions file"""
+    (tmp_path / "knowledge_base.metta").write_text(BASE_KB)
+    (tmp_path / "phase3_additions.metta").write_text(ADDITIONS_KB)
+    return tmp_path
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestKBLoader:
+    """Test merging knowledge base files"""
+
+    def test_resolve_directory(self, kb_dir):
+        """Test that a directory expands to its .metta files in name order"""
+        paths = resolve_kb_paths(str(kb_dir))
+        assert [p.name for p in paths] == ["knowledge_base.metta", "phase3_additions.metta"]
+
+    def test_resolve_comma_separated(self, kb_dir):
+        """Test that METTA_KB_PATH style lists are split"""
+        paths = resolve_kb_paths(f"{kb_dir}/phase3_additions.metta, {kb_dir}/knowledge_base.metta")
+        assert [p.name for p in paths] == ["phase3_additions.metta", "knowledge_base.metta"]
+
+    def test_duplicates_removed(self, kb_dir):
+        """Test that repeated facts are kept once and counted"""
+        result = load_kb_files(resolve_kb_paths(kb_dir))
+        assert len(result.facts) == 6
+        assert result.duplicates == {"has-symptom": 1}
+        assert result.text.count("(has-symptom flu fever)") == 1
+
+    def test_conflicts_reported(self, kb_dir):
+        """Test that differing values of single-valued predicates are reported"""
+        result = load_kb_files(resolve_kb_paths(kb_dir))
+        assert len(result.conflicts) == 1
+
+        conflict = result.conflicts[0]
+        assert conflict["predicate"] == "safety-warning"
+        assert conflict["key"] == ["rest-and-fluids"]
+        assert [v["source"] for v in conflict["values"]] == [
+            "knowledge_base.metta:5",
+            "phase3_additions.metta:4",
+        ]
+
+    def test_engine_loads_directory_without_duplicates(self, kb_dir, tmp_path):
+        """Test that the engine answers queries over the merged fact set"""
+        engine = MeTTaQueryEngine(str(kb_dir), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+        assert sorted(engine.find_symptoms_by_condition("flu")) == ["chills", "cough", "fever"]
+        assert engine.get_kb_load_report()["duplicate_count"] == 1
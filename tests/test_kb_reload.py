@@ -0,0 +1,94 @@
+"""
+Unit Tests for MeTTa knowledge base hot reload
+Tests atomic reloads, KB versioning, fact replay and the file watcher
+"""
+import time
+
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+KB_TEXT = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-urgency flu routine-care)
+"""
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    """Write a small knowledge base to a temporary file"""
+    path = tmp_path / "kb.metta"
+    path.write_text(KB_TEXT)
+    return path
+
+
+@pytest.fixture
+def engine(kb_file, tmp_path):
+    """Indexed engine over the temporary knowledge base"""
+    engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+    yield engine
+    engine.stop_watching()
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestHotReload:
+    """Test reloading the knowledge base without restarting the engine"""
+
+    def test_reload_picks_up_edits(self, engine, kb_file):
+        """Test that edits are visible after a reload and the version increments"""
+        assert engine.kb_version == 1
+        kb_file.write_text(KB_TEXT + "(has-symptom flu cough)\n")
+
+        assert engine.reload_knowledge_base() == 2
+        assert engine.kb_version == 2
+        assert sorted(engine.find_symptoms_by_condition("flu")) == ["cough", "fever"]
+
+    def test_readers_keep_their_generation(self, engine, kb_file):
+        """Test that an index picked up before a reload is left untouched"""
+        old_index = engine.index
+        kb_file.write_text(KB_TEXT + "(has-symptom flu cough)\n")
+        engine.reload_knowledge_base()
+
+        assert engine.index is not old_index
+        assert old_index.values("has-symptom", "flu", "$s") == ["fever"]
+
+    def test_added_facts_survive_reload(self, engine):
+        """Test that runtime facts are replayed onto the reloaded knowledge base"""
+        assert engine.add_fact("(has-symptom flu chills)")
+        assert engine.kb_version == 2
+
+        engine.reload_knowledge_base()
+        assert "chills" in engine.find_symptoms_by_condition("flu")
+
+    def test_failed_reload_keeps_current_version(self, engine, kb_file):
+        """Test that a missing source file does not replace the loaded KB"""
+        kb_file.unlink()
+        assert engine.reload_knowledge_base() is None
+        assert engine.kb_version == 1
+        assert engine.find_symptoms_by_condition("flu") == ["fever"]
+
+    def test_failed_reload_keeps_kb_paths(self, tmp_path):
+        """Test that a failed reload leaves the configured file set unchanged"""
+        kb_dir = tmp_path / "kb"
+        kb_dir.mkdir()
+        (kb_dir / "base.metta").write_text(KB_TEXT)
+        engine = MeTTaQueryEngine(str(kb_dir), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+        kb_paths = list(engine.kb_paths)
+
+        (kb_dir / "base.metta").unlink()
+        assert engine.reload_knowledge_base() is None
+        assert engine.kb_paths == kb_paths
+
+    def test_watcher_reloads_on_change(self, engine, kb_file):
+        """Test that the file watcher reloads after an edit"""
+        engine.start_watching(interval=0.05)
+        kb_file.write_text(KB_TEXT + "(has-symptom flu cough)\n")
+
+        deadline = time.monotonic() + 5
+        while engine.kb_version == 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert engine.kb_version == 2
+        assert "cough" in engine.find_symptoms_by_condition("flu")
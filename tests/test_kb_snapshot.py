@@ -0,0 +1,116 @@
+"""
+Unit Tests for precompiled knowledge base snapshots
+Tests compile/load roundtrip, hash keying and engine cold start from a snapshot
+"""
+import pytest
+from src.metta import kb_snapshot
+from src.metta.atom_decoder import decode_results
+from src.metta.kb_index import KnowledgeBaseIndex
+from src.metta.kb_snapshot import (
+    compile_snapshot,
+    compute_source_hash,
+    load_snapshot,
+    read_snapshot_hash,
+    save_snapshot,
+)
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+KB_TEXT = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-symptom flu cough)
+(has-urgency flu low)
+(time-sensitive flu 72)
+(safety-warning rest-and-fluids "Seek care if symptoms worsen")
+"""
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    """Write a small knowledge base to a temporary file"""
+    path = tmp_path / "kb.metta"
+    path.write_text(KB_TEXT)
+    return path
+
+
+@pytest.mark.unit
+class TestKBSnapshot:
+    """Test snapshot build and load"""
+
+    def test_roundtrip(self, kb_file, tmp_path):
+        """Test that a loaded snapshot answers the same lookups as the source"""
+        snapshot = tmp_path / "kb.kbsnap"
+        summary = compile_snapshot([kb_file], snapshot)
+        assert summary["fact_count"] == 6
+
+        loaded = load_snapshot(snapshot, compute_source_hash([kb_file]))
+        assert loaded is not None
+        assert "(has-symptom flu cough)" in loaded.text
+        index = loaded.index
+        assert index.fact_count == 6
+        assert sorted(index.values("has-symptom", "flu", "$s")) == ["cough", "fever"]
+        assert index.first("time-sensitive", "flu", "$h") == 72
+        assert index.first("safety-warning", "rest-and-fluids", "$w") == "Seek care if symptoms worsen"
+
+    def test_source_change_invalidates_snapshot(self, kb_file, tmp_path):
+        """Test that a snapshot is ignored once the source content changes"""
+        snapshot = tmp_path / "kb.kbsnap"
+        compile_snapshot([kb_file], snapshot)
+
+        kb_file.write_text(KB_TEXT + "(has-symptom flu headache)\n")
+        assert load_snapshot(snapshot, compute_source_hash([kb_file])) is None
+
+    def test_parser_change_invalidates_snapshot(self, kb_file, tmp_path, monkeypatch):
+        """Test that a snapshot compiled by another parser version is ignored"""
+        snapshot = tmp_path / "kb.kbsnap"
+        compile_snapshot([kb_file], snapshot)
+
+        monkeypatch.setattr(kb_snapshot, "PARSER_VERSION", kb_snapshot.PARSER_VERSION + 1)
+        assert read_snapshot_hash(snapshot) is None
+        assert load_snapshot(snapshot, compute_source_hash([kb_file])) is None
+
+    def test_missing_or_foreign_file(self, tmp_path):
+        """Test that missing and non-snapshot files are rejected"""
+        assert load_snapshot(tmp_path / "missing.kbsnap", "0" * 64) is None
+
+        foreign = tmp_path / "foreign.kbsnap"
+        foreign.write_bytes(b"not a snapshot at all" * 10)
+        assert read_snapshot_hash(foreign) is None
+        assert load_snapshot(foreign, "0" * 64) is None
+
+    def test_save_snapshot_records_hash(self, tmp_path):
+        """Test that the header carries the source hash"""
+        snapshot = tmp_path / "kb.kbsnap"
+        save_snapshot(KnowledgeBaseIndex.from_text(KB_TEXT), "a" * 64, snapshot)
+        assert read_snapshot_hash(snapshot) == "a" * 64
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineSnapshotStart:
+    """Test MeTTaQueryEngine cold start from a snapshot"""
+
+    def test_indexed_engine_writes_and_reuses_snapshot(self, kb_file, tmp_path):
+        """Test that the first start writes a snapshot and the next start uses it"""
+        snapshot = tmp_path / "kb.kbsnap"
+        first = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(snapshot))
+        assert snapshot.exists()
+        assert first._space_loaded
+
+        second = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(snapshot))
+        assert not second._space_loaded
+        assert second.find_all_conditions() == ["flu"]
+        assert second.find_urgency_level("flu") == "low"
+
+    def test_space_loads_snapshotted_source(self, kb_file, tmp_path):
+        """Test that the lazy MeTTa space load uses the snapshot, not the edited files"""
+        snapshot = tmp_path / "kb.kbsnap"
+        MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(snapshot))
+        engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(snapshot))
+
+        kb_file.write_text(KB_TEXT + "(has-symptom flu headache)\n")
+        results = engine.query("!(match &self (has-symptom flu $s) $s)")
+        assert engine._space_loaded
+        assert "headache" not in decode_results(results)
+        assert engine.find_symptoms_by_condition("flu") == ["fever", "cough"]
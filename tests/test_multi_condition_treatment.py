@@ -0,0 +1,72 @@
+"""
+Unit Tests for multi-condition treatment recommendations
+Tests merged treatments, shared safety checks and per-condition plans
+"""
+import pytest
+from src.metta.query_cache import QueryCache
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.treatment_recommendation import TreatmentRecommender
+
+
+@pytest.fixture
+def recommender(tmp_path):
+    engine = MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+    return TreatmentRecommender(engine, template_cache=QueryCache(max_size=64))
+
+
+PATIENT = {
+    "urgency_level": "urgent",
+    "patient_age": 70,
+    "current_medications": ["warfarin", "aspirin"],
+    "medical_history": ["kidney-disease", "bleeding-disorder"],
+}
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestMultiConditionRecommendation:
+    """Test recommend_treatments with max_conditions > 1"""
+
+    def test_default_covers_primary_only(self, recommender):
+        """Test that alternatives are ignored unless requested"""
+        result = recommender.recommend_treatments("influenza", ["covid-19"], **PATIENT)
+        assert list(result["condition_plans"]) == ["influenza"]
+
+    def test_treatments_merged_without_duplicates(self, recommender):
+        """Test that the merged list is the ordered union of each condition's treatments"""
+        conditions = ["influenza", "covid-19", "common-cold"]
+        result = recommender.recommend_treatments(conditions[0], conditions[1:], max_conditions=3, **PATIENT)
+
+        expected = []
+        for condition in conditions:
+            single = recommender.recommend_treatments(condition, **PATIENT)
+            assert result["condition_plans"][condition]["treatments"] == single["treatments"]
+            expected.extend(t for t in single["treatments"] if t not in expected)
+        assert result["treatments"] == expected
+        assert len(result["treatments"]) == len(set(result["treatments"]))
+
+    def test_safety_checks_cover_every_condition(self, recommender):
+        """Test that contraindications and warnings match the single-condition calls"""
+        conditions = ["heart-attack", "stroke"]
+        result = recommender.recommend_treatments(conditions[0], conditions[1:], max_conditions=2, **PATIENT)
+
+        contraindications = {}
+        warnings = set()
+        for condition in conditions:
+            single = recommender.recommend_treatments(condition, **PATIENT)
+            contraindications.update(single["contraindications"])
+            warnings.update(single["safety_warnings"])
+        assert result["contraindications"] == contraindications
+        assert set(result["safety_warnings"]) == warnings
+
+    def test_primary_drives_protocol_and_follow_up(self, recommender):
+        """Test that protocol, specialist and follow-up come from the primary condition"""
+        single = recommender.recommend_treatments("heart-attack", **PATIENT)
+        result = recommender.recommend_treatments(
+            "heart-attack", ["heart-attack", "Heart Attack", "anaphylaxis"], max_conditions=5, **PATIENT
+        )
+        assert list(result["condition_plans"]) == ["heart-attack", "anaphylaxis"]
+        assert result["treatment_protocol"] == single["treatment_protocol"]
+        assert result["specialist_referral"] == single["specialist_referral"]
+        assert result["follow_up_timeline"] == single["follow_up_timeline"]
+        assert result["condition_plans"]["anaphylaxis"]["protocol_plan"] is not None
@@ -0,0 +1,72 @@
+"""
+Unit Tests for compiled treatment protocol DAGs (EPIC 7 - Phase 3)
+Tests dependency scheduling, cycle detection, warnings and per-version rebuilds
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.protocol_dag import ProtocolLibrary, compile_protocol
+
+
+def _steps(*actions):
+    return [
+        {'step_number': number, 'action': action, 'timing': 'immediate', 'priority': 'critical'}
+        for number, action in enumerate(actions, start=1)
+    ]
+
+
+@pytest.mark.unit
+class TestCompileProtocol:
+    """Test protocol compilation"""
+
+    def test_parallel_groups_follow_dependencies(self):
+        """Test that each step is scheduled after its prerequisites"""
+        protocol = compile_protocol(
+            "heart-attack",
+            _steps("call-911", "chew-aspirin", "rest", "give-nitroglycerin"),
+            dependencies=[(2, 1), (4, 2)],
+        )
+        assert protocol.groups == ((1, 3), (2,), (4,))
+        assert protocol.dependencies == {2: (1,), 4: (2,)}
+        assert protocol.cycle_steps == ()
+
+    def test_cycle_detected(self):
+        """Test that steps on a cycle are reported and ordered by step number"""
+        protocol = compile_protocol("x", _steps("a", "b", "c"), dependencies=[(2, 3), (3, 2)])
+        assert protocol.cycle_steps == (2, 3)
+        assert protocol.groups == ((1,), (2,), (3,))
+
+    def test_unknown_dependency_ignored(self):
+        """Test that dependencies on missing steps do not block scheduling"""
+        protocol = compile_protocol("x", _steps("a", "b"), dependencies=[(2, 9)])
+        assert protocol.groups == ((1, 2),)
+
+    def test_warnings_attached_to_steps(self):
+        """Test that warnings attach to steps whose action contains the keyword"""
+        protocol = compile_protocol(
+            "heart-attack",
+            _steps("call-911", "administer-nitroglycerin"),
+            warnings=[("nitroglycerin", "Do not give if blood pressure low"), ("oxygen", "Unused")],
+        )
+        plan = protocol.plan()
+        assert plan['warnings'] == ["Do not give if blood pressure low", "Unused"]
+        assert plan['parallel_groups'][0][1]['warnings'] == ["Do not give if blood pressure low"]
+        assert plan['parallel_groups'][0][0]['warnings'] == []
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineProtocolLibrary:
+    """Test the engine's per-version protocol library"""
+
+    def test_library_matches_protocol_queries(self, tmp_path):
+        """Test compiled steps equal get_treatment_protocol() and follow added facts"""
+        engine = MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+        library = engine.get_protocol_library()
+        assert isinstance(library, ProtocolLibrary)
+
+        for condition in ("heart-attack", "anaphylaxis", "influenza"):
+            assert library.steps(condition) == engine.get_treatment_protocol(condition)
+        assert library.get("heart-attack").groups[-1] == (5,)
+
+        engine.add_fact("(protocol-dependency anaphylaxis 6 2)")
+        assert engine.get_protocol_library().get("anaphylaxis").dependencies[6] == (2,)
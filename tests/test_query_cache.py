@@ -0,0 +1,104 @@
+"""
+Unit Tests for the MeTTa query result cache
+Tests LRU eviction, TTL expiry, counters and write-invalidation
+"""
+import time
+
+import pytest
+from src.metta.query_cache import QueryCache
+from src.metta.query_engine import MeTTaQueryEngine
+
+
+@pytest.mark.unit
+class TestQueryCache:
+    """Test the bounded LRU/TTL cache"""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = QueryCache(max_size=4)
+        assert cache.get("q1") == (False, None)
+        cache.set("q1", ["flu"])
+        assert cache.get("q1") == (True, ["flu"])
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = QueryCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # 'b' is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        cache = QueryCache(max_size=4, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") == (False, None)
+        assert cache.stats()["expirations"] == 1
+
+    def test_disabled_cache(self):
+        """Test that size 0 disables caching"""
+        cache = QueryCache(max_size=0)
+        cache.set("a", 1)
+        assert len(cache) == 0
+
+    def test_clear(self):
+        """Test invalidation drops all entries"""
+        cache = QueryCache(max_size=4)
+        cache.set("a", 1)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineQueryCache:
+    """Test caching of MeTTa query results in the query engine"""
+
+    @pytest.fixture
+    def engine(self):
+        return MeTTaQueryEngine(cache_size=128)
+
+    def test_repeated_lookup_is_cached(self, engine):
+        """Test a condition-level lookup hits MeTTa only once"""
+        first = engine.find_symptoms_by_condition("meningitis")
+        second = engine.find_symptoms_by_condition("meningitis")
+        assert first == second
+
+        stats = engine.get_cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_cached_result_not_shared(self, engine):
+        """Test that mutating a returned result does not change later hits"""
+        query = "!(match &self (has-symptom meningitis $s) $s)"
+        first = engine.query(query)
+        expected = list(first)
+        first.append("mutated")
+        second = engine.query(query)
+        second.sort(key=str)
+        second.append("mutated")
+
+        assert engine.query(query) == expected
+        assert engine.get_cache_stats()["hits"] == 2
+
+    def test_add_fact_invalidates(self, engine):
+        """Test that writes invalidate cached results"""
+        engine.find_symptoms_by_condition("test-condition")
+        engine.add_fact("(has-symptom test-condition test-symptom)")
+        assert "test-symptom" in engine.find_symptoms_by_condition("test-condition")
+
+    def test_non_match_queries_not_cached(self, engine):
+        """Test that non-match queries bypass the cache"""
+        engine.query("(test-fact a b)")
+        assert engine.get_cache_stats()["size"] == 0
@@ -0,0 +1,82 @@
+"""
+Unit Tests for MeTTa query instrumentation
+Tests latency/call-count recording, query templates and exports
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.query_metrics import QueryMetrics, query_template, result_size
+
+
+KB_TEXT = """
+(is-condition flu)
+(has-symptom flu fever)
+(has-symptom flu cough)
+"""
+
+
+@pytest.mark.unit
+class TestQueryMetrics:
+    """Test the metrics recorder"""
+
+    def test_counts_and_percentiles(self):
+        """Test that counts, totals and percentiles are reported in ms"""
+        metrics = QueryMetrics()
+        for ms in range(1, 101):
+            metrics.record("method", "find_urgency_level", ms / 1000, size=1)
+
+        series = metrics.snapshot()["method"]["find_urgency_level"]
+        assert series["count"] == 100
+        assert series["total_ms"] == pytest.approx(5050)
+        assert series["p50_ms"] == pytest.approx(50)
+        assert series["p95_ms"] == pytest.approx(95)
+        assert series["p99_ms"] == pytest.approx(99)
+        assert series["result_size_max"] == 1
+
+    def test_errors_counted(self):
+        """Test that failed calls are counted separately"""
+        metrics = QueryMetrics()
+        metrics.record("query", "q", 0.001, error=True)
+        assert metrics.snapshot()["query"]["q"]["errors"] == 1
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format"""
+        metrics = QueryMetrics()
+        metrics.record("method", "find_treatment", 0.002, size=3)
+        text = metrics.to_prometheus()
+
+        assert "# TYPE metta_query_latency_seconds summary" in text
+        assert 'metta_query_latency_seconds_count{kind="method",name="find_treatment"} 1' in text
+        assert 'metta_query_result_size_sum{kind="method",name="find_treatment"} 3' in text
+
+    def test_query_template(self):
+        """Test that concrete arguments are replaced but structure is kept"""
+        assert query_template("!(match &self (has-symptom flu $s) $s)") == "!(match &self (has-symptom ? $s) $s)"
+        assert query_template('!(match &self (safety-warning "a b" $w) $w)') == "!(match &self (safety-warning ? $w) $w)"
+
+    def test_result_size(self):
+        """Test result size rules"""
+        assert result_size(["a", "b"]) == 2
+        assert result_size(None) == 0
+        assert result_size("emergency") == 1
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineInstrumentation:
+    """Test instrumentation of MeTTaQueryEngine"""
+
+    def test_query_methods_recorded(self, tmp_path):
+        """Test that query method calls appear in the metrics snapshot"""
+        kb_file = tmp_path / "kb.metta"
+        kb_file.write_text(KB_TEXT)
+        engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+        engine.find_symptoms_by_condition("flu")
+        engine.find_symptoms_by_condition("flu")
+        engine.query("!(match &self (is-condition $c) $c)")
+
+        metrics = engine.get_metrics()
+        assert metrics["method"]["find_symptoms_by_condition"]["count"] == 2
+        assert metrics["method"]["find_symptoms_by_condition"]["result_size_max"] == 2
+        assert metrics["query"]["!(match &self (is-condition $c) $c)"]["count"] == 1
+        assert 'name="find_symptoms_by_condition"' in engine.get_metrics_prometheus()
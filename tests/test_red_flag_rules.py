@@ -0,0 +1,73 @@
+"""
+Unit Tests for the compiled red-flag rule matcher
+Tests single red-flag symptoms, combination rules and KB-defined rules
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.red_flag_rules import RedFlagMatcher
+
+
+@pytest.fixture
+def matcher():
+    """Matcher with one group-of-three rule and one single-group rule"""
+    return RedFlagMatcher(
+        red_flag_symptoms=["chest-pain", "seizures"],
+        rules=[("triad", "Meningitis triad"), ("fast", "Stroke signs")],
+        rule_symptoms=[
+            ("triad", "headache", "headache"),
+            ("triad", "headache", "severe-headache"),
+            ("triad", "fever", "fever"),
+            ("triad", "neck", "neck-stiffness"),
+            ("fast", "sign", "face-drooping"),
+            ("fast", "sign", "arm-weakness"),
+            ("orphan", "sign", "fever"),  # No red-flag-rule fact: ignored
+        ],
+    )
+
+
+@pytest.mark.unit
+class TestRedFlagMatcher:
+    """Test bitmask rule evaluation"""
+
+    def test_single_red_flags_keep_patient_spelling(self, matcher):
+        """Test that red-flag symptoms are reported as given, in order"""
+        assert matcher.detect(["Seizures", "cough", "chest pain"]) == ["Seizures", "chest pain"]
+
+    def test_rule_needs_every_group(self, matcher):
+        """Test that a rule fires only when every group is present"""
+        assert matcher.detect(["severe headache", "fever"]) == []
+        assert matcher.detect(["severe headache", "fever", "neck_stiffness"]) == ["Meningitis triad"]
+
+    def test_any_symptom_of_a_group(self, matcher):
+        """Test that any alternative satisfies a group"""
+        assert matcher.detect(["arm-weakness"]) == ["Stroke signs"]
+
+    def test_rule_order_and_orphans(self, matcher):
+        """Test rules are reported in rule order and orphan symptoms are ignored"""
+        detected = matcher.detect(["face-drooping", "headache", "fever", "neck-stiffness"])
+        assert detected == ["Meningitis triad", "Stroke signs"]
+        assert matcher.rule_count == 2
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineRedFlagRules:
+    """Test rules loaded from KB facts"""
+
+    def test_rules_from_kb_and_add_fact(self, tmp_path):
+        """Test that rules come from facts and follow added facts"""
+        kb_file = tmp_path / "kb.metta"
+        kb_file.write_text(
+            '(red-flag-symptom chest-pain true)\n'
+            '(red-flag-symptom hematuria false)\n'
+            '(red-flag-rule sepsis-signs "Possible sepsis")\n'
+            '(red-flag-rule-symptom sepsis-signs fever fever)\n'
+        )
+        engine = MeTTaQueryEngine(str(kb_file), indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+        matcher = engine.get_red_flag_matcher()
+        assert matcher.detect(["hematuria", "chest-pain", "fever"]) == ["chest-pain", "Possible sepsis"]
+
+        engine.add_fact("(red-flag-rule-symptom sepsis-signs confusion confusion)")
+        assert engine.get_red_flag_matcher().detect(["fever"]) == []
+        assert engine.get_red_flag_matcher().detect(["fever", "confusion"]) == ["Possible sepsis"]
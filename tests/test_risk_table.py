@@ -0,0 +1,61 @@
+"""
+Unit Tests for the risk-factor multiplier table
+Tests profile encoding, multiplier lookups and memoization
+"""
+import pytest
+from src.metta.risk_table import RiskTable, encode_patient_profile, risk_score_to_multiplier
+
+
+@pytest.fixture
+def table():
+    """Table over a small set of risk-factor facts"""
+    return RiskTable([
+        ("heart-attack", "diabetes-mellitus", 3.0),
+        ("heart-attack", "age-over-65", 3.5),
+        ("heart-attack", "smoking", "2.0"),
+        ("heart-attack", "typo", "not-a-number"),
+        ("migraine", "female", 1.5),
+    ])
+
+
+@pytest.mark.unit
+class TestRiskTable:
+    """Test in-memory risk multipliers"""
+
+    def test_profile_encoding(self):
+        """Test age bands and history normalization"""
+        assert encode_patient_profile(30) == {"age-under-40"}
+        assert encode_patient_profile(55) == {"age-40-55"}
+        assert encode_patient_profile(72, ["Diabetes Mellitus"]) == {
+            "age-over-70", "age-over-65", "diabetes-mellitus"
+        }
+        assert encode_patient_profile() == frozenset()
+
+    def test_factors_highest_first(self, table):
+        """Test factors are sorted by multiplier and non-numeric ones dropped"""
+        assert table.factors("heart-attack") == (
+            ("age-over-65", 3.5), ("diabetes-mellitus", 3.0), ("smoking", 2.0)
+        )
+        assert table.factors("unknown") == ()
+
+    def test_risk_multiplier(self, table):
+        """Test matched factors and the score-to-multiplier conversion"""
+        multiplier, matched = table.risk_multiplier(
+            "heart-attack", encode_patient_profile(80, ["diabetes-mellitus"])
+        )
+        assert matched == ["age-over-65", "diabetes-mellitus"]
+        assert multiplier == pytest.approx(risk_score_to_multiplier(6.5))
+        assert table.risk_multiplier("unknown", encode_patient_profile(80)) == (1.0, [])
+
+    def test_max_multiplier(self, table):
+        """Test the bound over every possible profile"""
+        assert table.max_multiplier("heart-attack") == risk_score_to_multiplier(8.5)
+        assert table.max_multiplier("unknown") == 1.0
+
+    def test_results_memoized(self, table):
+        """Test (condition, profile) results are computed once"""
+        profile = encode_patient_profile(30, ["smoking"])
+        first = table.risk_multiplier("heart-attack", profile)
+        first[1].append("mutated")  # Callers get their own list
+        assert table.risk_multiplier("heart-attack", profile) == (risk_score_to_multiplier(2.0), ["smoking"])
+        assert table.cache_info().hits == 1
@@ -0,0 +1,38 @@
+"""
+Unit Tests for the treatment safety matrix
+Tests contraindication, drug interaction and dose adjustment lookups
+"""
+import pytest
+from src.metta.safety_matrix import TreatmentSafetyMatrix
+
+
+@pytest.fixture
+def matrix():
+    """Matrix over a small set of safety facts"""
+    return TreatmentSafetyMatrix(
+        contraindications=[
+            ("aspirin", "bleeding-disorder"),
+            ("aspirin", "age-under-18"),
+            ("ibuprofen", "kidney-disease"),
+        ],
+        drug_interactions=[("aspirin", "warfarin"), ("aspirin", "ibuprofen")],
+        dose_adjustments=[("antibiotics", "kidney-disease")],
+    )
+
+
+@pytest.mark.unit
+class TestTreatmentSafetyMatrix:
+    """Test set-based safety lookups"""
+
+    def test_contraindications_in_kb_order(self, matrix):
+        """Test the full contraindication list of a treatment"""
+        assert matrix.contraindications("aspirin") == ["bleeding-disorder", "age-under-18"]
+        assert matrix.contraindications("unknown") == []
+
+    def test_patient_intersections(self, matrix):
+        """Test that only the patient's own conditions and drugs are returned"""
+        history = {"bleeding-disorder", "kidney-disease"}
+        assert matrix.contraindicated_conditions("aspirin", history) == {"bleeding-disorder"}
+        assert matrix.dose_adjusted_conditions("antibiotics", history) == {"kidney-disease"}
+        assert matrix.interacting_medications("aspirin", {"warfarin", "metformin"}) == {"warfarin"}
+        assert matrix.interacting_medications("unknown", {"warfarin"}) == frozenset()
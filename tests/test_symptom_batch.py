@@ -0,0 +1,110 @@
+"""
+Unit Tests for batch symptom analysis
+Tests that SymptomAnalyzer.analyze_batch matches per-patient analysis and
+queries the knowledge base once per batch, not per patient
+(throughput: tests/benchmark_symptom_batch.py)
+"""
+import random
+from collections import Counter
+
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.symptom_analysis import SymptomAnalyzer
+
+
+PATIENTS = [
+    {"symptoms": ["fever", "headache", "neck-stiffness"], "age": 25},
+    {"symptoms": ["chest-pain", "shortness-of-breath", "sweating"], "age": 72,
+     "medical_history": ["diabetes"]},
+    {"symptoms": ["fever", "cough", "fatigue"]},
+    {"symptoms": ["fever", "headache", "neck-stiffness"], "age": 25},
+]
+
+# Exercises severity weighting, attribute matching and underscore spellings
+DETAILED_PATIENT = {
+    "symptoms": ["headache", "neck_stiffness", "Fever"],
+    "age": 70,
+    "severity_scores": {"headache": 9},
+    "medical_history": ["hypertension"],
+    "symptom_attributes": {"headache": {"onset-pattern": "sudden"}},
+}
+
+# Engine methods that reach the knowledge base or its derived tables
+KB_METHODS = ("_get_derived", "_match", "query", "score_conditions_by_symptoms")
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Analyzer over the indexed default knowledge base"""
+    engine = MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+    return SymptomAnalyzer(engine)
+
+
+def _distinct_patients(engine, count):
+    """Distinct patient records drawn from the knowledge base's symptoms"""
+    symptoms = sorted(engine.get_symptom_matrix().symptoms)
+    history = ["smoking", "diabetes", "hypertension", "obesity"]
+    rng = random.Random(12)
+    patients = {}
+    while len(patients) < count:
+        record = tuple(rng.sample(symptoms, rng.randint(2, 5)))
+        patients[record] = {
+            "symptoms": list(record),
+            "age": rng.randint(1, 90),
+            "medical_history": rng.sample(history, rng.randint(0, 2)),
+        }
+    return list(patients.values())
+
+
+def _count_kb_calls(monkeypatch, engine):
+    """Count calls of the engine's knowledge base methods"""
+    calls = Counter()
+    for name in KB_METHODS:
+        def counted(*args, _name=name, _method=getattr(engine, name), **kwargs):
+            calls[_name] += 1
+            return _method(*args, **kwargs)
+        monkeypatch.setattr(engine, name, counted)
+    return calls
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestAnalyzeBatch:
+    """Test batch analysis"""
+
+    def test_batch_matches_single_analysis(self, analyzer):
+        """Test that batch results equal analyze_symptoms results, in order"""
+        results = analyzer.analyze_batch(PATIENTS)
+        assert results == [analyzer.analyze_symptoms(**patient) for patient in PATIENTS]
+
+    def test_distinct_batch_matches_single_analysis(self, analyzer):
+        """Test equality over many distinct records, including pruned differentials"""
+        patients = [DETAILED_PATIENT] + _distinct_patients(analyzer.metta, 200)
+        results = analyzer.analyze_batch(patients)
+        assert results == [analyzer.analyze_symptoms(**patient) for patient in patients]
+
+    def test_repeated_records_get_separate_results(self, analyzer):
+        """Test that identical records are analyzed once but returned as separate dicts"""
+        results = analyzer.analyze_batch(PATIENTS)
+        assert results[0] == results[3]
+        assert results[0] is not results[3]
+
+    def test_empty_batch(self, analyzer):
+        """Test that an empty batch returns no results"""
+        assert analyzer.analyze_batch([]) == []
+
+    def test_kb_calls_independent_of_batch_size(self, analyzer, monkeypatch):
+        """Test that a batch makes the same knowledge base calls for 1 or 201 patients"""
+        patients = [DETAILED_PATIENT] + _distinct_patients(analyzer.metta, 200)
+        # Build the per-KB-version tables
+        analyzer.analyze_batch(patients)
+
+        calls = _count_kb_calls(monkeypatch, analyzer.metta)
+        analyzer.analyze_batch(patients[:1])
+        one_patient = dict(calls)
+        calls.clear()
+        analyzer.analyze_batch(patients)
+
+        assert dict(calls) == one_patient
+        # Every table is served from the derived-table cache
+        assert calls["_match"] == calls["query"] == calls["score_conditions_by_symptoms"] == 0
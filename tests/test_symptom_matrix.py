@@ -0,0 +1,93 @@
+"""
+Unit Tests for the condition × symptom incidence matrix
+Tests bitset scoring, batch scoring and ranking
+"""
+import pytest
+from src.metta.query_engine import MeTTaQueryEngine
+from src.metta.symptom_matrix import SymptomMatrix
+
+
+PAIRS = [
+    ("flu", "fever"),
+    ("flu", "cough"),
+    ("flu", "fatigue"),
+    ("meningitis", "fever"),
+    ("meningitis", "neck-stiffness"),
+    ("migraine", "headache"),
+]
+
+
+@pytest.fixture
+def matrix():
+    """Matrix over a small has-symptom fact set"""
+    return SymptomMatrix(PAIRS)
+
+
+@pytest.mark.unit
+class TestSymptomMatrix:
+    """Test bitset scoring"""
+
+    def test_symptom_counts(self, matrix):
+        """Test per-condition symptom totals"""
+        assert matrix.symptom_count("flu") == 3
+        assert matrix.symptom_count("migraine") == 1
+        assert matrix.symptom_count("unknown") == 0
+
+    def test_score_only_candidate_conditions(self, matrix):
+        """Test that only conditions sharing a symptom are scored"""
+        scores = matrix.score(["fever", "cough", "not-in-kb"])
+        assert set(scores) == {"flu", "meningitis"}
+        assert scores["flu"]["match_count"] == 2
+        assert scores["flu"]["match_ratio"] == pytest.approx(2 / 3)
+        assert scores["meningitis"]["match_ratio"] == pytest.approx(0.5)
+
+    def test_decode_matched_symptoms(self, matrix):
+        """Test decoding the matched symptom bitset"""
+        scores = matrix.score(["fever", "cough"])
+        assert sorted(matrix.decode(scores["flu"]["matched_mask"])) == ["cough", "fever"]
+
+    def test_conditions_with_any(self, matrix):
+        """Test the conditions affected by a set of symptoms"""
+        assert sorted(matrix.conditions_with_any(["fever", "not-in-kb"])) == ["flu", "meningitis"]
+        assert matrix.conditions_with_any([]) == []
+
+    def test_rank_by_match_count(self, matrix):
+        """Test that ranked conditions are ordered by match count"""
+        assert matrix.rank(["fever", "cough", "not-in-kb"]) == ["flu", "meningitis"]
+        assert matrix.rank(["neck-stiffness", "fever"]) == ["meningitis", "flu"]
+        assert matrix.rank([]) == []
+
+    def test_rank_ties_in_first_seen_order(self):
+        """Test that ties follow the symptom order, then has-symptom fact order"""
+        matrix = SymptomMatrix([("a", "x"), ("b", "y"), ("b", "x"), ("a", "y")])
+        assert matrix.rank(["x", "y"]) == ["a", "b"]
+        assert matrix.rank(["y", "x"]) == ["b", "a"]
+
+    def test_match_counts(self, matrix):
+        """Test per-condition match counts, in first-seen order, counting repeats once"""
+        counts = matrix.match_counts(["neck-stiffness", "fever", "fever", "cough", "not-in-kb"])
+        assert list(counts.items()) == [("meningitis", 2), ("flu", 2)]
+        assert matrix.match_ratio("flu", counts["flu"]) == pytest.approx(2 / 3)
+        assert matrix.match_counts([]) == {}
+
+    def test_score_batch(self, matrix):
+        """Test that batch scoring matches single scoring and keeps order"""
+        batch = [["fever"], ["headache"], ["fever"]]
+        results = matrix.score_batch(batch)
+        assert results == [matrix.score(symptoms) for symptoms in batch]
+        assert results[0] is results[2]  # identical sets scored once
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestEngineSymptomMatrix:
+    """Test the engine's per-version matrix"""
+
+    def test_rank_matches_engine_scoring(self, tmp_path):
+        """Test that rank() orders conditions like score_conditions_by_symptoms()"""
+        engine = MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+        # A late fact puts meningitis after conditions first seen later in the KB
+        engine.add_fact("(has-symptom meningitis cough)")
+        matrix = engine.get_symptom_matrix()
+        for symptoms in (["fever", "cough"], ["cough", "headache", "fever"], ["chest-pain", "nausea"]):
+            assert matrix.rank(symptoms) == list(engine.score_conditions_by_symptoms(symptoms))
@@ -0,0 +1,86 @@
+"""
+Unit Tests for cached treatment plan templates
+Tests that templates are reused per condition and rebuilt per KB version
+"""
+import pytest
+from src.metta.query_cache import QueryCache
+from src.metta.query_engine import MeTTaQueryEngine
+from src.agents.treatment_recommendation import TreatmentRecommender
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Indexed engine over the default knowledge base"""
+    return MeTTaQueryEngine(indexed=True, snapshot_path=str(tmp_path / "kb.kbsnap"))
+
+
+@pytest.fixture
+def recommender(engine):
+    return TreatmentRecommender(engine, template_cache=QueryCache(max_size=64))
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestTreatmentPlanTemplates:
+    """Test per-condition plan templates"""
+
+    def test_recommendations_unchanged(self, recommender, engine):
+        """Test that cached templates give the same recommendation as uncached"""
+        request = {
+            "primary_condition": "heart-attack",
+            "urgency_level": "emergency",
+            "patient_age": 70,
+            "current_medications": ["warfarin"],
+            "medical_history": ["bleeding-disorder"],
+        }
+        uncached = TreatmentRecommender(engine).recommend_treatments(**request)
+        recommender.recommend_treatments(**request)
+        cached = recommender.recommend_treatments(**request)
+        assert recommender.template_cache.hits == 1
+        assert cached["treatments"] == uncached["treatments"]
+        assert cached["treatment_protocol"] == uncached["treatment_protocol"]
+        assert sorted(cached["safety_warnings"]) == sorted(uncached["safety_warnings"])
+        assert cached["contraindications"] == uncached["contraindications"]
+
+    def test_template_shared_across_spellings(self, recommender):
+        """Test that one template serves every spelling of a condition"""
+        assert recommender.get_plan_template("Heart Attack") is recommender.get_plan_template("heart-attack")
+
+    def test_protocol_not_shared_with_callers(self, recommender):
+        """Test that mutating a result leaves the cached template intact"""
+        result = recommender.recommend_treatments("heart-attack", urgency_level="emergency")
+        result["treatments"].clear()
+        result["treatment_protocol"][0]["action"] = "mutated"
+        again = recommender.recommend_treatments("heart-attack", urgency_level="emergency")
+        assert again["treatments"]
+        assert again["treatment_protocol"][0]["action"] != "mutated"
+
+    def test_warm_and_kb_change(self, recommender, engine):
+        """Test startup warming and per-version rebuilds"""
+        count = recommender.warm_plan_templates()
+        assert count == len(engine.find_all_conditions())
+        assert len(recommender.template_cache) == count
+
+        template = recommender.get_plan_template("influenza")
+        engine.add_fact("(has-treatment influenza rest)")
+        rebuilt = recommender.get_plan_template("influenza")
+        assert rebuilt is not template
+        assert rebuilt.kb_version == template.kb_version + 1
+
+
+@pytest.mark.unit
+@pytest.mark.metta
+class TestSpecialistAndFollowUp:
+    """Test KB-backed specialist routing and follow-up timelines"""
+
+    def test_every_condition_has_specialist(self, recommender, engine):
+        """Test that every KB condition routes to a specialist"""
+        for condition in engine.find_all_conditions():
+            assert recommender.recommend_specialist(str(condition), "routine"), condition
+
+    def test_follow_up_timelines(self, recommender):
+        """Test urgency timelines and time-sensitive windows"""
+        assert recommender.determine_follow_up_timeline("emergency", "stroke") == "Immediate (ER visit required)"
+        assert recommender.determine_follow_up_timeline("urgent", "common-cold") == "Within 24 hours"
+        assert recommender.determine_follow_up_timeline("urgent", "Heart Attack") == "Within 1 hours"
+        assert recommender.determine_follow_up_timeline("routine", "influenza").startswith("1-2 weeks")
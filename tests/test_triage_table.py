@@ -0,0 +1,54 @@
+"""
+Unit Tests for the condition triage table
+Tests first-fact-wins lookups and defaults
+"""
+import pytest
+from src.metta.triage_table import UNKNOWN_TRIAGE, TriageTable
+
+
+@pytest.fixture
+def table():
+    """Table over a small set of triage facts"""
+    return TriageTable(
+        urgency=[("stroke", "emergency"), ("flu", "routine-care"), ("flu", "emergency")],
+        severity=[("stroke", "critical")],
+        time_sensitive=[("stroke", 3), ("sepsis", "not-a-number")],
+        required_action=[("stroke", "call-911")],
+        specialist=[("stroke", "Neurologist")],
+        follow_up=[("emergency", "Immediate"), ("routine", "1-2 weeks")],
+    )
+
+
+@pytest.mark.unit
+class TestTriageTable:
+    """Test in-memory triage lookups"""
+
+    def test_condition_entry(self, table):
+        """Test that all four triage facts are combined per condition"""
+        triage = table.get("stroke")
+        assert triage.urgency == "emergency"
+        assert triage.severity == "critical"
+        assert triage.time_sensitive_hours == 3
+        assert triage.required_action == "call-911"
+
+    def test_first_fact_wins(self, table):
+        """Test single-value fields keep the first fact, like find_urgency_level()"""
+        assert table.get("flu").urgency == "routine-care"
+        # ...while the emergency set includes every emergency fact
+        assert table.is_emergency("flu")
+
+    def test_defaults(self, table):
+        """Test defaults for unknown conditions and missing fields"""
+        assert table.get("unknown") is UNKNOWN_TRIAGE
+        assert table.get("unknown").required_action == "consult-doctor"
+        assert table.get("flu").severity == "unknown"
+        assert table.get("sepsis").time_sensitive_hours is None
+        assert table.get("flu").specialist is None
+
+    def test_specialist_and_follow_up(self, table):
+        """Test specialist routing and follow-up timelines per urgency level"""
+        assert table.get("stroke").specialist == "Neurologist"
+        assert table.follow_up_timeline("emergency") == "Immediate"
+        # Levels without their own timeline use routine's
+        assert table.follow_up_timeline("urgent") == "1-2 weeks"
+        assert TriageTable([], [], [], []).follow_up_timeline("routine") is None